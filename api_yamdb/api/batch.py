@@ -0,0 +1,133 @@
+from django.db import connection, transaction
+
+from reviews.models import Categories, Genres, GenresTitles, Title
+from reviews.signals import models_changed
+
+from .serializer import TitleBatchItemSerializer
+
+
+class TitleBatch:
+    """Пакетное создание и изменение произведений.
+
+    Все элементы проверяются заранее; slug'и категорий и жанров и
+    изменяемые произведения загружаются одним запросом на каждый вид,
+    запись выполняется пачечными операциями в одной транзакции.
+    Элемент с `id` изменяет существующее произведение (частично),
+    без `id` — создаёт новое; одно произведение можно изменить в пакете
+    только один раз. Ошибочные элементы попадают в `errors`,
+    остальные сохраняются; в строгом режиме при любой ошибке не
+    сохраняется ничего.
+    """
+
+    def __init__(self, items, strict=False):
+        self.items = items
+        self.strict = strict
+        self.errors = []
+        self.saved = []
+
+    def _error(self, index, errors):
+        self.errors.append({'index': index, 'errors': errors})
+
+    def _validate(self):
+        valid = []
+        for index, item in enumerate(self.items):
+            partial = isinstance(item, dict) and 'id' in item
+            serializer = TitleBatchItemSerializer(data=item, partial=partial)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                self._error(index, serializer.errors)
+        return valid
+
+    def _resolve(self, valid):
+        category_slugs = {data['category'] for _, data in valid
+                          if data.get('category')}
+        genre_slugs = {slug for _, data in valid
+                       for slug in data.get('genre', ())}
+        title_ids = {data['id'] for _, data in valid if 'id' in data}
+        categories = dict(Categories.objects.filter(
+            slug__in=category_slugs
+        ).values_list('slug', 'id'))
+        genres = dict(Genres.objects.filter(
+            slug__in=genre_slugs
+        ).values_list('slug', 'id'))
+        titles = Title.objects.in_bulk(title_ids)
+
+        resolved = []
+        seen = set()
+        for index, data in valid:
+            errors = {}
+            if data.get('category') and data['category'] not in categories:
+                errors['category'] = [
+                    f'Категория {data["category"]} не существует.'
+                ]
+            missing = [slug for slug in data.get('genre', ())
+                       if slug not in genres]
+            if missing:
+                errors['genre'] = [
+                    f'Жанр {slug} не существует.' for slug in missing
+                ]
+            if 'id' in data and data['id'] not in titles:
+                errors['id'] = [f'Произведение {data["id"]} не найдено.']
+            elif 'id' in data and data['id'] in seen:
+                errors['id'] = [
+                    f'Произведение {data["id"]} уже изменяется в пакете.'
+                ]
+            if errors:
+                self._error(index, errors)
+                continue
+            if 'category' in data:
+                category = data.pop('category')
+                data['category_id'] = categories.get(category)
+            if 'genre' in data:
+                data['genre'] = list(dict.fromkeys(
+                    genres[slug] for slug in data['genre']
+                ))
+            if 'id' in data:
+                seen.add(data['id'])
+            resolved.append((index, data, titles.get(data.get('id'))))
+        return resolved
+
+    def save(self):
+        resolved = self._resolve(self._validate())
+        if (self.strict and self.errors) or not resolved:
+            return []
+        with transaction.atomic():
+            self._write(resolved)
+        models_changed(Title, GenresTitles)
+        return self.saved
+
+    def _write(self, resolved):
+        created, updated, relinked, links = [], [], [], []
+        update_fields = set()
+        for _, data, title in resolved:
+            genre_ids = data.pop('genre', None)
+            if title is None:
+                title = Title(**data)
+                created.append(title)
+            else:
+                data.pop('id')
+                for field, value in data.items():
+                    setattr(title, field, value)
+                update_fields.update(data)
+                updated.append(title)
+                if genre_ids is not None:
+                    relinked.append(title)
+            links.append((title, genre_ids or ()))
+
+        if connection.features.can_return_ids_from_bulk_insert:
+            Title.objects.bulk_create(created)
+        else:
+            # Без RETURNING у новых объектов не будет id для связей.
+            for title in created:
+                title.save()
+        if update_fields:
+            Title.objects.bulk_update(updated, update_fields)
+        if relinked:
+            GenresTitles.objects.filter(title__in=relinked).delete()
+        GenresTitles.objects.bulk_create(
+            GenresTitles(title=title, genre_id=genre_id)
+            for title, genre_ids in links
+            for genre_id in genre_ids
+        )
+        self.saved = [title for title, _ in links]
@@ -0,0 +1,163 @@
+"""Потоковая выгрузка каталога в NDJSON.
+
+Произведения, связи с жанрами, отзывы и комментарии читаются
+отдельными курсорами (на PostgreSQL — серверными), упорядоченными по
+id произведения, и сливаются на лету, как при merge join. В памяти
+одновременно находится не больше одной пачки строк каждого курсора
+и отзывы с комментариями одного произведения.
+"""
+import itertools
+import operator
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from reviews.models import Comments, GenresTitles, Review, Title
+
+
+class _Groups:
+    """Строки курсора, сгруппированные по ключу, который возрастает
+    вместе с id произведений.
+    """
+
+    def __init__(self, rows, key):
+        self._groups = itertools.groupby(rows, key=operator.itemgetter(key))
+        self._current = next(self._groups, None)
+
+    def take(self, value):
+        while self._current is not None and self._current[0] < value:
+            self._current = next(self._groups, None)
+        if self._current is None or self._current[0] != value:
+            return []
+        rows = list(self._current[1])
+        self._current = next(self._groups, None)
+        return rows
+
+
+def _titles(chunk_size):
+    return Title.objects.order_by('id').values(
+        'id', 'name', 'year', 'description', 'score_sum', 'review_count',
+        'category__name', 'category__slug',
+    ).iterator(chunk_size)
+
+
+def _genres(chunk_size):
+    return GenresTitles.objects.order_by('title_id', 'genre_id').values(
+        'title_id', 'genre__name', 'genre__slug',
+    ).iterator(chunk_size)
+
+
+def _reviews(chunk_size):
+    return Review.objects.order_by('title_id', 'id').values(
+        'title_id', 'id', 'text', 'author__username', 'score', 'pub_date',
+    ).iterator(chunk_size)
+
+
+def _comments(chunk_size):
+    return Comments.objects.order_by(
+        'review__title_id', 'review_id', 'id'
+    ).values(
+        'review__title_id', 'review_id', 'id', 'text', 'author__username',
+        'pub_date',
+    ).iterator(chunk_size)
+
+
+def _title(row, genres):
+    rating = None
+    if row['review_count']:
+        rating = round(row['score_sum'] / row['review_count'], 1)
+    category = None
+    if row['category__slug'] is not None:
+        category = {'name': row['category__name'],
+                    'slug': row['category__slug']}
+    return {
+        'id': row['id'],
+        'name': row['name'],
+        'year': row['year'],
+        'rating': rating,
+        'description': row['description'],
+        'genre': [{'name': genre['genre__name'], 'slug': genre['genre__slug']}
+                  for genre in genres],
+        'category': category,
+    }
+
+
+def _review(row):
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'author': row['author__username'],
+        'score': row['score'],
+        'pub_date': row['pub_date'],
+    }
+
+
+def _comment(row):
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'author': row['author__username'],
+        'pub_date': row['pub_date'],
+    }
+
+
+def export_titles(reviews=False, comments=False, chunk_size=2000):
+    """Отдаём строки NDJSON (bytes), по одной на произведение."""
+    genres = _Groups(_genres(chunk_size), 'title_id')
+    title_reviews = title_comments = None
+    if reviews or comments:
+        title_reviews = _Groups(_reviews(chunk_size), 'title_id')
+    if comments:
+        title_comments = _Groups(_comments(chunk_size), 'review__title_id')
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in _titles(chunk_size):
+        title = _title(row, genres.take(row['id']))
+        if title_reviews is not None:
+            title['reviews'] = [
+                _review(review) for review in title_reviews.take(row['id'])
+            ]
+        if title_comments is not None:
+            by_review = {}
+            for comment in title_comments.take(row['id']):
+                by_review.setdefault(comment['review_id'], []).append(
+                    _comment(comment)
+                )
+            for review in title['reviews']:
+                review['comments'] = by_review.get(review['id'], [])
+        yield (encoder.encode(title) + '\n').encode()
+
+
+def accepts_gzip(accept_encoding):
+    """Принимает ли клиент gzip по заголовку Accept-Encoding с учётом
+    весов: `gzip;q=0` — отказ, `*` — любое сжатие, кроме явно
+    отвергнутого.
+    """
+    weights = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    for coding in ('gzip', 'x-gzip', '*'):
+        if coding in weights:
+            return weights[coding] > 0
+    return False
+
+
+def gzip_stream(chunks, level=6):
+    """Сжимаем поток по мере выдачи (формат gzip)."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
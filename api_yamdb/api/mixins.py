@@ -0,0 +1,207 @@
+import hashlib
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.cache import get_conditional_response
+from rest_framework.exceptions import MethodNotAllowed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from core import cache as response_cache
+from core.db_router import reading_from
+from reviews.models import ADMIN
+
+
+def role_class(user):
+    """Класс пользователя для ключа кэша: ответы могут отличаться
+    только между ролями, а не между отдельными пользователями.
+    """
+    if not user.is_authenticated:
+        return 'anonymous'
+    if user.is_superuser:
+        return ADMIN
+    return user.role
+
+
+def _param_set(request, name):
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    return {field.strip() for field in value.split(',') if field.strip()}
+
+
+def sparse_fieldset(request):
+    """Поля из `?fields=` и `?omit=` для запроса на чтение:
+    (нужные поля или None — все, исключённые поля).
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None, set()
+    return _param_set(request, 'fields'), _param_set(request, 'omit') or set()
+
+
+def field_selected(name, fieldset):
+    fields, omit = fieldset
+    return (fields is None or name in fields) and name not in omit
+
+
+class SparseFieldsMixin:
+    """Убирает из выборки то, что нужно только неотобранным полям.
+
+    `sparse_fields` описывает для поля сериализатора связи
+    (`select_related`, `prefetch_related`), которые подключаются, только
+    если поле попало в ответ, и столбцы (`columns`), которые иначе
+    откладываются через defer().
+    """
+    sparse_fields = {}
+
+    def filter_queryset(self, queryset):
+        return self.with_sparse_fields(super().filter_queryset(queryset))
+
+    def with_sparse_fields(self, queryset):
+        fieldset = sparse_fieldset(self.request)
+        deferred = []
+        for name, spec in self.sparse_fields.items():
+            if not field_selected(name, fieldset):
+                deferred.extend(spec.get('columns', ()))
+                continue
+            if spec.get('select_related'):
+                queryset = queryset.select_related(*spec['select_related'])
+            if spec.get('prefetch_related'):
+                queryset = queryset.prefetch_related(
+                    *spec['prefetch_related']
+                )
+        if deferred:
+            queryset = queryset.defer(*deferred)
+        return queryset
+
+
+class NamespaceStateMixin:
+    """Версии пространств имён `cache_namespaces`, прочитанные
+    из кэша один раз за запрос.
+    """
+    cache_namespaces = ()
+
+    def get_namespace_state(self):
+        if not hasattr(self, '_namespace_state'):
+            self._namespace_state = response_cache.get_state(
+                self.cache_namespaces
+            )
+        return self._namespace_state
+
+    def require_action(self, name):
+        """Действие реализовано самим набором, а не только миксинами
+        кэша (у категорий и жанров нет retrieve): иначе 405.
+        """
+        for klass in type(self).__mro__:
+            if klass.__module__ != __name__ and name in vars(klass):
+                return
+        raise MethodNotAllowed(self.request.method)
+
+    def consistent_reads(self):
+        """Выборка данных для ответа, который ляжет в общий кэш или
+        получит валидаторы текущих версий: если пространства имён
+        менялись меньше `DATABASE_REPLICA_MAX_LAG` секунд назад,
+        реплика могла ещё не получить изменения — читаем из основной
+        базы.
+        """
+        _, last_modified = self.get_namespace_state()
+        if (settings.DATABASE_REPLICAS and last_modified is not None
+                and time.time() - last_modified
+                < settings.DATABASE_REPLICA_MAX_LAG):
+            return reading_from(DEFAULT_DB_ALIAS)
+        return nullcontext()
+
+    def get_request_parts(self, request):
+        return (
+            request.get_host(),
+            request.get_full_path(),
+            request.META.get('HTTP_ACCEPT', ''),
+            role_class(request.user),
+        )
+
+
+class ConditionalGetMixin(NamespaceStateMixin):
+    """ETag для list/retrieve.
+
+    ETag считается по версиям пространств имён без запросов к базе,
+    поэтому на совпадающий If-None-Match 304 отдаётся до выборки
+    и сериализации данных. Last-Modified не отдаётся: время изменения
+    с точностью до секунды не отличает запись, сделанную в ту же
+    секунду, что и предыдущая.
+    """
+
+    def list(self, request, *args, **kwargs):
+        self.require_action('list')
+        return self._conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        self.require_action('retrieve')
+        return self._conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_etag(self, request):
+        versions, _ = self.get_namespace_state()
+        parts = self.get_request_parts(request) + tuple(
+            f'{name}={version}' for name, version in versions
+        )
+        return '"{}"'.format(
+            hashlib.md5('|'.join(parts).encode()).hexdigest()
+        )
+
+    def _conditional_response(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            with self.consistent_reads():
+                response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        return response
+
+
+class CachedResponseMixin(NamespaceStateMixin):
+    """Кэширует ответы list/retrieve для GET-запросов.
+
+    Ключ строится из хоста, пути, строки запроса, формата ответа, роли
+    пользователя и версий пространств имён `cache_namespaces`,
+    которые сдвигаются при любом изменении связанных моделей.
+    """
+
+    def list(self, request, *args, **kwargs):
+        self.require_action('list')
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        self.require_action('retrieve')
+        return self._cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_cache_key(self, request):
+        versions, _ = self.get_namespace_state()
+        return response_cache.build_key(
+            self.get_request_parts(request), versions
+        )
+
+    def _cached_response(self, handler, request, *args, **kwargs):
+        cache = response_cache.get_cache()
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            response_cache.record_hit()
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        response_cache.record_miss()
+        with self.consistent_reads():
+            response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
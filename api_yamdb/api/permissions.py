@@ -17,7 +17,8 @@ class AuthorOrModearatorOrAdminChangePermission(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
         if request.user.is_authenticated:
-            return (request.user == obj.author or request.user.role in (
+            # author_id: автор объекта для проверки не загружается.
+            return (request.user.id == obj.author_id or request.user.role in (
                 MODERATOR, ADMIN,))
 
 
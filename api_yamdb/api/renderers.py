@@ -0,0 +1,44 @@
+"""JSON-рендерер на orjson с запасным вариантом на stdlib json.
+
+Вывод совпадает с rest_framework.renderers.JSONRenderer: всё, что orjson
+не умеет сам (datetime в формате DRF с `Z`, Decimal, ленивые строки
+перевода, генераторы), преобразуется тем же JSONEncoder.default, что
+и у DRF. Отступы (`; indent=4`, Browsable API), ensure_ascii и
+некомпактный вывод orjson не поддерживает — для них, как и без
+установленного orjson, используется рендерер DRF.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Символы-разделители строк, которые DRF экранирует, чтобы JSON
+# оставался подмножеством JavaScript.
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+_default = JSONEncoder().default
+
+if orjson is not None:
+    ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME
+                      | orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.ensure_ascii
+                or not self.compact
+                or self.get_indent(accepted_media_type,
+                                   renderer_context or {}) is not None):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        rendered = orjson.dumps(data, default=_default,
+                                option=ORJSON_OPTIONS)
+        return rendered.replace(
+            LINE_SEPARATOR, b'\\u2028'
+        ).replace(PARAGRAPH_SEPARATOR, b'\\u2029')
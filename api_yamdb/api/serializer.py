@@ -1,15 +1,42 @@
 import datetime as dt
 
-from django.db.models import Avg
-from django.shortcuts import get_object_or_404
+from core.performance import TimedSerializerMixin
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
 from rest_framework.validators import UniqueValidator
 from reviews.models import (USER, Categories, Comments, Genres, GenresTitles,
                             Review, Title, User)
+from reviews.signals import models_changed
 
+from .mixins import field_selected, sparse_fieldset
 
-class SignUpSerializer(serializers.ModelSerializer):
+
+def validate_title_year(value):
+    year = dt.date.today().year
+    if value > year:
+        raise serializers.ValidationError(
+            'Год выпуска не может быть больше текущего.'
+        )
+    return value
+
+
+class SparseFieldsSerializerMixin:
+    """Оставляем в ответе на чтение только поля из `?fields=`
+    за вычетом `?omit=`. Неизвестные имена полей игнорируются.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fieldset = sparse_fieldset(self.context.get('request'))
+        if fieldset == (None, set()):
+            return
+        for name in list(self.fields):
+            if not field_selected(name, fieldset):
+                self.fields.pop(name)
+
+
+class SignUpSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериалайзер для регистрации новых пользователецй."""
     email = serializers.EmailField(required=True)
 
@@ -35,7 +62,7 @@ class SignUpSerializer(serializers.ModelSerializer):
         return data
 
 
-class TokenSerializer(serializers.ModelSerializer):
+class TokenSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериалайзер для JWT-токенов."""
     username = serializers.CharField(required=True)
     confirmation_code = serializers.CharField(required=True)
@@ -54,7 +81,8 @@ class TokenSerializer(serializers.ModelSerializer):
         return data
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, SparseFieldsSerializerMixin,
+                     serializers.ModelSerializer):
     """Сериализатор для Users."""
     username = serializers.CharField(
         required=True,
@@ -80,7 +108,8 @@ class UserSerializer(serializers.ModelSerializer):
         return data
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedSerializerMixin, SparseFieldsSerializerMixin,
+                       serializers.ModelSerializer):
     """Сериализатор для обзоров."""
     author = SlugRelatedField(slug_field='username', read_only=True)
 
@@ -91,10 +120,10 @@ class ReviewSerializer(serializers.ModelSerializer):
     def validate(self, data):
         request = self.context.get('request')
         if request.method == 'POST':
-            title = int(request.parser_context.get('kwargs').get('title_id'))
-            get_object_or_404(Title, pk=title)
-            if Review.objects.filter(title_id=title).filter(
-                    author_id=request.user.id).exists():
+            # Произведение уже загружено представлением.
+            title = self.context['title']
+            if Review.objects.filter(
+                    title=title, author_id=request.user.id).exists():
                 raise serializers.ValidationError(
                     'Нельзя оставлять больше 1 отзыва')
             return data
@@ -108,7 +137,8 @@ class ReviewSerializer(serializers.ModelSerializer):
         return value
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedSerializerMixin, SparseFieldsSerializerMixin,
+                        serializers.ModelSerializer):
     """Сериализатор для комментариев на обзоры."""
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
@@ -118,20 +148,8 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'pub_date')
         model = Comments
 
-    def validate(self, data):
-        request = self.context.get('request')
-        review_id = int(request.parser_context.get('kwargs').get('review_id'))
-        review = get_object_or_404(Review, pk=review_id)
-        title_id = int(request.parser_context.get('kwargs').get('title_id'))
-        title_check = get_object_or_404(Title, pk=title_id)
-        if review.title != title_check:
-            raise serializers.ValidationError(
-                'Неправильное произведение'
-            )
-        return data
-
 
-class CategorieSerializer(serializers.ModelSerializer):
+class CategorieSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для категорий произведений."""
 
     class Meta:
@@ -140,7 +158,7 @@ class CategorieSerializer(serializers.ModelSerializer):
         lookup_field = 'slug'
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для жанров произведений."""
 
     class Meta:
@@ -149,7 +167,8 @@ class GenreSerializer(serializers.ModelSerializer):
         lookup_field = 'slug'
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(TimedSerializerMixin, SparseFieldsSerializerMixin,
+                      serializers.ModelSerializer):
     """Сериализатор для произведений."""
 
     def __init__(self, *args, **kwargs):
@@ -168,7 +187,7 @@ class TitleSerializer(serializers.ModelSerializer):
 
     genre = GenreSerializer(many=True, read_only=True)
     category = CategorieSerializer(read_only=True)
-    rating = serializers.SerializerMethodField()
+    rating = serializers.ReadOnlyField()
 
     class Meta:
         fields = (
@@ -177,25 +196,37 @@ class TitleSerializer(serializers.ModelSerializer):
         )
         model = Title
 
-    def get_rating(self, obj):
-        rating = obj.reviews.aggregate(Avg('score')).get('score__avg')
-        if rating:
-            return round(rating, 1)
-
     def create(self, validated_data):
-        if 'genre' not in self.initial_data:
+        # Повтор жанра в запросе нарушил бы уникальность связи.
+        genres = dict.fromkeys(validated_data.pop('genre', ()))
+        with transaction.atomic():
             title = Title.objects.create(**validated_data)
-            return title
-        genres = validated_data.pop('genre')
-        title = Title.objects.create(**validated_data)
-        for genre in genres:
-            GenresTitles.objects.create(title=title, genre=genre)
+            GenresTitles.objects.bulk_create(
+                GenresTitles(title=title, genre=genre) for genre in genres
+            )
+        models_changed(GenresTitles)
         return title
 
     def validate_year(self, value):
-        year = dt.date.today().year
-        if value > year:
-            raise serializers.ValidationError(
-                'Год выпуска не может быть больше текущего.'
-            )
-        return value
+        return validate_title_year(value)
+
+
+class TitleBatchItemSerializer(TimedSerializerMixin,
+                               serializers.ModelSerializer):
+    """Элемент пакетного создания или изменения произведений.
+
+    Категория и жанры передаются slug'ами и проверяются сразу для всего
+    пакета, поэтому здесь нет запросов к базе.
+    """
+    id = serializers.IntegerField(required=False)
+    category = serializers.SlugField(required=False, allow_null=True)
+    genre = serializers.ListField(
+        child=serializers.SlugField(), required=False
+    )
+
+    class Meta:
+        fields = ('id', 'name', 'year', 'description', 'genre', 'category')
+        model = Title
+
+    def validate_year(self, value):
+        return validate_title_year(value)
@@ -1,17 +1,30 @@
 import uuid
 
-from core.filters import TitlesFilter
-from django.core.mail import send_mail
+from core.filters import (DEFAULT_TITLE_ORDERING, TITLE_ORDERINGS,
+                          TitlesFilter)
+from core.outbox import enqueue_mail
+from core.throttling import (SignUpIPThrottle, SignUpUsernameThrottle,
+                             TokenIPThrottle, TokenUsernameThrottle)
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Categories, Genres, Review, Title, User
-
+from reviews.models import Categories, Comments, Genres, Review, Title, User
+from reviews.stats import score_distributions
+
+from .batch import TitleBatch
+from .export import accepts_gzip, export_titles, gzip_stream
+from .mixins import (CachedResponseMixin, ConditionalGetMixin,
+                     SparseFieldsMixin)
+from .pagination import LimitOffsetOrKeysetPagination
 from .permissions import (AdminEdit, AdminOnly,
                           AuthorOrModearatorOrAdminChangePermission)
 from .serializer import (CategorieSerializer, CommentSerializer,
@@ -23,28 +36,33 @@ from api_yamdb.settings import STAFF_EMAIL
 
 class SignUpAPIView(APIView):
     """Регистрация и выдача confirmation_code"""
+    # Без аутентификации: лимит проверяется до любых запросов к базе.
+    authentication_classes = ()
     permission_classes = (AllowAny,)
+    throttle_classes = (SignUpIPThrottle, SignUpUsernameThrottle)
 
     def post(self, request):
         serializer = SignUpSerializer(data=request.data)
         confirmation_code = uuid.uuid4()
         if serializer.is_valid():
             email = self.request.data['email']
-            send_mail(
-                'confirmation_code',
-                f'Your confirmation_code: {confirmation_code}.',
-                STAFF_EMAIL,
-                [email],
-                fail_silently=False,
-            )
-            serializer.save(confirmation_code=confirmation_code)
+            with transaction.atomic():
+                serializer.save(confirmation_code=confirmation_code)
+                enqueue_mail(
+                    'confirmation_code',
+                    f'Your confirmation_code: {confirmation_code}.',
+                    STAFF_EMAIL,
+                    [email],
+                )
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 class TokenAPIView(APIView):
     """Выдача JWT на основании confirmation_code"""
+    authentication_classes = ()
     permission_classes = (AllowAny,)
+    throttle_classes = (TokenIPThrottle, TokenUsernameThrottle)
 
     def post(self, request):
         serializer = TokenSerializer(data=request.data)
@@ -60,8 +78,11 @@ class TokenAPIView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ConditionalGetMixin, SparseFieldsMixin,
+                  viewsets.ModelViewSet):
     """Работа с Users"""
+    cache_namespaces = ('users',)
+    sparse_fields = {'bio': {'columns': ('bio',)}}
     queryset = User.objects.all()
     serializer_class = UserSerializer
     filter_backends = (filters.SearchFilter,)
@@ -89,34 +110,62 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, SparseFieldsMixin,
+                    viewsets.ModelViewSet):
     """Вьюсет для модели Review"""
+    cache_namespaces = ('reviews', 'users')
+    sparse_fields = {
+        'author': {'select_related': ('author',)},
+        'text': {'columns': ('text',)},
+    }
 
     serializer_class = ReviewSerializer
     http_method_names = ['get', 'post', 'patch', 'delete']
     permission_classes = (AuthorOrModearatorOrAdminChangePermission,)
+    pagination_class = LimitOffsetOrKeysetPagination
+    keyset_ordering = ('-pub_date', '-id')
 
     def _get_title_id(self):
         return self.kwargs.get("title_id")
 
+    def get_title(self):
+        """Произведение из URL, загруженное один раз за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title.objects.only('id'), pk=self._get_title_id()
+            )
+        return self._title
+
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self._get_title_id())
-        return title.reviews.all()
+        return Review.objects.filter(title=self.get_title())
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if 'title_id' in self.kwargs:
+            context['title'] = self.get_title()
+        return context
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self._get_title_id())
         serializer.save(
-            title=title,
+            title=self.get_title(),
             author=self.request.user
         )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, SparseFieldsMixin,
+                     viewsets.ModelViewSet):
     """Вьюсет для модели Comment"""
+    cache_namespaces = ('comments', 'users')
+    sparse_fields = {
+        'author': {'select_related': ('author',)},
+        'text': {'columns': ('text',)},
+    }
 
     serializer_class = CommentSerializer
     http_method_names = ['get', 'post', 'patch', 'delete']
     permission_classes = (AuthorOrModearatorOrAdminChangePermission,)
+    pagination_class = LimitOffsetOrKeysetPagination
+    keyset_ordering = ('-pub_date', '-id')
 
     def _get_review_id(self):
         return self.kwargs.get("review_id")
@@ -124,17 +173,23 @@ class CommentViewSet(viewsets.ModelViewSet):
     def _get_title_id(self):
         return self.kwargs.get("title_id")
 
+    def get_review(self):
+        """Отзыв из URL, загруженный один раз за запрос; отзыв к другому
+        произведению — 404.
+        """
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.only('id', 'title_id'),
+                pk=self._get_review_id(), title_id=self._get_title_id()
+            )
+        return self._review
+
     def get_queryset(self):
-        review = get_object_or_404(Review, pk=self._get_review_id(),
-                                   title=self._get_title_id())
-        new_queryset = review.comments.all()
-        return new_queryset
+        return Comments.objects.filter(review=self.get_review())
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, pk=self._get_review_id(),
-                                   title_id=self._get_title_id())
         serializer.save(
-            review=review,
+            review=self.get_review(),
             author=self.request.user
         )
 
@@ -150,22 +205,143 @@ class CreateListDestroyViewSet(mixins.CreateModelMixin,
     lookup_field = 'slug'
 
 
-class CategoriesViewSet(CreateListDestroyViewSet):
+class CategoriesViewSet(ConditionalGetMixin, CachedResponseMixin,
+                        CreateListDestroyViewSet):
     """Вьюсет для категорий произведений."""
+    cache_namespaces = ('categories',)
     queryset = Categories.objects.all()
     serializer_class = CategorieSerializer
 
 
-class GenresViewSet(CreateListDestroyViewSet):
+class GenresViewSet(ConditionalGetMixin, CachedResponseMixin,
+                    CreateListDestroyViewSet):
     """Вьюсет для жанров произведений."""
+    cache_namespaces = ('genres',)
     queryset = Genres.objects.all()
     serializer_class = GenreSerializer
 
 
-class TitlesViewSet(viewsets.ModelViewSet):
+class TitlesViewSet(ConditionalGetMixin, CachedResponseMixin,
+                    SparseFieldsMixin, viewsets.ModelViewSet):
     """Вьюсет для названий произведений."""
+    cache_namespaces = ('titles',)
     queryset = Title.objects.all()
+    sparse_fields = {
+        'category': {'select_related': ('category',)},
+        'genre': {'prefetch_related': ('genre',)},
+        'rating': {'columns': ('score_sum', 'review_count')},
+        'description': {'columns': ('description',)},
+    }
     serializer_class = TitleSerializer
     permission_classes = (AdminEdit,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitlesFilter
+    pagination_class = LimitOffsetOrKeysetPagination
+    score_distribution_max_ids = 100
+
+    @property
+    def keyset_ordering(self):
+        return TITLE_ORDERINGS.get(
+            self.request.query_params.get('ordering'),
+            DEFAULT_TITLE_ORDERING
+        )
+
+    def create(self, request, *args, **kwargs):
+        """Список в теле запроса создаёт или изменяет произведения
+        пакетом; `?strict=true` отменяет весь пакет при любой ошибке.
+        """
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        strict = request.query_params.get('strict') in ('1', 'true')
+        batch = TitleBatch(request.data, strict=strict)
+        saved = batch.save()
+        titles = self.with_sparse_fields(self.get_queryset()).filter(
+            pk__in=[title.pk for title in saved]
+        )
+        serializer = self.get_serializer(titles, many=True)
+        return Response(
+            {'results': serializer.data, 'errors': batch.errors},
+            status=(status.HTTP_201_CREATED if saved
+                    else status.HTTP_400_BAD_REQUEST)
+        )
+
+    @action(
+        methods=['GET'],
+        detail=False,
+        url_path='export',
+        permission_classes=(AdminOnly,)
+    )
+    def export(self, request):
+        """Весь каталог в NDJSON одним потоком: `?reviews=true`
+        добавляет отзывы, `?comments=true` — отзывы с комментариями.
+        Сжимается gzip, если клиент его принимает.
+        """
+        params = request.query_params
+        lines = export_titles(
+            reviews=params.get('reviews') in ('1', 'true'),
+            comments=params.get('comments') in ('1', 'true'),
+            chunk_size=settings.EXPORT_CHUNK_SIZE,
+        )
+        compress = accepts_gzip(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        response = StreamingHttpResponse(
+            gzip_stream(lines) if compress else lines,
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="titles.ndjson"'
+        )
+        response['Vary'] = 'Accept-Encoding'
+        if compress:
+            response['Content-Encoding'] = 'gzip'
+        return response
+
+    @action(methods=['GET'], detail=True, url_path='score-distribution')
+    def score_distribution(self, request, pk=None):
+        """Гистограмма оценок произведения из сохранённых счётчиков."""
+        if not str(pk).isdigit():
+            raise Http404
+        return self._conditional_response(
+            self._cached_score_distributions, request, [pk], many=False
+        )
+
+    @action(methods=['GET'], detail=False, url_path='score-distribution')
+    def score_distributions(self, request):
+        """Гистограммы оценок нескольких произведений:
+        `?ids=1,2,3`. Несуществующие id в ответ не попадают.
+        """
+        ids = request.query_params.get('ids', '').split(',')
+        if not all(value.strip().isdigit() for value in ids):
+            raise ValidationError(
+                {'ids': ['Укажите id произведений через запятую.']}
+            )
+        if len(ids) > self.score_distribution_max_ids:
+            raise ValidationError({'ids': [
+                f'Не больше {self.score_distribution_max_ids} произведений.'
+            ]})
+        return self._conditional_response(
+            self._cached_score_distributions, request, ids
+        )
+
+    def _cached_score_distributions(self, request, ids, many=True):
+        return self._cached_response(
+            self._score_distributions, request, ids, many=many
+        )
+
+    def _score_distributions(self, request, ids, many=True):
+        titles = dict(Title.objects.filter(
+            pk__in=[int(value) for value in ids]
+        ).values_list('id', 'review_count'))
+        if not titles and not many:
+            raise Http404
+        distributions = score_distributions(titles)
+        results = [
+            {
+                'id': title_id,
+                'review_count': titles[title_id],
+                'distribution': {
+                    str(score): count for score, count in distribution.items()
+                },
+            }
+            for title_id, distribution in sorted(distributions.items())
+        ]
+        return Response({'results': results} if many else results[0])
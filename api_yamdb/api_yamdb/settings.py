@@ -22,6 +22,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'api',
     'reviews',
     'core',
@@ -30,6 +31,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -39,6 +42,36 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Доля запросов, для которых пишется лог замеров
+PERFORMANCE_SAMPLE_RATE = float(os.getenv('PERFORMANCE_SAMPLE_RATE', 0.01))
+# Значение заголовка X-Performance-Trace, с которым запрос замеряется
+# всегда и получает Server-Timing; пустое — заголовок не действует
+PERFORMANCE_TRACE_SECRET = os.getenv('PERFORMANCE_TRACE_SECRET', '')
+# Сколько одинаковых запросов к базе считается признаком N+1
+PERFORMANCE_DUPLICATE_THRESHOLD = int(
+    os.getenv('PERFORMANCE_DUPLICATE_THRESHOLD', 3)
+)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'yamdb.performance': {
+            'handlers': ['console'],
+            'level': os.getenv('PERFORMANCE_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+        'yamdb.startup': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
@@ -70,10 +103,69 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
-        'PORT': os.getenv('DB_PORT')
+        'PORT': os.getenv('DB_PORT'),
+        # Постоянное соединение воркера живёт столько секунд (0 — новое
+        # соединение на каждый запрос)
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
     }
 }
 
+# Пул соединений процесса (0 — без пула), только для PostgreSQL
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 0))
+if DB_POOL_SIZE and 'postgresql' in DATABASES['default']['ENGINE']:
+    DATABASES['default'].update(ENGINE='core.db.postgresql', POOL={
+        'size': DB_POOL_SIZE,
+        'max_idle': int(os.getenv('DB_POOL_MAX_IDLE', DB_POOL_SIZE)),
+        'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+        'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', 3600)),
+        'check_interval': float(os.getenv('DB_POOL_CHECK_INTERVAL', 30)),
+    })
+
+# Реплики для чтения: через запятую хосты (PostgreSQL) или файлы (SQLite)
+DATABASE_REPLICAS = []
+for number, replica in enumerate(
+        filter(None, os.getenv('DB_REPLICAS', '').split(',')), start=1):
+    alias = f'replica_{number}'
+    sqlite = 'sqlite3' in DATABASES['default']['ENGINE']
+    location = 'NAME' if sqlite else 'HOST'
+    DATABASES[alias] = dict(
+        DATABASES['default'], TEST={'MIRROR': 'default'},
+        **{location: replica.strip()}
+    )
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
+# Сколько секунд после записи клиент читает из основной базы
+DATABASE_REPLICA_STICKY_SECONDS = int(
+    os.getenv('DB_REPLICA_STICKY_SECONDS', 10)
+)
+DATABASE_REPLICA_HEALTH_INTERVAL = float(
+    os.getenv('DB_REPLICA_HEALTH_INTERVAL', 5)
+)
+DATABASE_REPLICA_MAX_LAG = float(os.getenv('DB_REPLICA_MAX_LAG', 30))
+
+
+# Cache
+# В контейнерах кэш должен быть общим для всех воркеров gunicorn
+# (memcached), иначе сброс версий не дойдёт до соседних процессов.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Через сколько секунд /readyz повторяет неудавшийся прогрев (core.warmup)
+WARMUP_RETRY_INTERVAL = float(os.getenv('WARMUP_RETRY_INTERVAL', 5))
+
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 300))
+# Сколько секунд аутентификация доверяет кэшированной записи пользователя
+USER_CACHE_TIMEOUT = int(os.getenv('USER_CACHE_TIMEOUT', 300))
+
 
 # Password validation
 
@@ -126,10 +218,28 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 5,
+    # JSON через orjson, если он установлен (api.renderers)
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    # Лимиты регистрации и выдачи токена (core.throttling) по IP
+    # и по имени пользователя
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_ip': os.getenv('THROTTLE_SIGNUP_IP', '10/min'),
+        'signup_username': os.getenv('THROTTLE_SIGNUP_USERNAME', '3/min'),
+        'token_ip': os.getenv('THROTTLE_TOKEN_IP', '30/min'),
+        'token_username': os.getenv('THROTTLE_TOKEN_USERNAME', '5/min'),
+    },
 }
 
 # Эмуляция почтового сервера
@@ -137,6 +247,14 @@ REST_FRAMEWORK = {
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+# Очередь исходящих писем (outbox): число попыток и задержки в секундах
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 8))
+OUTBOX_RETRY_BASE_DELAY = int(os.getenv('OUTBOX_RETRY_BASE_DELAY', 30))
+OUTBOX_RETRY_MAX_DELAY = int(os.getenv('OUTBOX_RETRY_MAX_DELAY', 3600))
+
+# Строк на одну выборку курсора при выгрузке каталога
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 2000))
+
 # JWT-токен
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=100),
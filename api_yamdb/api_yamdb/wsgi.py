@@ -8,9 +8,15 @@ https://docs.djangoproject.com/en/3.0/howto/deployment/wsgi/
 """
 
 import os
+import time
 
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
+started = time.perf_counter()
 application = get_wsgi_application()
+
+from core.warmup import record_phase  # noqa: E402 (нужен django.setup())
+
+record_phase('django_setup', time.perf_counter() - started)
@@ -0,0 +1,13 @@
+from django.contrib import admin
+
+from .models import OutgoingEmail
+
+
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipients', 'created', 'attempts',
+                    'sent_at',)
+    list_filter = ('sent_at',)
+    search_fields = ('recipients',)
+
+
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
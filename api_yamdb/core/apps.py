@@ -1,5 +1,24 @@
 from django.apps import AppConfig
+from django.core.signals import request_finished
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def restore_search_index(sender, using, **kwargs):
+    from .search import ensure_search_index
+    ensure_search_index(connections[using])
+
+
+def publish_pool_stats(sender, **kwargs):
+    from . import cache as response_cache
+    from .db.pool import pools, publish_stats
+    if pools():
+        publish_stats(response_cache.get_cache())
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        post_migrate.connect(restore_search_index, sender=self)
+        request_finished.connect(publish_pool_stats)
@@ -0,0 +1,72 @@
+"""JWT-аутентификация с кэшем пользователей.
+
+Стандартный JWTAuthentication загружает пользователя из базы на каждый
+запрос. Здесь поля, которые нужны разрешениям и сериализаторам, хранятся
+в общем кэше; запись удаляется сигналами при любом сохранении или
+удалении пользователя и в любом случае живёт не дольше
+`USER_CACHE_TIMEOUT` секунд.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+
+from . import cache as response_cache
+
+CACHED_USER_FIELDS = (
+    'id', 'username', 'email', 'first_name', 'last_name', 'bio', 'role',
+    'is_active', 'is_staff', 'is_superuser',
+)
+
+
+def user_cache_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+def forget_user(user):
+    key = user_cache_key(getattr(user, api_settings.USER_ID_FIELD))
+    cache = response_cache.get_cache()
+    cache.delete(key)
+    # Повторно после коммита: параллельный запрос мог успеть положить
+    # в кэш ещё не изменённую строку.
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        cache = response_cache.get_cache()
+        key = user_cache_key(user_id)
+        fields = cache.get(key)
+        if fields is None:
+            try:
+                fields = self.user_model.objects.values(
+                    *CACHED_USER_FIELDS
+                ).get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(
+                    _('User not found'), code='user_not_found'
+                )
+            cache.set(key, fields, settings.USER_CACHE_TIMEOUT)
+        if not fields['is_active']:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        # Остальные поля отложены: обращение к ним загрузит их из базы,
+        # а save() запишет только загруженные поля. from_db ждёт значения
+        # в порядке полей модели.
+        names = [field.attname
+                 for field in self.user_model._meta.concrete_fields
+                 if field.attname in fields]
+        return self.user_model.from_db(
+            None, names, [fields[name] for name in names]
+        )
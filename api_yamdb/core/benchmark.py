@@ -0,0 +1,538 @@
+"""Замеры производительности эндпоинтов API.
+
+Каждый маршрут из api/urls.py вызывается через тестовый клиент Django
+заданное число раз; для маршрута считаются перцентили времени ответа,
+число запросов к базе и пик выделенной памяти (отдельным проходом под
+tracemalloc, чтобы трассировка не искажала время). Результат —
+словарь, который сохраняется в JSON и сравнивается с базовым прогоном.
+
+Замеры идут в транзакции, которая откатывается: синтетические данные,
+служебные пользователи, регистрации и письма в очереди не остаются
+в базе. Кэш ответов замеров — отдельный префикс ключей в том же
+бэкенде, и сброс версий перед каждым запросом не трогает кэш
+работающего приложения.
+"""
+import io
+import itertools
+import math
+import secrets
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from reviews.models import (ADMIN, Categories, Comments, Genres, Review,
+                            Title, User)
+from reviews.seed import seed_catalog
+from reviews.signals import CACHE_NAMESPACES
+
+from . import cache as response_cache
+from .authentication import user_cache_key
+
+ADMIN_USERNAME = 'bench-admin'
+TOKEN_USERNAME = 'bench-token'
+BENCHMARK_CACHE = 'benchmark'
+NAMESPACES = sorted({
+    namespace for namespaces in CACHE_NAMESPACES.values()
+    for namespace in namespaces
+})
+
+
+class Route:
+    """Маршрут для замера: `url_name` и `method` — маршрут роутера
+    и HTTP-метод из api/urls.py. `path` — шаблон, в который
+    подставляются id из фикстуры; `data` — функция от номера итерации
+    и фикстуры для тела запроса; `setup` — функция, которая до замера
+    создаёт объект запроса (например, удаляемый) и возвращает
+    дополнительные значения для шаблона.
+    """
+
+    def __init__(self, name, path, method='get', data=None, auth=True,
+                 url_name=None, setup=None):
+        self.name = name
+        self.path = path
+        self.method = method
+        self.data = data
+        self.auth = auth
+        self.url_name = url_name or name
+        self.setup = setup
+
+    def prepare(self, context, iteration):
+        if self.setup is not None:
+            context = dict(context, **self.setup(iteration, context))
+        data = None if self.data is None else self.data(iteration, context)
+        return self.path.format(**context), data
+
+    def send(self, client, path, data):
+        if data is None:
+            return getattr(client, self.method)(path)
+        return getattr(client, self.method)(path, data=data, format='json')
+
+
+def _name(kind, iteration, context):
+    return f'bench-{kind}-{context["run"]}-{iteration}'
+
+
+def _signup_data(iteration, context):
+    name = _name('signup', iteration, context)
+    return {'username': name, 'email': f'{name}@yamdb.fake'}
+
+
+def _token_data(iteration, context):
+    return {'username': TOKEN_USERNAME,
+            'confirmation_code': context['confirmation_code']}
+
+
+def _user_data(iteration, context):
+    name = _name('user', iteration, context)
+    return {'username': name, 'email': f'{name}@yamdb.fake'}
+
+
+def _user_put_data(iteration, context):
+    return {'username': TOKEN_USERNAME,
+            'email': f'{TOKEN_USERNAME}@yamdb.fake',
+            'bio': _name('bio', iteration, context)}
+
+
+def _bio_data(iteration, context):
+    return {'bio': _name('bio', iteration, context)}
+
+
+def _slug_data(kind):
+    def data(iteration, context):
+        slug = _name(kind, iteration, context)
+        return {'name': slug, 'slug': slug}
+    return data
+
+
+def _title_data(iteration, context):
+    return {'name': _name('title', iteration, context), 'year': 2000,
+            'category': context['category'], 'genre': [context['genre']]}
+
+
+def _title_batch_data(iteration, context):
+    return [dict(_title_data(iteration, context),
+                 name=_name(f'batch{number}', iteration, context))
+            for number in range(10)]
+
+
+def _title_put_data(iteration, context):
+    return {'name': _name('title', iteration, context),
+            'year': context['year']}
+
+
+def _name_data(iteration, context):
+    return {'name': _name('title', iteration, context)}
+
+
+def _review_data(iteration, context):
+    return {'text': _name('review', iteration, context), 'score': 7}
+
+
+def _text_data(iteration, context):
+    return {'text': _name('text', iteration, context)}
+
+
+def _new_user(iteration, context):
+    name = _name('deleted', iteration, context)
+    User.objects.create(username=name, email=f'{name}@yamdb.fake')
+    return {'new_user': name}
+
+
+def _new_category(iteration, context):
+    slug = _name('deleted', iteration, context)
+    Categories.objects.create(name=slug, slug=slug)
+    return {'new_category': slug}
+
+
+def _new_genre(iteration, context):
+    slug = _name('deleted', iteration, context)
+    Genres.objects.create(name=slug, slug=slug)
+    return {'new_genre': slug}
+
+
+def _new_title(iteration, context):
+    # Отдельное произведение: у администратора на нём ещё нет отзыва.
+    title = Title.objects.create(name=_name('new', iteration, context),
+                                 year=2000)
+    return {'new_title': title.id}
+
+
+def _new_review(iteration, context):
+    extra = _new_title(iteration, context)
+    review = Review.objects.create(
+        title_id=extra['new_title'], author_id=context['admin'],
+        text='.', score=5,
+    )
+    return dict(extra, new_review=review.id)
+
+
+def _new_comment(iteration, context):
+    comment = Comments.objects.create(
+        review_id=context['review'], author_id=context['admin'], text='.'
+    )
+    return {'new_comment': comment.id}
+
+
+TITLE = '/api/v1/titles/{title}/'
+REVIEW = TITLE + 'reviews/{review}/'
+COMMENT = REVIEW + 'comments/{comment}/'
+
+ROUTES = (
+    Route('categories-list', '/api/v1/categories/'),
+    Route('categories-create', '/api/v1/categories/', 'post',
+          _slug_data('category'), url_name='categories-list'),
+    Route('categories-delete', '/api/v1/categories/{new_category}/',
+          'delete', url_name='categories-detail', setup=_new_category),
+    Route('genres-list', '/api/v1/genres/'),
+    Route('genres-create', '/api/v1/genres/', 'post', _slug_data('genre'),
+          url_name='genres-list'),
+    Route('genres-delete', '/api/v1/genres/{new_genre}/', 'delete',
+          url_name='genres-detail', setup=_new_genre),
+    Route('titles-list', '/api/v1/titles/'),
+    Route('titles-filter', '/api/v1/titles/?genre={genre}&year={year}',
+          url_name='titles-list'),
+    Route('titles-search', '/api/v1/titles/?search=bench',
+          url_name='titles-list'),
+    Route('titles-top', '/api/v1/titles/?ordering=-rating&genre={genre}',
+          url_name='titles-list'),
+    Route('titles-create', '/api/v1/titles/', 'post', _title_data,
+          url_name='titles-list'),
+    Route('titles-batch', '/api/v1/titles/', 'post', _title_batch_data,
+          url_name='titles-list'),
+    Route('titles-export', '/api/v1/titles/export/?reviews=true'),
+    Route('titles-detail', TITLE),
+    Route('titles-update', TITLE, 'put', _title_put_data,
+          url_name='titles-detail'),
+    Route('titles-partial-update', TITLE, 'patch', _name_data,
+          url_name='titles-detail'),
+    Route('titles-delete', '/api/v1/titles/{new_title}/', 'delete',
+          url_name='titles-detail', setup=_new_title),
+    Route('titles-score-distribution', TITLE + 'score-distribution/'),
+    Route('titles-score-distributions',
+          '/api/v1/titles/score-distribution/?ids={title_ids}'),
+    Route('reviews-list', TITLE + 'reviews/',
+          url_name='titlereviews-list'),
+    Route('reviews-cursor', TITLE + 'reviews/?cursor=',
+          url_name='titlereviews-list'),
+    Route('reviews-create', '/api/v1/titles/{new_title}/reviews/', 'post',
+          _review_data, url_name='titlereviews-list', setup=_new_title),
+    Route('reviews-detail', REVIEW, url_name='titlereviews-detail'),
+    Route('reviews-partial-update', REVIEW, 'patch', _text_data,
+          url_name='titlereviews-detail'),
+    Route('reviews-delete', '/api/v1/titles/{new_title}/reviews/'
+          '{new_review}/', 'delete', url_name='titlereviews-detail',
+          setup=_new_review),
+    Route('comments-list', REVIEW + 'comments/',
+          url_name='reviewcomments-list'),
+    Route('comments-create', REVIEW + 'comments/', 'post', _text_data,
+          url_name='reviewcomments-list'),
+    Route('comments-detail', COMMENT, url_name='reviewcomments-detail'),
+    Route('comments-partial-update', COMMENT, 'patch', _text_data,
+          url_name='reviewcomments-detail'),
+    Route('comments-delete', REVIEW + 'comments/{new_comment}/', 'delete',
+          url_name='reviewcomments-detail', setup=_new_comment),
+    Route('users-list', '/api/v1/users/'),
+    Route('users-create', '/api/v1/users/', 'post', _user_data,
+          url_name='users-list'),
+    Route('users-detail', '/api/v1/users/{username}/'),
+    Route('users-update', '/api/v1/users/{token_username}/', 'put',
+          _user_put_data, url_name='users-detail'),
+    Route('users-partial-update', '/api/v1/users/{username}/', 'patch',
+          _bio_data, url_name='users-detail'),
+    Route('users-delete', '/api/v1/users/{new_user}/', 'delete',
+          url_name='users-detail', setup=_new_user),
+    Route('users-me', '/api/v1/users/me/'),
+    Route('users-me-update', '/api/v1/users/me/', 'patch', _bio_data,
+          url_name='users-me'),
+    Route('auth-signup', '/api/v1/auth/signup/', 'post', _signup_data,
+          auth=False),
+    Route('auth-token', '/api/v1/auth/token/', 'post', _token_data,
+          auth=False),
+)
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+@contextmanager
+def rolled_back():
+    """Все изменения в базе внутри блока откатываются."""
+    with transaction.atomic():
+        try:
+            yield
+        finally:
+            transaction.set_rollback(True)
+
+
+def isolated_cache():
+    """Кэш ответов замеров — тот же бэкенд, что и у приложения, но со
+    своим префиксом ключей: сброс версий и записи замеров не трогают
+    кэш работающего приложения.
+    """
+    aliases = dict(settings.CACHES)
+    aliases[BENCHMARK_CACHE] = dict(
+        aliases[settings.RESPONSE_CACHE_ALIAS], KEY_PREFIX=BENCHMARK_CACHE
+    )
+    return override_settings(
+        CACHES=aliases, RESPONSE_CACHE_ALIAS=BENCHMARK_CACHE
+    )
+
+
+def invalidate(user_ids=()):
+    """Сбрасываем кэш ответов и записи пользователей из кэша
+    аутентификации, не очищая общий кэш.
+    """
+    response_cache.bump(*NAMESPACES)
+    response_cache.get_cache().delete_many(
+        [user_cache_key(user_id) for user_id in user_ids]
+    )
+
+
+def prepare(volumes):
+    """Наполняем базу и собираем id объектов для шаблонов путей."""
+    counts = seed_catalog(**volumes) if volumes else {}
+    # Код подтверждения свой на каждый прогон: даже если транзакция
+    # не откатится, по известному коду токен не получить.
+    confirmation_code = secrets.token_urlsafe(16)
+    admin, _ = User.objects.get_or_create(
+        username=ADMIN_USERNAME,
+        defaults={'email': f'{ADMIN_USERNAME}@yamdb.fake', 'role': ADMIN},
+    )
+    User.objects.update_or_create(
+        username=TOKEN_USERNAME,
+        defaults={'email': f'{TOKEN_USERNAME}@yamdb.fake',
+                  'confirmation_code': confirmation_code},
+    )
+    title = Title.objects.order_by('-review_count', 'id').first()
+    review = Review.objects.filter(title=title).order_by('id').first()
+    comment = Comments.objects.filter(review=review).order_by('id').first()
+    if comment is None:
+        raise ValueError('Нет данных для замеров: задайте объёмы.')
+    context = {
+        'title': title.id,
+        'title_ids': ','.join(str(pk) for pk in Title.objects.order_by(
+            'id'
+        ).values_list('id', flat=True)[:20]),
+        'year': title.year,
+        'category': Categories.objects.order_by('id').first().slug,
+        'genre': Genres.objects.filter(title=title).first().slug,
+        'review': review.id,
+        'comment': comment.id,
+        'username': ADMIN_USERNAME,
+        'token_username': TOKEN_USERNAME,
+        'admin': admin.id,
+        'confirmation_code': confirmation_code,
+        'run': int(time.time()),
+    }
+    return admin, context, counts
+
+
+def _clients(admin):
+    anonymous = APIClient()
+    authorized = APIClient()
+    token = RefreshToken.for_user(admin).access_token
+    authorized.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return anonymous, authorized
+
+
+def measure_route(route, client, context, iterations, warmup=2,
+                  cold_cache=True):
+    counter = itertools.count()
+
+    def prepare_call():
+        # Сброс кэша и подготовка объектов не входят в замер.
+        if cold_cache:
+            invalidate([context['admin']])
+        return route.prepare(context, next(counter))
+
+    for _ in range(warmup):
+        route.send(client, *prepare_call())
+    timings, queries, status = [], [], None
+    for _ in range(iterations):
+        path, data = prepare_call()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = route.send(client, path, data)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured))
+        status = response.status_code
+    peaks = []
+    for _ in range(min(iterations, 5)):
+        path, data = prepare_call()
+        tracemalloc.start()
+        try:
+            route.send(client, path, data)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+    return {
+        'status': status,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'mean_ms': round(statistics.mean(timings), 3),
+        'queries': max(queries),
+        'memory_kb': round(max(peaks) / 1024, 1),
+    }
+
+
+def run_benchmark(volumes=None, iterations=50, routes=ROUTES,
+                  cold_cache=True):
+    """Замеряем маршруты. `volumes` — аргументы seed_catalog; без них
+    используются уже имеющиеся в базе данные. Изменения в базе
+    откатываются.
+    """
+    with rolled_back(), isolated_cache():
+        admin, context, counts = prepare(volumes)
+        anonymous, authorized = _clients(admin)
+        results = {}
+        # Повторные вызовы регистрации и токена упёрлись бы в лимиты.
+        unthrottled = dict(settings.REST_FRAMEWORK,
+                           DEFAULT_THROTTLE_RATES={})
+        try:
+            with override_settings(REST_FRAMEWORK=unthrottled):
+                for route in routes:
+                    client = authorized if route.auth else anonymous
+                    results[route.name] = measure_route(
+                        route, client, context, iterations,
+                        cold_cache=cold_cache
+                    )
+        finally:
+            # Ответы и запись администратора, построенные по
+            # откатываемым данным, не должны остаться в кэше (на SQLite
+            # id администратора может достаться новому пользователю).
+            invalidate([admin.id])
+    return {
+        'meta': {
+            'created': timezone.now().isoformat(),
+            'vendor': connection.vendor,
+            'iterations': iterations,
+            'cold_cache': cold_cache,
+            'volumes': volumes or {},
+            'rows': counts,
+        },
+        'routes': results,
+    }
+
+
+def compare(results, baseline, threshold=0.1):
+    """Список регрессий относительно базового прогона: p95 медленнее
+    больше чем на `threshold` или больше запросов к базе.
+    """
+    regressions = []
+    for name, current in results['routes'].items():
+        previous = baseline.get('routes', {}).get(name)
+        if previous is None:
+            continue
+        limit = previous['p95_ms'] * (1 + threshold)
+        if current['p95_ms'] > limit:
+            regressions.append(
+                f'{name}: p95 {current["p95_ms"]} мс > '
+                f'{previous["p95_ms"]} мс (+{threshold:.0%})'
+            )
+        if current['queries'] > previous['queries']:
+            regressions.append(
+                f'{name}: запросов {current["queries"]} > '
+                f'{previous["queries"]}'
+            )
+    return regressions
+
+
+def json_payloads(limit=100):
+    """Данные ответов списков произведений и отзывов, как их отдают
+    сериализаторы API (жанры, категория, рейтинг, даты).
+    """
+    from api.serializer import ReviewSerializer, TitleSerializer
+    context = {
+        'request': Request(RequestFactory().get('/')),
+        'view': SimpleNamespace(action='list'),
+    }
+    titles = Title.objects.select_related('category').prefetch_related(
+        'genre'
+    ).order_by('-review_count', 'id')[:limit]
+    reviews = Review.objects.select_related('author').order_by('-id')[:limit]
+    return {
+        'titles': TitleSerializer(titles, many=True, context=context).data,
+        'reviews': ReviewSerializer(reviews, many=True, context=context).data,
+    }
+
+
+def _timings(function, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def measure_json(payloads, renderers, parsers, iterations=200):
+    """Время рендеринга и разбора каждого набора данных каждой парой
+    рендерер/парсер: {данные: {имя: {...}}}.
+    """
+    results = {}
+    for name, data in payloads.items():
+        results[name] = {}
+        for renderer_class, parser_class in zip(renderers, parsers):
+            renderer, parser = renderer_class(), parser_class()
+            body = renderer.render(data, 'application/json')
+            render = _timings(
+                lambda: renderer.render(data, 'application/json'),
+                iterations
+            )
+            parse = _timings(
+                lambda: parser.parse(io.BytesIO(body), 'application/json'),
+                iterations
+            )
+            results[name][renderer_class.__name__] = {
+                'bytes': len(body),
+                'render_p50_ms': round(percentile(render, 50), 3),
+                'render_p95_ms': round(percentile(render, 95), 3),
+                'parse_p50_ms': round(percentile(parse, 50), 3),
+                'parse_p95_ms': round(percentile(parse, 95), 3),
+            }
+    return results
+
+
+def benchmark_json(limit=100, iterations=200, volumes=None):
+    """Сравниваем JSON-рендерер и парсер API с рендерером DRF на
+    данных из базы; `volumes` — аргументы seed_catalog, синтетические
+    данные откатываются.
+    """
+    from api.parsers import FastJSONParser
+    from api.renderers import FastJSONRenderer, orjson
+    with rolled_back():
+        if volumes:
+            seed_catalog(**volumes)
+        payloads = json_payloads(limit)
+    if not payloads['titles']:
+        raise ValueError('Нет данных для замеров: задайте объёмы.')
+    results = measure_json(
+        payloads, (JSONRenderer, FastJSONRenderer),
+        (JSONParser, FastJSONParser), iterations
+    )
+    return {
+        'meta': {
+            'orjson': getattr(orjson, '__version__', None),
+            'iterations': iterations,
+            'items': {name: len(data) for name, data in payloads.items()},
+        },
+        'payloads': results,
+    }
@@ -0,0 +1,98 @@
+"""Кэш ответов API с версиями пространств имён.
+
+Каждое пространство имён (например, `titles`) хранит в кэше счётчик
+версии. Версии всех пространств, от которых зависит ответ, входят
+в ключ записи, поэтому после изменения данных счётчик увеличивается,
+и старые записи перестают находиться — их не нужно искать и удалять.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = 'ns:{}:version'
+MODIFIED_KEY = 'ns:{}:modified'
+HITS_KEY = 'response-cache:hits'
+MISSES_KEY = 'response-cache:misses'
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _initial_version():
+    # Если счётчик вытеснен из кэша, новая версия не должна совпасть
+    # с одной из прежних, под которой ещё могут лежать ответы.
+    return int(time.time() * 1000)
+
+
+def get_state(namespaces):
+    """Текущие версии пространств имён в виде списка пар и время
+    последнего изменения любого из них (unix time).
+    """
+    cache = get_cache()
+    version_keys = [VERSION_KEY.format(name) for name in namespaces]
+    modified_keys = [MODIFIED_KEY.format(name) for name in namespaces]
+    values = cache.get_many(version_keys + modified_keys)
+    for version_key, modified_key in zip(version_keys, modified_keys):
+        if version_key not in values:
+            cache.add(version_key, _initial_version(), None)
+            values[version_key] = cache.get(version_key)
+        if modified_key not in values:
+            cache.add(modified_key, time.time(), None)
+            values[modified_key] = cache.get(modified_key)
+    versions = [(name, values[key])
+                for name, key in zip(namespaces, version_keys)]
+    last_modified = max((values[key] for key in modified_keys), default=None)
+    return versions, last_modified
+
+
+def bump(*namespaces):
+    """Сдвигаем версии: все закэшированные ответы этих пространств
+    перестают быть актуальными.
+    """
+    cache = get_cache()
+    now = time.time()
+    for namespace in namespaces:
+        key = VERSION_KEY.format(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), None)
+        cache.set(MODIFIED_KEY.format(namespace), now, None)
+
+
+def build_key(parts, versions):
+    """Ключ записи: хэш частей запроса и версии из `get_state`."""
+    versions = ':'.join(f'{name}={version}' for name, version in versions)
+    digest = hashlib.md5('|'.join(parts).encode()).hexdigest()
+    return f'response:{digest}:{versions}'
+
+
+def _count(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def record_hit():
+    _count(HITS_KEY)
+
+
+def record_miss():
+    _count(MISSES_KEY)
+
+
+def stats():
+    values = get_cache().get_many((HITS_KEY, MISSES_KEY))
+    return {
+        'hits': values.get(HITS_KEY, 0),
+        'misses': values.get(MISSES_KEY, 0),
+    }
+
+
+def reset_stats():
+    get_cache().delete_many((HITS_KEY, MISSES_KEY))
@@ -0,0 +1,266 @@
+"""Пул соединений с базой внутри процесса воркера.
+
+Соединение, которое Django закрывает в конце запроса, возвращается
+в пул. Следующий запрос (в том числе из другого потока) берёт его из
+пула, а не открывает новое. Пул ограничен `size` соединениями: когда
+все заняты, запрос ждёт до `timeout` секунд. Свободных соединений
+хранится не больше `max_idle`. Соединение, простоявшее дольше
+`check_interval`, перед выдачей проверяется запросом `SELECT 1`.
+Соединения старше `max_lifetime` и соединения после ошибок
+закрываются.
+"""
+import os
+import socket
+import threading
+import time
+import zlib
+from collections import deque
+
+from django.db import OperationalError
+
+STATS_KEY = 'db-pool:stats:{}'
+SLOT_KEY = 'db-pool:slot:{}'
+# Воркеры, одновременно публикующие метрики.
+SLOTS = 256
+STATS_PUBLISH_INTERVAL = 10
+STATS_TIMEOUT = STATS_PUBLISH_INTERVAL * 6
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool:
+
+    def __init__(self, size, max_idle, timeout=10, max_lifetime=3600,
+                 check_interval=30):
+        self.size = size
+        self.max_idle = min(max_idle, size)
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.check_interval = check_interval
+        self.pid = os.getpid()
+        self._idle = deque()
+        self._created = {}
+        self._pending = 0
+        self._condition = threading.Condition()
+        self.metrics = dict.fromkeys((
+            'checkouts', 'reused', 'created', 'waits', 'timeouts',
+            'recycled', 'failed_checks',
+        ), 0)
+        self.metrics['wait_seconds'] = 0.0
+
+    @property
+    def open(self):
+        return len(self._created) + self._pending
+
+    @property
+    def in_use(self):
+        return self.open - len(self._idle)
+
+    def stats(self):
+        with self._condition:
+            return dict(
+                self.metrics, size=self.size, max_idle=self.max_idle,
+                open=self.open, idle=len(self._idle),
+                in_use=self.in_use,
+            )
+
+    def acquire(self, connect):
+        """Соединение из пула или новое через `connect()`.
+
+        Проверка `SELECT 1` идёт без блокировки пула: снятое с очереди
+        соединение до конца проверки числится занятым.
+        """
+        with self._condition:
+            self.metrics['checkouts'] += 1
+            if not self._idle and self.open >= self.size:
+                self._wait()
+            idle = self._take()
+        while idle is not None:
+            connection, released = idle
+            if self._healthy(connection, released):
+                with self._condition:
+                    self.metrics['reused'] += 1
+                return connection
+            with self._condition:
+                self._forget(connection)
+                idle = self._take()
+            self._close(connection)
+        try:
+            connection = connect()
+        except Exception:
+            with self._condition:
+                self._pending -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._pending -= 1
+            self._created[id(connection)] = time.monotonic()
+            self.metrics['created'] += 1
+        return connection
+
+    def release(self, connection, discard=False):
+        with self._condition:
+            keep = id(connection) in self._created and not (
+                discard or connection.closed
+                or len(self._idle) >= self.max_idle
+                or time.monotonic() - self._created[id(connection)]
+                >= self.max_lifetime
+            )
+        # Откат транзакции — обращение к базе, поэтому вне блокировки.
+        keep = keep and self._reset(connection)
+        with self._condition:
+            if keep and len(self._idle) < self.max_idle:
+                self._idle.append((connection, time.monotonic()))
+                self._condition.notify()
+                return
+            if id(connection) in self._created:
+                self._forget(connection)
+            self._condition.notify()
+        self._close(connection)
+
+    def close_all(self):
+        with self._condition:
+            connections = [connection for connection, _ in self._idle]
+            self._idle.clear()
+            for connection in connections:
+                self._forget(connection)
+        for connection in connections:
+            self._close(connection)
+
+    def _take(self):
+        """Свободное соединение из очереди или место под новое
+        (вызывается под блокировкой).
+        """
+        if self._idle:
+            return self._idle.pop()
+        # Место под новое соединение занимаем до подключения, чтобы
+        # параллельные потоки не превысили размер пула.
+        self._pending += 1
+        return None
+
+    def _wait(self):
+        started = time.monotonic()
+        self.metrics['waits'] += 1
+        while not self._idle and self.open >= self.size:
+            remaining = self.timeout - (time.monotonic() - started)
+            if remaining <= 0:
+                self.metrics['timeouts'] += 1
+                raise PoolTimeout(
+                    f'Все {self.size} соединений пула заняты '
+                    f'дольше {self.timeout} с.'
+                )
+            self._condition.wait(remaining)
+        self.metrics['wait_seconds'] += time.monotonic() - started
+
+    def _healthy(self, connection, released):
+        if connection.closed:
+            return False
+        if time.monotonic() - released < self.check_interval:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            return True
+        except Exception:
+            with self._condition:
+                self.metrics['failed_checks'] += 1
+            return False
+
+    @staticmethod
+    def _reset(connection):
+        """Соединение возвращается в пул без открытой транзакции."""
+        try:
+            if connection.get_transaction_status():
+                connection.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _forget(self, connection):
+        """Соединение больше не числится в пуле (под блокировкой);
+        закрывается оно уже после её снятия.
+        """
+        self._created.pop(id(connection), None)
+        self.metrics['recycled'] += 1
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+def get_pool(alias, options):
+    """Пул процесса для алиаса базы. После fork (gunicorn --preload)
+    унаследованный пул не используется: его сокеты принадлежат
+    родительскому процессу.
+    """
+    pool = _pools.get(alias)
+    if pool is None or pool.pid != os.getpid():
+        with _pools_lock:
+            pool = _pools.get(alias)
+            if pool is None or pool.pid != os.getpid():
+                pool = _pools[alias] = ConnectionPool(**options)
+    return pool
+
+
+def pools():
+    return {alias: pool for alias, pool in _pools.items()
+            if pool.pid == os.getpid()}
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+_last_published = 0
+# pid -> номер слота, который занял воркер.
+_slots = {}
+
+
+def _claim_slot(cache, worker):
+    """Слот воркера в общем кэше. Каждый слот — отдельный ключ,
+    который занимается атомарным `add`, поэтому одновременно
+    публикующие воркеры не затирают друг друга.
+    """
+    slot = _slots.get(os.getpid())
+    if slot is not None and cache.get(SLOT_KEY.format(slot)) == worker:
+        cache.set(SLOT_KEY.format(slot), worker, STATS_TIMEOUT)
+        return slot
+    # Слот истёк и мог достаться другому воркеру: занимаем свободный.
+    start = zlib.crc32(worker.encode()) % SLOTS
+    for offset in range(SLOTS):
+        slot = (start + offset) % SLOTS
+        if cache.add(SLOT_KEY.format(slot), worker, STATS_TIMEOUT):
+            _slots[os.getpid()] = slot
+            return slot
+    return None
+
+
+def publish_stats(cache, force=False):
+    """Кладём метрики пулов процесса в общий кэш, чтобы команда
+    db_pool_stats могла собрать их со всех воркеров.
+    """
+    global _last_published
+    now = time.monotonic()
+    if not force and now - _last_published < STATS_PUBLISH_INTERVAL:
+        return
+    _last_published = now
+    worker = worker_id()
+    stats = {alias: pool.stats() for alias, pool in pools().items()}
+    cache.set(STATS_KEY.format(worker), stats, STATS_TIMEOUT)
+    _claim_slot(cache, worker)
+
+
+def collect_stats(cache):
+    slots = cache.get_many([SLOT_KEY.format(slot) for slot in range(SLOTS)])
+    found = cache.get_many(
+        [STATS_KEY.format(worker) for worker in set(slots.values())]
+    )
+    return {key.split(':', 2)[2]: value for key, value in found.items()}
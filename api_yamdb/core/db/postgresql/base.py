@@ -0,0 +1,58 @@
+"""PostgreSQL с пулом соединений (см. core.db.pool).
+
+Включается настройкой DB_POOL_SIZE: ENGINE меняется на этот модуль.
+Закрытие соединения Django возвращает его в пул, а постоянное
+соединение (CONN_MAX_AGE), простоявшее без запросов дольше
+`check_interval`, проверяется перед началом следующего запроса.
+"""
+import time
+
+from django.db.backends.postgresql import base
+
+from ..pool import get_pool
+
+POOL_DEFAULTS = {
+    'size': 10,
+    'max_idle': 5,
+    'timeout': 10,
+    'max_lifetime': 3600,
+    'check_interval': 30,
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._last_used = time.monotonic()
+
+    @property
+    def pool(self):
+        options = dict(POOL_DEFAULTS, **self.settings_dict.get('POOL', {}))
+        return get_pool(self.alias, options)
+
+    def get_new_connection(self, conn_params):
+        parent = super().get_new_connection
+        return self.pool.acquire(lambda: parent(conn_params))
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # Соединение после ошибки или брошенное посреди транзакции
+        # в пул не возвращаем.
+        autocommit = self.settings_dict['AUTOCOMMIT']
+        discard = (self.errors_occurred or self.in_atomic_block
+                   or self.get_autocommit() != autocommit)
+        self.pool.release(self.connection, discard=discard)
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        if self.connection is None:
+            return
+        now = time.monotonic()
+        idle = now - self._last_used
+        self._last_used = now
+        if (idle >= self.pool.check_interval and not self.in_atomic_block
+                and not self.is_usable()):
+            self.errors_occurred = True
+            self.close()
@@ -0,0 +1,87 @@
+"""Чтение с реплик, запись в основную базу.
+
+Реплика для чтения выбирается ReplicaRoutingMiddleware один раз на
+запрос и хранится в contextvar; вне запросов (команды, shell) и внутри
+транзакций основной базы всё читается из основной базы. Реплика
+проверяется не чаще раза в `DATABASE_REPLICA_HEALTH_INTERVAL` секунд;
+недоступная или отстающая больше `DATABASE_REPLICA_MAX_LAG` секунд
+реплика пропускается, а без живых реплик чтение идёт в основную базу.
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+_read_alias = ContextVar('read_alias', default=None)
+_health = {}
+
+
+def _check(alias):
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    'SELECT COALESCE(EXTRACT(EPOCH FROM now() - '
+                    'pg_last_xact_replay_timestamp()), 0)'
+                )
+                lag = cursor.fetchone()[0]
+                return lag <= settings.DATABASE_REPLICA_MAX_LAG
+            # Пустой файл SQLite открывается без ошибок, поэтому
+            # проверяем, что в базе есть таблицы.
+            cursor.execute('SELECT 1 FROM django_migrations LIMIT 1')
+            return True
+    except DatabaseError:
+        connection.close()
+        return False
+
+
+def is_healthy(alias):
+    healthy, checked = _health.get(alias, (None, 0))
+    now = time.monotonic()
+    if (healthy is None
+            or now - checked >= settings.DATABASE_REPLICA_HEALTH_INTERVAL):
+        healthy = _check(alias)
+        _health[alias] = (healthy, now)
+    return healthy
+
+
+def reset_health():
+    _health.clear()
+
+
+def choose_replica():
+    replicas = [alias for alias in settings.DATABASE_REPLICAS
+                if is_healthy(alias)]
+    return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def reading_from(alias):
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -1,7 +1,20 @@
-from django_filters import FilterSet, ModelChoiceFilter, CharFilter
+from django_filters import (CharFilter, ChoiceFilter, FilterSet,
+                            ModelChoiceFilter)
 
 from reviews.models import Categories, Genres, Title
 
+from .search import search_titles
+
+# Сортировки списка произведений; последнее поле уникально, поэтому
+# они же служат ключом для курсорной пагинации.
+TITLE_ORDERINGS = {
+    'rating': ('average_score', 'id'),
+    '-rating': ('-average_score', '-id'),
+    'review_count': ('review_count', 'id'),
+    '-review_count': ('-review_count', '-id'),
+}
+DEFAULT_TITLE_ORDERING = ('-year', '-id')
+
 
 class TitlesFilter(FilterSet):
     category = ModelChoiceFilter(field_name="category",
@@ -11,7 +24,18 @@ class TitlesFilter(FilterSet):
                               to_field_name='slug',
                               queryset=Genres.objects.all())
     name = CharFilter(lookup_expr='contains')
+    search = CharFilter(method='filter_search')
+    ordering = ChoiceFilter(
+        choices=[(name, name) for name in TITLE_ORDERINGS],
+        method='filter_ordering',
+    )
 
     class Meta:
         model = Title
         fields = ('year',)
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+    def filter_ordering(self, queryset, name, value):
+        return queryset.order_by(*TITLE_ORDERINGS[value])
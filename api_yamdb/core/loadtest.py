@@ -0,0 +1,91 @@
+"""Нагрузочный тест по HTTP: пропускная способность и задержки.
+
+В отличие от core.benchmark запросы идут к работающему серверу
+(gunicorn за nginx), поэтому в замер попадают модель воркеров,
+keepalive и кэширование на nginx. Каждый поток держит своё
+keep-alive соединение и по кругу запрашивает заданные URL. Заголовок
+X-Cache-Status от nginx подсчитывается отдельно.
+"""
+import http.client
+import itertools
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from .benchmark import percentile
+
+
+class _Client:
+
+    def __init__(self, url, headers, timeout):
+        parts = urlsplit(url)
+        connection_class = (http.client.HTTPSConnection
+                            if parts.scheme == 'https'
+                            else http.client.HTTPConnection)
+        self.connection = connection_class(parts.netloc, timeout=timeout)
+        self.headers = headers
+
+    def get(self, url):
+        parts = urlsplit(url)
+        path = parts.path + (f'?{parts.query}' if parts.query else '')
+        try:
+            self.connection.request('GET', path, headers=self.headers)
+            response = self.connection.getresponse()
+            response.read()
+            if response.getheader('Connection', '').lower() == 'close':
+                self.connection.close()
+            return response.status, response.getheader('X-Cache-Status')
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            return None, None
+
+
+def run_load(urls, concurrency=16, duration=10.0, headers=None,
+             timeout=10.0):
+    """Запросы к `urls` из `concurrency` потоков в течение `duration`
+    секунд. Ошибки соединения считаются с кодом None.
+    """
+    deadline = time.monotonic() + duration
+    lock = threading.Lock()
+    timings, statuses, cache = [], Counter(), Counter()
+
+    def worker(offset):
+        client = _Client(urls[0], headers or {}, timeout)
+        local_timings, local_statuses, local_cache = [], Counter(), Counter()
+        for url in itertools.islice(itertools.cycle(urls), offset, None):
+            if time.monotonic() >= deadline:
+                break
+            started = time.perf_counter()
+            status, cache_status = client.get(url)
+            local_timings.append((time.perf_counter() - started) * 1000)
+            local_statuses[status] += 1
+            if cache_status:
+                local_cache[cache_status] += 1
+        client.connection.close()
+        with lock:
+            timings.extend(local_timings)
+            statuses.update(local_statuses)
+            cache.update(local_cache)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+    elapsed = time.monotonic() - started
+    if not timings:
+        raise ValueError('Не выполнено ни одного запроса.')
+    errors = sum(count for status, count in statuses.items()
+                 if status is None or status >= 500)
+    return {
+        'requests': len(timings),
+        'errors': errors,
+        'rps': round(len(timings) / elapsed, 1),
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'p99_ms': round(percentile(timings, 99), 2),
+        'statuses': {str(status): count for status, count in statuses.items()},
+        'cache': dict(cache),
+        'concurrency': concurrency,
+        'duration': round(elapsed, 2),
+    }
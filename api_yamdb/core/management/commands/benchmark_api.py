@@ -0,0 +1,88 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import ROUTES, compare, run_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время ответа (p50/p95/p99), число запросов к базе и '
+        'память для каждого маршрута API и сравнивает с базовым прогоном.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', action='store_true',
+            help='Наполнить базу синтетическими данными на время '
+                 'замеров (изменения откатываются).'
+        )
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--reviews-per-title', type=int, default=20)
+        parser.add_argument('--comments-per-review', type=int, default=2)
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument(
+            '--route', nargs='+', choices=[route.name for route in ROUTES],
+            help='Замерять только указанные маршруты.'
+        )
+        parser.add_argument(
+            '--warm-cache', action='store_true',
+            help='Не сбрасывать кэш ответов перед запросами.'
+        )
+        parser.add_argument('--output', help='Файл для результатов (JSON).')
+        parser.add_argument('--baseline', help='Базовый прогон (JSON).')
+        parser.add_argument(
+            '--threshold', type=float, default=0.1,
+            help='Допустимое замедление p95 относительно базы (0.1 = 10%%).'
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations должен быть положительным.')
+        volumes = None
+        if options['seed']:
+            volumes = {
+                'titles': options['titles'],
+                'genres': options['genres'],
+                'reviews_per_title': options['reviews_per_title'],
+                'comments_per_review': options['comments_per_review'],
+            }
+            if min(volumes.values()) < 1:
+                raise CommandError('Объёмы данных должны быть положительными.')
+        routes = ROUTES
+        if options['route']:
+            routes = [route for route in ROUTES
+                      if route.name in options['route']]
+        try:
+            results = run_benchmark(
+                volumes, options['iterations'], routes,
+                cold_cache=not options['warm_cache'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        self.report(results)
+        if options['output']:
+            with open(options['output'], 'w') as stream:
+                json.dump(results, stream, indent=2, ensure_ascii=False)
+        if options['baseline']:
+            with open(options['baseline']) as stream:
+                baseline = json.load(stream)
+            regressions = compare(results, baseline, options['threshold'])
+            if regressions:
+                raise CommandError(
+                    'Регрессии производительности:\n' + '\n'.join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"маршрут":<18}{"код":>5}{"p50":>9}{"p95":>9}{"p99":>9}'
+            f'{"запросы":>9}{"КБ":>9}'
+        )
+        for name, row in results['routes'].items():
+            self.stdout.write(
+                f'{name:<18}{row["status"]:>5}{row["p50_ms"]:>9.2f}'
+                f'{row["p95_ms"]:>9.2f}{row["p99_ms"]:>9.2f}'
+                f'{row["queries"]:>9}{row["memory_kb"]:>9.1f}'
+            )
@@ -0,0 +1,56 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import benchmark_json
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время рендеринга и разбора JSON рендерером API '
+        'и рендерером DRF на списках произведений и отзывов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', action='store_true',
+            help='Наполнить базу синтетическими данными на время '
+                 'замеров (изменения откатываются).'
+        )
+        parser.add_argument('--titles', type=int, default=500)
+        parser.add_argument(
+            '--limit', type=int, default=100,
+            help='Объектов в одном ответе.'
+        )
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--output', help='Файл для результатов (JSON).')
+
+    def handle(self, *args, **options):
+        if min(options['limit'], options['iterations']) < 1:
+            raise CommandError('--limit и --iterations должны быть '
+                               'положительными.')
+        volumes = None
+        if options['seed']:
+            volumes = {'titles': options['titles'], 'reviews_per_title': 5,
+                       'comments_per_review': 0}
+        try:
+            results = benchmark_json(
+                options['limit'], options['iterations'], volumes
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(f'orjson: {results["meta"]["orjson"] or "нет"}')
+        self.stdout.write(
+            f'{"данные":<9}{"рендерер":<18}{"байт":>8}{"render p50":>12}'
+            f'{"p95":>9}{"parse p50":>11}{"p95":>9}'
+        )
+        for payload, renderers in results['payloads'].items():
+            for name, row in renderers.items():
+                self.stdout.write(
+                    f'{payload:<9}{name:<18}{row["bytes"]:>8}'
+                    f'{row["render_p50_ms"]:>12}{row["render_p95_ms"]:>9}'
+                    f'{row["parse_p50_ms"]:>11}{row["parse_p95_ms"]:>9}'
+                )
+        if options['output']:
+            with open(options['output'], 'w') as stream:
+                json.dump(results, stream, indent=2, ensure_ascii=False)
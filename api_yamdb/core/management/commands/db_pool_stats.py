@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from core import cache as response_cache
+from core.db.pool import collect_stats
+
+COLUMNS = ('open', 'in_use', 'idle', 'checkouts', 'reused', 'created',
+           'waits', 'timeouts', 'recycled', 'failed_checks')
+
+
+class Command(BaseCommand):
+    help = ('Показывает метрики пулов соединений с базой, опубликованные '
+            'воркерами в общий кэш.')
+
+    def handle(self, *args, **options):
+        workers = collect_stats(response_cache.get_cache())
+        if not workers:
+            self.stdout.write('Нет данных: пул выключен или воркеры '
+                              'ещё не обработали запросов.')
+            return
+        totals = dict.fromkeys(COLUMNS + ('wait_seconds',), 0)
+        for worker, pools in sorted(workers.items()):
+            for alias, stats in sorted(pools.items()):
+                self.stdout.write(f'{worker} {alias} ' + ' '.join(
+                    f'{name}={stats[name]}' for name in COLUMNS
+                ) + f' wait={stats["wait_seconds"]:.3f}s')
+                for name in totals:
+                    totals[name] += stats[name]
+        reuse = (totals['reused'] / totals['checkouts']
+                 if totals['checkouts'] else 0)
+        self.stdout.write(
+            f'всего: checkouts={totals["checkouts"]} '
+            f'created={totals["created"]} waits={totals["waits"]} '
+            f'wait={totals["wait_seconds"]:.3f}s reuse_ratio={reuse:.2%}'
+        )
@@ -0,0 +1,59 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.loadtest import run_load
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест работающего сервера: запросы в секунду, '
+        'p50/p95/p99 и коды ответов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help='Запрашиваемые URL.')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument(
+            '--duration', type=float, default=30, help='Секунды.'
+        )
+        parser.add_argument(
+            '--header', action='append', default=[],
+            help='Заголовок запроса "Имя: значение" (можно повторять).'
+        )
+        parser.add_argument('--output', help='Файл для результатов (JSON).')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['duration'] <= 0:
+            raise CommandError('Укажите положительные --concurrency '
+                               'и --duration.')
+        headers = {}
+        for header in options['header']:
+            name, separator, value = header.partition(':')
+            if not separator:
+                raise CommandError(f'Неверный заголовок: {header}')
+            headers[name.strip()] = value.strip()
+        try:
+            result = run_load(
+                options['urls'], options['concurrency'],
+                options['duration'], headers,
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(
+            f'запросов={result["requests"]} ошибок={result["errors"]} '
+            f'rps={result["rps"]} p50={result["p50_ms"]}мс '
+            f'p95={result["p95_ms"]}мс p99={result["p99_ms"]}мс'
+        )
+        self.stdout.write('коды: ' + ' '.join(
+            f'{status}={count}'
+            for status, count in sorted(result['statuses'].items())
+        ))
+        if result['cache']:
+            self.stdout.write('кэш nginx: ' + ' '.join(
+                f'{status}={count}'
+                for status, count in sorted(result['cache'].items())
+            ))
+        if options['output']:
+            with open(options['output'], 'w') as stream:
+                json.dump(result, stream, indent=2, ensure_ascii=False)
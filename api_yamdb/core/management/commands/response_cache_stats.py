@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core import cache as response_cache
+
+
+class Command(BaseCommand):
+    help = 'Показывает число попаданий и промахов кэша ответов API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true', help='Обнулить счётчики.'
+        )
+
+    def handle(self, *args, **options):
+        stats = response_cache.stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        self.stdout.write(
+            f'hits={stats["hits"]} misses={stats["misses"]} '
+            f'hit_ratio={ratio:.2%}'
+        )
+        if options['reset']:
+            response_cache.reset_stats()
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.outbox import send_pending
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящих (outbox).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Писем за одно соединение с почтовым сервером.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, проверяя очередь каждые --interval с.'
+        )
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent, failed = self._drain(options['batch_size'])
+            except OSError as error:
+                # Почтовый сервер недоступен: письма остаются в очереди.
+                if not options['loop']:
+                    raise
+                self.stderr.write(f'Ошибка соединения: {error!r}')
+                sent = failed = 0
+            if sent or failed:
+                self.stdout.write(f'Отправлено: {sent}, ошибок: {failed}')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
+
+    def _drain(self, batch_size):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_pending(batch_size)
+            total_sent += sent
+            total_failed += failed
+            if sent + failed < batch_size:
+                return total_sent, total_failed
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from core.warmup import warmup
+
+
+class Command(BaseCommand):
+    help = ('Прогревает импорты, маршруты, сериализаторы и соединение с '
+            'базой и выводит время каждой фазы.')
+
+    def handle(self, *args, **options):
+        for name, (ms, count) in warmup().items():
+            suffix = f' ({count})' if count is not None else ''
+            self.stdout.write(f'{name:<12}{ms:>10.2f} мс{suffix}')
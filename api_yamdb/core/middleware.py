@@ -0,0 +1,149 @@
+import hashlib
+import hmac
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from . import cache as response_cache
+from .db_router import choose_replica, reading_from
+from .performance import current_trace, finish_trace, start_trace
+
+logger = logging.getLogger('yamdb.performance')
+
+FORCE_HEADER = 'HTTP_X_PERFORMANCE_TRACE'
+
+
+class PerformanceMiddleware:
+    """Замеряет запросы к базе, сериализацию и представление.
+
+    В выборку попадает доля запросов `PERFORMANCE_SAMPLE_RATE`; для
+    остальных middleware не делает ничего. Замеры выбранных запросов
+    пишутся одной JSON-строкой в лог `yamdb.performance`; повторяющиеся
+    запросы (N+1) попадают в лог с предупреждением. Запрос с заголовком
+    `X-Performance-Trace`, равным `PERFORMANCE_TRACE_SECRET`, замеряется
+    всегда, и замеры отдаются ему в заголовке `Server-Timing`; без
+    секрета заголовок не действует.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    @staticmethod
+    def forced(request):
+        secret = settings.PERFORMANCE_TRACE_SECRET
+        value = request.META.get(FORCE_HEADER)
+        return bool(secret and value) and hmac.compare_digest(
+            value.encode(), secret.encode()
+        )
+
+    def sampled(self, request):
+        rate = settings.PERFORMANCE_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    def __call__(self, request):
+        forced = self.forced(request)
+        if not forced and not self.sampled(request):
+            return self.get_response(request)
+        trace, token = start_trace()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(trace.execute_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            finish_trace(token)
+        finished = time.perf_counter()
+        view_started = getattr(request, '_performance_view_started', None)
+        timings = {
+            'total': finished - trace.started,
+            'view': finished - view_started if view_started else 0.0,
+            'db': trace.db_time,
+            'serializer': trace.phases['serializer'],
+        }
+        duplicates = trace.duplicates(settings.PERFORMANCE_DUPLICATE_THRESHOLD)
+        if forced:
+            response['Server-Timing'] = self.server_timing(
+                timings, trace.query_count, len(duplicates)
+            )
+        self.log(request, response, timings, trace.query_count, duplicates)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if current_trace() is not None:
+            request._performance_view_started = time.perf_counter()
+
+    @staticmethod
+    def server_timing(timings, query_count, duplicate_count):
+        metrics = []
+        for name, seconds in timings.items():
+            metric = f'{name};dur={seconds * 1000:.2f}'
+            if name == 'db':
+                metric += f';desc="{query_count} queries"'
+            metrics.append(metric)
+        if duplicate_count:
+            metrics.append(f'n-plus-one;desc="{duplicate_count} repeated"')
+        return ', '.join(metrics)
+
+    @staticmethod
+    def log(request, response, timings, query_count, duplicates):
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': query_count,
+            'duplicates': duplicates,
+        }
+        record.update(
+            (f'{name}_ms', round(seconds * 1000, 2))
+            for name, seconds in timings.items()
+        )
+        level = logging.WARNING if duplicates else logging.INFO
+        logger.log(level, json.dumps(record, ensure_ascii=False),
+                   extra={'performance': record})
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRoutingMiddleware:
+    """Направляет чтение безопасных запросов на реплику.
+
+    После небезопасного запроса клиент (по заголовку Authorization,
+    без него — по IP) на `DATABASE_REPLICA_STICKY_SECONDS` секунд
+    читает из основной базы, чтобы видеть свои изменения, даже если
+    реплика ещё отстаёт. Отметка хранится в общем кэше, поэтому
+    действует во всех воркерах.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    @staticmethod
+    def sticky_key(request):
+        client = (request.META.get('HTTP_AUTHORIZATION')
+                  or request.META.get('HTTP_X_REAL_IP')
+                  or request.META.get('REMOTE_ADDR', ''))
+        return 'db-sticky:{}'.format(
+            hashlib.md5(client.encode()).hexdigest()
+        )
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        cache = response_cache.get_cache()
+        key = self.sticky_key(request)
+        alias = DEFAULT_DB_ALIAS
+        if request.method in SAFE_METHODS and not cache.get(key):
+            alias = choose_replica()
+        with reading_from(alias):
+            response = self.get_response(request)
+        if request.method not in SAFE_METHODS:
+            cache.set(key, True, settings.DATABASE_REPLICA_STICKY_SECONDS)
+        return response
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class CreatedModel(models.Model):
@@ -11,3 +12,48 @@ class CreatedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку (outbox).
+
+    Создаётся в той же транзакции, что и связанные данные, и
+    отправляется отдельно командой send_outbox.
+    """
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.CharField(max_length=254, verbose_name='Отправитель')
+    recipients = models.TextField(
+        verbose_name='Получатели',
+        help_text='Адреса через перевод строки.'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True, verbose_name='Дата создания'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Попыток отправки'
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now, verbose_name='Следующая попытка'
+    )
+    sent_at = models.DateTimeField(
+        null=True, blank=True, verbose_name='Дата отправки'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+
+    class Meta:
+        ordering = ('next_attempt_at',)
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=models.Q(sent_at__isnull=True),
+                name='outgoing_email_pending',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {self.recipients}'
+
+    def recipient_list(self):
+        return self.recipients.split()
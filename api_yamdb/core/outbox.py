@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+def enqueue_mail(subject, message, from_email, recipient_list):
+    """Ставим письмо в очередь; вызывается внутри транзакции,
+    сохраняющей связанные данные.
+    """
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email,
+        recipients='\n'.join(recipient_list),
+    )
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    seconds = settings.OUTBOX_RETRY_BASE_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.OUTBOX_RETRY_MAX_DELAY))
+
+
+def send_pending(batch_size=100):
+    """Отправляем одну пачку готовых к отправке писем через одно
+    соединение с почтовым сервером. Возвращает (отправлено, ошибок).
+
+    Строки блокируются до конца транзакции; на PostgreSQL с
+    SKIP LOCKED, так что несколько воркеров не отправят письмо дважды.
+    """
+    now = timezone.now()
+    pending = OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        attempts__lt=settings.OUTBOX_MAX_ATTEMPTS,
+        next_attempt_at__lte=now,
+    ).order_by('next_attempt_at')
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    sent, failed = [], []
+    with transaction.atomic():
+        batch = list(
+            pending.select_for_update(skip_locked=skip_locked)[:batch_size]
+        )
+        if not batch:
+            return 0, 0
+        mail_connection = get_connection(fail_silently=False)
+        with mail_connection:
+            for email in batch:
+                message = EmailMessage(
+                    email.subject, email.body, email.from_email,
+                    email.recipient_list(), connection=mail_connection,
+                )
+                try:
+                    message.send()
+                except Exception as error:
+                    email.attempts += 1
+                    email.next_attempt_at = now + retry_delay(email.attempts)
+                    email.last_error = repr(error)
+                    failed.append(email)
+                else:
+                    email.attempts += 1
+                    email.sent_at = timezone.now()
+                    sent.append(email)
+        OutgoingEmail.objects.bulk_update(
+            sent, ('attempts', 'sent_at')
+        )
+        OutgoingEmail.objects.bulk_update(
+            failed, ('attempts', 'next_attempt_at', 'last_error')
+        )
+    return len(sent), len(failed)
@@ -0,0 +1,103 @@
+"""Замеры времени обработки запроса: SQL, сериализация, представление.
+
+Трасса текущего запроса хранится в contextvar и создаётся только для
+запросов, попавших в выборку PerformanceMiddleware; вне трассы
+обёртки ничего не замеряют.
+"""
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current_trace = ContextVar('performance_trace', default=None)
+
+_IN_LIST = re.compile(r'\((?:\s*%s\s*,)*\s*%s\s*\)')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+
+
+def fingerprint(sql):
+    """SQL без значений: запросы, отличающиеся только параметрами
+    или длиной списка IN, дают один отпечаток.
+    """
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    return _IN_LIST.sub('(...)', sql)
+
+
+class Trace:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = Counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.phases = Counter()
+        self._depth = Counter()
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.query_count += 1
+            self.queries[fingerprint(sql)] += 1
+
+    @contextmanager
+    def phase(self, name):
+        # Вложенные вызовы (сериализатор внутри сериализатора) не
+        # должны учитываться повторно.
+        self._depth[name] += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth[name] -= 1
+            if not self._depth[name]:
+                self.phases[name] += time.perf_counter() - started
+
+    def duplicates(self, threshold):
+        return [
+            {'sql': sql, 'count': count}
+            for sql, count in self.queries.most_common()
+            if count >= threshold
+        ]
+
+
+def start_trace():
+    trace = Trace()
+    return trace, _current_trace.set(trace)
+
+
+def finish_trace(token):
+    _current_trace.reset(token)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def timed(name):
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    with trace.phase(name):
+        yield
+
+
+class TimedSerializerMixin:
+    """Учитывает время сериализации и проверки данных в трассе
+    запроса (фаза `serializer`).
+    """
+
+    def to_representation(self, instance):
+        with timed('serializer'):
+            return super().to_representation(instance)
+
+    def run_validation(self, *args, **kwargs):
+        with timed('serializer'):
+            return super().run_validation(*args, **kwargs)
@@ -0,0 +1,142 @@
+"""Полнотекстовый поиск произведений по названию и описанию.
+
+На PostgreSQL используются GIN-индексы: по выражению tsvector для
+названия и описания и триграммный по названию (он же ускоряет фильтр
+`name` c LIKE '%...%'). На SQLite — внешняя таблица FTS5, которую
+триггеры держат в актуальном состоянии. Индексы создаются миграцией.
+"""
+import re
+
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector, TrigramSimilarity)
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'simple'
+TITLE_TABLE = 'reviews_title'
+FTS_TABLE = 'reviews_title_fts'
+
+POSTGRESQL_INDEXES = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    f'CREATE INDEX IF NOT EXISTS reviews_title_name_trgm '
+    f'ON {TITLE_TABLE} USING gin (name gin_trgm_ops)',
+    # Выражение должно совпадать с тем, что строит SearchVector ниже,
+    # иначе планировщик не узнает индекс.
+    f'CREATE INDEX IF NOT EXISTS reviews_title_search_vector '
+    f'ON {TITLE_TABLE} USING gin (to_tsvector('
+    f"'{SEARCH_CONFIG}'::regconfig, COALESCE(name, '') || ' ' || "
+    f"COALESCE(description, '')))",
+)
+POSTGRESQL_DROP = (
+    'DROP INDEX IF EXISTS reviews_title_search_vector',
+    'DROP INDEX IF EXISTS reviews_title_name_trgm',
+)
+
+SQLITE_INDEXES = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+    f"name, description, content='{TITLE_TABLE}', content_rowid='id')",
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert '
+    f'AFTER INSERT ON {TITLE_TABLE} BEGIN '
+    f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    f'VALUES (new.id, new.name, new.description); END',
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete '
+    f'AFTER DELETE ON {TITLE_TABLE} BEGIN '
+    f'INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) '
+    f"VALUES ('delete', old.id, old.name, old.description); END",
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update '
+    f'AFTER UPDATE OF name, description ON {TITLE_TABLE} BEGIN '
+    f'INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) '
+    f"VALUES ('delete', old.id, old.name, old.description); "
+    f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    f'VALUES (new.id, new.name, new.description); END',
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+SQLITE_DROP = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+
+def _execute(connection, statements):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def create_search_index(connection):
+    if connection.vendor == 'postgresql':
+        _execute(connection, POSTGRESQL_INDEXES)
+    elif connection.vendor == 'sqlite':
+        _execute(connection, SQLITE_INDEXES)
+
+
+def drop_search_index(connection):
+    if connection.vendor == 'postgresql':
+        _execute(connection, POSTGRESQL_DROP)
+    elif connection.vendor == 'sqlite':
+        _execute(connection, SQLITE_DROP)
+
+
+def ensure_search_index(connection):
+    """Восстанавливаем триггеры FTS5, если SQLite пересоздал таблицу
+    произведений при очередной миграции (при этом триггеры удаляются).
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, count(*) FROM sqlite_master WHERE name LIKE %s "
+            'GROUP BY type', [f'{FTS_TABLE}%']
+        )
+        found = dict(cursor.fetchall())
+    if found.get('table') and found.get('trigger') != 3:
+        create_search_index(connection)
+
+
+def search_titles(queryset, query):
+    """Отбираем произведения по запросу и сортируем по релевантности.
+
+    Каждое слово запроса ищется как префикс. Релевантность доступна
+    в аннотации `search_rank` (чем больше, тем выше).
+    """
+    terms = re.findall(r'\w+', query)
+    if not terms:
+        return queryset.none()
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        vector = SearchVector('name', 'description', config=SEARCH_CONFIG)
+        tsquery = SearchQuery(
+            ' & '.join(f'{term}:*' for term in terms),
+            config=SEARCH_CONFIG, search_type='raw'
+        )
+        queryset = queryset.annotate(
+            search=vector,
+            search_rank=(SearchRank(vector, tsquery)
+                         + TrigramSimilarity('name', query)),
+        ).filter(Q(search=tsquery) | Q(name__trigram_similar=query))
+    elif vendor == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        # filter(id__in=RawSQL(...)) даёт «IN ((SELECT ...))», что SQLite
+        # понимает как скалярный подзапрос и берёт только первую строку.
+        queryset = queryset.extra(
+            where=[f'{TITLE_TABLE}.id IN (SELECT rowid FROM {FTS_TABLE} '
+                   f'WHERE {FTS_TABLE} MATCH %s)'],
+            params=[match],
+        ).annotate(search_rank=RawSQL(
+            f'SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = {TITLE_TABLE}.id',
+            (match,), output_field=FloatField()
+        ))
+    else:
+        condition = Q()
+        for term in terms:
+            condition &= (
+                Q(name__icontains=term) | Q(description__icontains=term)
+            )
+        queryset = queryset.filter(condition).annotate(
+            search_rank=Value(0, output_field=FloatField())
+        )
+    return queryset.order_by('-search_rank', 'id')
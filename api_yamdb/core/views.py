@@ -0,0 +1,26 @@
+from django.db import DatabaseError, connection
+from django.http import JsonResponse
+
+from .warmup import phases, start_warmup
+
+
+def healthz(request):
+    """Процесс жив и отвечает; база не проверяется."""
+    return JsonResponse({'status': 'ok'})
+
+
+def readyz(request):
+    """Процесс прогрет и база доступна — можно направлять трафик.
+    Неудавшийся прогрев запускается снова в фоне; до его окончания
+    ответ — 503.
+    """
+    if not start_warmup():
+        return JsonResponse({'status': 'starting'}, status=503)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except DatabaseError as error:
+        return JsonResponse(
+            {'status': 'unavailable', 'database': str(error)}, status=503
+        )
+    return JsonResponse({'status': 'ready', 'startup_ms': phases()})
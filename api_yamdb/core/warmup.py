@@ -0,0 +1,192 @@
+"""Прогрев процесса перед приёмом запросов.
+
+Фазы: импорт модулей приложений, построение URL-резолвера и разбор
+каждого маршрута API, построение полей всех сериализаторов и
+обращение к базе: открытие соединения (и пула) и первые страницы
+каталога. Кэш ответов не заполняется: его ключи зависят от Host
+и заголовков согласования настоящих клиентов, и прогретые записи
+с ними почти не совпадали бы. Время каждой фазы пишется в лог
+`yamdb.startup`. Пока прогрев не завершён, /readyz отвечает 503.
+Прогрев, который не удался (база ещё не принимает соединения или не
+применены миграции), /readyz запускает снова в фоне не чаще раза
+в WARMUP_RETRY_INTERVAL секунд.
+"""
+import inspect
+import json
+import logging
+import threading
+import time
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import get_resolver, resolve, reverse
+from django.utils.module_loading import module_has_submodule
+
+logger = logging.getLogger('yamdb.startup')
+
+MODULES = ('models', 'signals', 'admin', 'filters', 'serializer',
+           'serializers', 'views', 'urls')
+
+_state = {'ready': False, 'phases': {}, 'failed_at': None, 'thread': None}
+_lock = threading.Lock()
+
+
+def record_phase(name, seconds):
+    _state['phases'][name] = round(seconds * 1000, 2)
+    logger.info(json.dumps(
+        {'phase': name, 'ms': _state['phases'][name]}, ensure_ascii=False
+    ))
+
+
+def is_ready():
+    return _state['ready']
+
+
+def mark_ready():
+    """Прогрев отключён: процесс готов сразу."""
+    _state['ready'] = True
+
+
+def phases():
+    return dict(_state['phases'])
+
+
+def import_modules():
+    count = 0
+    for app_config in apps.get_app_configs():
+        for name in MODULES:
+            if module_has_submodule(app_config.module, name):
+                import_module(f'{app_config.name}.{name}')
+                count += 1
+    return count
+
+
+def resolve_routes():
+    """Разбираем пример пути для каждого маршрута API: строятся
+    регулярные выражения резолвера и кэш reverse().
+    """
+    from api.urls import router
+    get_resolver()
+    count = 0
+    for pattern in router.urls:
+        groups = pattern.pattern.regex.groupindex
+        if pattern.name is None or 'format' in groups:
+            continue
+        path = reverse(pattern.name, kwargs=dict.fromkeys(groups, '1'))
+        resolve(path)
+        count += 1
+    return count
+
+
+def build_serializers():
+    from rest_framework import serializers
+    from rest_framework.request import Request
+
+    from api import serializer as module
+    request = Request(RequestFactory().get('/'))
+    context = {'request': request, 'view': SimpleNamespace(action='list')}
+    count = 0
+    for _, serializer_class in inspect.getmembers(module, inspect.isclass):
+        if (issubclass(serializer_class, serializers.BaseSerializer)
+                and serializer_class.__module__ == module.__name__):
+            serializer_class(context=context).fields
+            count += 1
+    return count
+
+
+def warm_database():
+    """Открываем соединение с базой и читаем первые страницы каталога:
+    первый запрос клиента не ждёт подключения, а база — чтения с диска.
+    """
+    from reviews.models import Categories, Genres, Title
+    querysets = (
+        Categories.objects.all(),
+        Genres.objects.all(),
+        Title.objects.select_related('category').prefetch_related('genre'),
+    )
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    for queryset in querysets:
+        list(queryset.order_by('pk')[:page_size])
+    return len(querysets)
+
+
+PHASES = (
+    ('imports', import_modules),
+    ('urls', resolve_routes),
+    ('serializers', build_serializers),
+    ('database', warm_database),
+)
+
+
+def warmup():
+    """Выполняем все фазы и отмечаем процесс готовым. Возвращает
+    {фаза: (время в мс, число объектов)}.
+    """
+    started = time.perf_counter()
+    results = {}
+    for name, phase in PHASES:
+        phase_started = time.perf_counter()
+        count = phase()
+        record_phase(name, time.perf_counter() - phase_started)
+        results[name] = (_state['phases'][name], count)
+    record_phase('warmup', time.perf_counter() - started)
+    results['warmup'] = (_state['phases']['warmup'], None)
+    _state['ready'] = True
+    return results
+
+
+def try_warmup():
+    """Прогреваем процесс, если он ещё не готов и с прошлой неудачной
+    попытки прошло WARMUP_RETRY_INTERVAL секунд. Ошибку прогрева пишем
+    в лог и не пробрасываем. Возвращает готовность процесса.
+    """
+    if _state['ready']:
+        return True
+    if not _retry_due():
+        return False
+    # Одновременные проверки не запускают прогрев параллельно.
+    if not _lock.acquire(blocking=False):
+        return False
+    try:
+        if not _state['ready']:
+            warmup()
+    except Exception:
+        _state['failed_at'] = time.monotonic()
+        logger.exception('Прогрев не удался')
+    finally:
+        _lock.release()
+    return _state['ready']
+
+
+def _retry_due():
+    failed_at = _state['failed_at']
+    return (failed_at is None or time.monotonic() - failed_at
+            >= settings.WARMUP_RETRY_INTERVAL)
+
+
+def _warmup_in_background():
+    try:
+        try_warmup()
+    finally:
+        # Соединения этого потока возвращаются в пул.
+        connections.close_all()
+
+
+def start_warmup():
+    """Для /readyz: готовность без ожидания. Если процесс не готов,
+    прогрев запускается в фоновом потоке (не больше одного за раз),
+    чтобы проверка укладывалась в таймаут healthcheck.
+    """
+    if _state['ready']:
+        return True
+    thread = _state['thread']
+    if (thread is None or not thread.is_alive()) and _retry_due():
+        thread = _state['thread'] = threading.Thread(
+            target=_warmup_in_background, name='warmup', daemon=True
+        )
+        thread.start()
+    return False
@@ -0,0 +1,122 @@
+"""Настройки gunicorn для контейнера web.
+
+Значения по умолчанию рассчитаны на число ядер контейнера и
+переопределяются переменными окружения GUNICORN_*. Приложение
+загружается в мастер-процессе до fork (preload), поэтому соединения
+с базой и кэшем, открытые при загрузке, закрываются до запуска
+воркеров: каждый воркер открывает свои.
+"""
+import faulthandler
+import os
+import sys
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+# Ядра, доступные контейнеру, а не все ядра хоста.
+cpu_count = len(os.sched_getaffinity(0))
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+
+# gthread: медленный запрос (выгрузка, отправка в базу) занимает один
+# поток, а не весь воркер. Размер пула соединений с базой (DB_POOL_SIZE)
+# должен быть не меньше числа потоков.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = _env_int('GUNICORN_THREADS', 4)
+# Ожидание ввода-вывода в gthread покрывают потоки, поэтому процессов
+# меньше, чем для sync: это же держит в рамках число соединений с базой
+# (воркеры x DB_POOL_SIZE).
+workers = _env_int(
+    'GUNICORN_WORKERS',
+    cpu_count + 1 if worker_class == 'gthread' else cpu_count * 2 + 1
+)
+
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') == '1'
+
+# Перезапуск воркера после N запросов ограничивает рост памяти;
+# разброс не даёт всем воркерам перезапуститься одновременно.
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+# Дольше, чем keepalive_timeout соединений nginx с upstream (60 с):
+# соединение первым закрывает nginx, и запрос не попадает в закрытый
+# gunicorn сокет.
+keepalive = _env_int('GUNICORN_KEEPALIVE', 65)
+
+# Воркер, не отметившийся за timeout секунд, перезапускается мастером.
+# Отметки пишутся в /dev/shm, чтобы медленный диск не выдавал живой
+# воркер за зависший.
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+worker_tmp_dir = os.getenv('GUNICORN_WORKER_TMP_DIR', '/dev/shm')
+
+# Прогрев (core.warmup) до приёма запросов: при preload — один раз
+# в мастере, воркеры наследуют результат; иначе — в каждом воркере.
+# Неудавшийся прогрев повторяет /readyz; без прогрева процесс готов
+# сразу.
+warmup = os.getenv('GUNICORN_WARMUP', '1') == '1'
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+# %(L)s — время ответа в секундах, %({x-cache}o)s — попадание в кэш.
+access_log_format = (
+    '%(h)s "%(r)s" %(s)s %(b)s %(L)ss pid=%(p)s cache=%({x-cache}o)s'
+)
+
+
+def _warmup(log):
+    from core.warmup import mark_ready, try_warmup
+    if not warmup:
+        mark_ready()
+    elif not try_warmup():
+        # /readyz отвечает 503 и повторяет прогрев, пока тот не удастся
+        # (база ещё не принимает соединения, не применены миграции).
+        log.warning('Прогрев не удался, /readyz повторит его')
+
+
+def when_ready(server):
+    """Мастер загрузил приложение: прогреваем его и закрываем
+    соединения, иначе сокеты унаследуют все воркеры.
+    """
+    if not preload_app:
+        return
+    _warmup(server.log)
+    from django.core.cache import caches
+    from django.db import connections
+
+    from core.db.pool import pools
+    for connection in connections.all():
+        connection.close()
+    # С пулом (DB_POOL_SIZE) close() только возвращает соединение
+    # в пул мастера: закрываем и его.
+    for pool in pools().values():
+        pool.close_all()
+    for cache in caches.all():
+        cache.close()
+    server.log.info('Приложение загружено, воркеров: %s x %s потоков',
+                    workers, threads)
+
+
+def post_fork(server, worker):
+    # Пулы соединений (core.db.pool) заводятся заново по pid воркера.
+    server.log.info('Воркер %s запущен', worker.pid)
+
+
+def post_worker_init(worker):
+    if not preload_app:
+        _warmup(worker.log)
+
+
+def worker_abort(worker):
+    """Воркер завис дольше timeout: пишем стеки всех потоков, чтобы
+    было видно, на каком запросе он остановился.
+    """
+    worker.log.warning('Воркер %s завис, стеки потоков:', worker.pid)
+    faulthandler.dump_traceback(file=sys.stderr, all_threads=True)
+
+
+def child_exit(server, worker):
+    server.log.info('Воркер %s завершился', worker.pid)
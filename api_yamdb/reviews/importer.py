@@ -0,0 +1,402 @@
+"""Потоковая загрузка каталога, отзывов и комментариев из CSV/NDJSON.
+
+Файлы читаются построчно, записи вставляются пачками: каждая пачка —
+отдельная транзакция, в которой вместе со строками сохраняется
+смещение в исходном файле (ImportProgress); после коммита оно же
+пишется в файл контрольной точки. Повторный запуск продолжает с
+последней закоммиченной пачки, даже если файл записать не успели, так
+что строки без id не вставляются второй раз. Вставка к тому же
+игнорирует конфликты по первичному ключу.
+"""
+import csv
+import io
+import json
+import os
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import (Categories, Comments, Genres, GenresTitles,
+                     ImportProgress, Review, Title, User)
+
+FORMATS = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+
+
+class Entity:
+    """Описание загружаемой сущности: модель, возможные имена файла
+    и внешние ключи, которые можно передать через slug/username.
+    """
+
+    def __init__(self, name, model, file_names, foreign_keys=None):
+        self.name = name
+        self.model = model
+        self.file_names = file_names
+        # поле модели -> (колонки во входных данных, модель, поле-ключ)
+        self.foreign_keys = foreign_keys or {}
+
+
+ENTITIES = (
+    Entity('users', User, ('users',)),
+    Entity('categories', Categories, ('category', 'categories')),
+    Entity('genres', Genres, ('genre', 'genres')),
+    Entity('titles', Title, ('titles',), {
+        'category_id': (('category', 'category_id'), Categories, 'slug'),
+    }),
+    Entity('genre_titles', GenresTitles, ('genre_title', 'genre_titles'), {
+        'title_id': (('title_id', 'title'), Title, None),
+        'genre_id': (('genre_id', 'genre'), Genres, 'slug'),
+    }),
+    Entity('reviews', Review, ('review', 'reviews'), {
+        'title_id': (('title_id', 'title'), Title, None),
+        'author_id': (('author', 'author_id'), User, 'username'),
+    }),
+    Entity('comments', Comments, ('comments',), {
+        'review_id': (('review_id', 'review'), Review, None),
+        'author_id': (('author', 'author_id'), User, 'username'),
+    }),
+)
+
+
+class RowError(ValueError):
+    pass
+
+
+def find_source(directory, entity):
+    for file_name in entity.file_names:
+        for extension, file_format in FORMATS.items():
+            path = os.path.join(directory, file_name + extension)
+            if os.path.exists(path):
+                return path, file_format
+    return None, None
+
+
+class _ByteCounter:
+    """Итератор строк файла, считающий прочитанные байты: csv.reader
+    забирает ровно строки текущей записи, так что после каждой записи
+    `offset` указывает на начало следующей.
+    """
+
+    def __init__(self, stream, offset):
+        self.stream = stream
+        self.offset = offset
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.stream.readline()
+        if not line:
+            raise StopIteration
+        self.offset += len(line)
+        return line.decode('utf-8')
+
+
+def read_rows(path, file_format, offset=0):
+    """Отдаём пары (словарь колонок, смещение после записи)."""
+    with open(path, 'rb') as stream:
+        header = None
+        if file_format == 'csv':
+            header_line = stream.readline()
+            header = next(csv.reader([header_line.decode('utf-8-sig')]))
+            offset = max(offset, len(header_line))
+        stream.seek(offset)
+        lines = _ByteCounter(stream, offset)
+        if file_format == 'csv':
+            for values in csv.reader(lines):
+                if values:
+                    yield dict(zip(header, values)), lines.offset
+        else:
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line), lines.offset
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """Сохраняем даты из выгрузки: иначе auto_now_add при вставке
+    заменит их текущим временем.
+    """
+    fields = [field for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now_add', False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield fields
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Importer:
+
+    def __init__(self, directory, batch_size=1000, checkpoint=None,
+                 use_copy=True, log=print):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.checkpoint_path = checkpoint or os.path.join(
+            directory, '.import_checkpoint.json'
+        )
+        self.use_copy = use_copy and connection.vendor == 'postgresql'
+        self.log = log
+        self.checkpoint = self._load_checkpoint()
+
+    @property
+    def progress(self):
+        return ImportProgress.objects.filter(
+            checkpoint=os.path.abspath(self.checkpoint_path)
+        )
+
+    def _load_checkpoint(self):
+        """Состояние из файла; пачки, закоммиченные после последней
+        записи файла, берутся из ImportProgress.
+        """
+        checkpoint = {}
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as stream:
+                checkpoint = json.load(stream)
+        for progress in self.progress:
+            state = checkpoint.get(progress.entity, {})
+            if progress.offset > state.get('offset', -1):
+                checkpoint[progress.entity] = {
+                    'offset': progress.offset, 'rows': progress.rows,
+                    'skipped': progress.skipped, 'done': progress.done,
+                }
+        return checkpoint
+
+    def _save_checkpoint(self):
+        temporary = f'{self.checkpoint_path}.tmp'
+        with open(temporary, 'w') as stream:
+            json.dump(self.checkpoint, stream)
+        os.replace(temporary, self.checkpoint_path)
+
+    def reset_checkpoint(self):
+        self.checkpoint = {}
+        self.progress.delete()
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def run(self, only=None):
+        imported = []
+        for entity in ENTITIES:
+            if only and entity.name not in only:
+                continue
+            path, file_format = find_source(self.directory, entity)
+            if path is None:
+                continue
+            state = self.checkpoint.get(entity.name, {})
+            if state.get('done'):
+                self.log(f'{entity.name}: уже загружено, пропускаем')
+                continue
+            self.import_entity(entity, path, file_format, state)
+            imported.append(entity.model)
+        if imported:
+            self._reset_sequences(imported)
+        return imported
+
+    def import_entity(self, entity, path, file_format, state):
+        model = entity.model
+        lookups = self._load_lookups(entity)
+        offset = state.get('offset', 0)
+        rows = state.get('rows', 0)
+        skipped = state.get('skipped', 0)
+        started = time.monotonic()
+        loaded = 0
+        batch = []
+        with keep_auto_now_add(model) as dated_fields:
+            for row, row_end in read_rows(path, file_format, offset):
+                try:
+                    batch.append(self.build(entity, row, lookups,
+                                            dated_fields))
+                except (ValueError, TypeError, ValidationError) as error:
+                    skipped += 1
+                    self.log(f'{entity.name}: строка пропущена ({error})')
+                offset = row_end
+                if len(batch) >= self.batch_size:
+                    rows = self._flush(entity, batch, offset, rows, skipped)
+                    loaded += len(batch)
+                    batch = []
+                    self._commit_state(entity, offset, rows, skipped)
+            if batch:
+                rows = self._flush(entity, batch, offset, rows, skipped)
+                loaded += len(batch)
+        self._save_progress(entity, offset, rows, skipped, done=True)
+        self._commit_state(entity, offset, rows, skipped, done=True)
+        elapsed = time.monotonic() - started
+        rate = loaded / elapsed if elapsed else loaded
+        self.log(
+            f'{entity.name}: {loaded} строк за {elapsed:.1f} с '
+            f'({rate:.0f} строк/с), пропущено: {skipped}'
+        )
+
+    def _commit_state(self, entity, offset, rows, skipped, done=False):
+        self.checkpoint[entity.name] = {
+            'offset': offset, 'rows': rows, 'skipped': skipped, 'done': done,
+        }
+        self._save_checkpoint()
+
+    def _load_lookups(self, entity):
+        lookups = {}
+        for target_field, (_, model, key) in entity.foreign_keys.items():
+            if key is not None:
+                lookups[target_field] = dict(
+                    model.objects.values_list(key, 'pk').iterator()
+                )
+        return lookups
+
+    @staticmethod
+    def _field_values(entity, row):
+        values = {}
+        for field in entity.model._meta.concrete_fields:
+            if field.attname in entity.foreign_keys:
+                continue
+            column = field.name if field.name in row else field.attname
+            if column not in row:
+                continue
+            value = row[column]
+            if value == '' and field.null:
+                value = None
+            values[field.attname] = field.to_python(value)
+        return values
+
+    def build(self, entity, row, lookups, dated_fields):
+        model = entity.model
+        values = self._field_values(entity, row)
+        for target_field, (columns, _, key) in entity.foreign_keys.items():
+            values[target_field] = self._resolve(
+                row, columns, lookups.get(target_field), key
+            )
+        for field in dated_fields:
+            value = values.get(field.attname)
+            if value is None:
+                values[field.attname] = timezone.now()
+            elif timezone.is_naive(value):
+                values[field.attname] = timezone.make_aware(value)
+        if model is User and not values.get('password'):
+            values['password'] = UNUSABLE_PASSWORD_PREFIX
+        return model(**values)
+
+    @staticmethod
+    def _resolve(row, columns, lookup, key):
+        """Первичный ключ связанной записи. Число в колонке `*_id` или
+        в колонке сущности без slug/username — сам ключ; в остальных
+        колонках сначала ищем slug/username, и только если его нет,
+        число считаем ключом (в исходных CSV там бывают id).
+        """
+        for column in columns:
+            value = row.get(column)
+            if value in (None, ''):
+                continue
+            value = str(value)
+            if value.isdigit() and (lookup is None
+                                    or column.endswith('_id')):
+                return int(value)
+            if lookup is not None and value in lookup:
+                return lookup[value]
+            if value.isdigit():
+                return int(value)
+            raise RowError(f'не найден {column}={value}')
+        return None
+
+    def _flush(self, entity, batch, offset, rows, skipped):
+        """Вставляем пачку и в той же транзакции сохраняем смещение
+        после неё. Возвращает общее число загруженных строк.
+        """
+        with transaction.atomic():
+            if self.use_copy:
+                rows += self._copy(entity.model, batch)
+            else:
+                entity.model.objects.bulk_create(
+                    batch, ignore_conflicts=True
+                )
+                rows += len(batch)
+            self._save_progress(entity, offset, rows, skipped)
+        return rows
+
+    def _save_progress(self, entity, offset, rows, skipped, done=False):
+        self.progress.update_or_create(
+            checkpoint=os.path.abspath(self.checkpoint_path),
+            entity=entity.name,
+            defaults={'offset': offset, 'rows': rows, 'skipped': skipped,
+                      'done': done},
+        )
+
+    @staticmethod
+    def copy_groups(model, batch):
+        """Пачка, разбитая на строки с id и без него, со списком полей
+        для каждой части: колонки COPY общие для всех строк части.
+        """
+        groups = []
+        for with_pk in (True, False):
+            instances = [instance for instance in batch
+                         if (instance.pk is not None) == with_pk]
+            if instances:
+                fields = [field for field in model._meta.concrete_fields
+                          if with_pk or not field.primary_key]
+                groups.append((fields, instances))
+        return groups
+
+    def _copy(self, model, batch):
+        """COPY во временную таблицу и INSERT ... ON CONFLICT DO NOTHING,
+        чтобы повтор пачки после сбоя не падал на дублях ключей.
+        """
+        table = connection.ops.quote_name(model._meta.db_table)
+        inserted = 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TEMP TABLE import_batch '
+                f'(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP'
+            )
+            for fields, instances in self.copy_groups(model, batch):
+                columns = ', '.join(
+                    connection.ops.quote_name(field.column)
+                    for field in fields
+                )
+                nullable = ', '.join(
+                    connection.ops.quote_name(field.column)
+                    for field in fields if field.null
+                )
+                buffer = io.StringIO()
+                writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+                for instance in instances:
+                    writer.writerow([
+                        self._copy_value(field, instance, connection)
+                        for field in fields
+                    ])
+                buffer.seek(0)
+                force_null = f', FORCE_NULL ({nullable})' if nullable else ''
+                cursor.cursor.copy_expert(
+                    f'COPY import_batch ({columns}) FROM STDIN WITH '
+                    f"(FORMAT csv, NULL '\\N'{force_null})", buffer
+                )
+                cursor.execute(
+                    f'INSERT INTO {table} ({columns}) SELECT {columns} '
+                    'FROM import_batch ON CONFLICT DO NOTHING'
+                )
+                inserted += cursor.rowcount
+                cursor.execute('TRUNCATE import_batch')
+        return inserted
+
+    @staticmethod
+    def _copy_value(field, instance, connection):
+        value = field.get_db_prep_save(
+            getattr(instance, field.attname), connection
+        )
+        if value is None:
+            return '\\N'
+        if isinstance(value, bool):
+            return 't' if value else 'f'
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
+
+    def _reset_sequences(self, models):
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if statements:
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
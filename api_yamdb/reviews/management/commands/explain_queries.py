@@ -0,0 +1,142 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Q
+
+from reviews.models import Comments, Genres, GenresTitles, Review, Title
+from reviews.seed import seed_catalog
+
+PAGE_SIZE = 10
+
+# Индексы под выборки API; с --compare они временно удаляются.
+BENCHMARK_INDEXES = (
+    (Review, 'review_title_pub_date_idx'),
+    (Comments, 'comment_review_pub_date_idx'),
+    (GenresTitles, 'unique_title_genre'),
+)
+
+
+def drop_statements():
+    """Пары (индекс, SQL для его удаления). На SQLite уникальное
+    ограничение — часть определения таблицы, его без пересоздания
+    таблицы не удалить, поэтому SQL для него None.
+    """
+    quote = connection.ops.quote_name
+    for model, name in BENCHMARK_INDEXES:
+        table = quote(model._meta.db_table)
+        if not any(constraint.name == name
+                   for constraint in model._meta.constraints):
+            yield name, f'DROP INDEX {quote(name)}'
+        elif connection.vendor != 'sqlite':
+            yield name, f'ALTER TABLE {table} DROP CONSTRAINT {quote(name)}'
+        else:
+            yield name, None
+
+
+def list_queries():
+    """Запросы списков API на самых «тяжёлых» произведении и отзыве."""
+    title = Title.objects.order_by('-review_count', 'id').first()
+    review = Review.objects.filter(title=title).annotate(
+        comment_count=Count('comments')
+    ).order_by('-comment_count', 'id').first()
+    if review is None:
+        raise CommandError('Нет отзывов: запустите команду с --seed.')
+    reviews = Review.objects.filter(title=title).order_by('-pub_date', '-id')
+    # Курсор в середине списка, как на глубокой странице.
+    middle = reviews[title.review_count // 2]
+    page = list(Title.objects.values_list('id', flat=True)[:PAGE_SIZE])
+    genre = Genres.objects.filter(title=title).first()
+    return (
+        ('reviews', reviews[:PAGE_SIZE]),
+        ('reviews_cursor', reviews.filter(
+            Q(pub_date__lt=middle.pub_date)
+            | Q(pub_date=middle.pub_date, id__lt=middle.id)
+        )[:PAGE_SIZE]),
+        ('comments', Comments.objects.filter(
+            review=review
+        ).order_by('-pub_date', '-id')[:PAGE_SIZE]),
+        ('title_genres', Genres.objects.filter(title__in=page)),
+        ('titles_by_genre', Title.objects.filter(
+            genre=genre
+        ).order_by('-year', '-id')[:PAGE_SIZE]),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает планы и время запросов списков отзывов, комментариев '
+        'и жанров. С --compare — также без составных индексов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', action='store_true',
+            help='Сначала наполнить базу синтетическими данными '
+                 '(только для отдельной базы!).'
+        )
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews-per-title', type=int, default=50)
+        parser.add_argument('--comments-per-review', type=int, default=2)
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Сколько раз выполнить каждый запрос.'
+        )
+        parser.add_argument(
+            '--compare', action='store_true',
+            help='Сравнить с планами без индексов (удаляются в '
+                 'транзакции, которая затем откатывается).'
+        )
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            if options['titles'] < 1:
+                raise CommandError('--titles должен быть положительным.')
+            counts = seed_catalog(
+                options['titles'], options['reviews_per_title'],
+                options['comments_per_review'],
+            )
+            self.stdout.write(f'Данные: {counts}')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        queries = list_queries()
+        before = None
+        if options['compare']:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    for name, statement in drop_statements():
+                        if statement is None:
+                            self.stdout.write(f'{name}: не удаляется')
+                            continue
+                        cursor.execute(statement)
+                before = self.measure(queries, options['repeat'])
+                transaction.set_rollback(True)
+        after = self.measure(queries, options['repeat'])
+        for name, _ in queries:
+            self.report(name, after[name], before and before[name])
+
+    @staticmethod
+    def measure(queries, repeat):
+        results = {}
+        for name, queryset in queries:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = (queryset.explain(), statistics.median(timings))
+        return results
+
+    def report(self, name, after, before=None):
+        plan, elapsed = after
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        if before is not None:
+            self.stdout.write(f'  без индексов: {before[1]:.2f} мс')
+            self.stdout.write(self._indent(before[0]))
+        self.stdout.write(f'  с индексами: {elapsed:.2f} мс')
+        self.stdout.write(self._indent(plan))
+
+    @staticmethod
+    def _indent(plan):
+        return '\n'.join(f'    {line}' for line in plan.splitlines())
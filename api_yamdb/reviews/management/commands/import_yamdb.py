@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.importer import ENTITIES, Importer
+from reviews.signals import models_changed
+from reviews.stats import rebuild_title_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает пользователей, категории, жанры, произведения, связи '
+        'жанров, отзывы и комментарии из CSV/NDJSON-файлов каталога '
+        '(users, category, genre, titles, genre_title, review, comments).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Каталог с файлами выгрузки.')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество строк в одной транзакции.'
+        )
+        parser.add_argument(
+            '--only', nargs='+',
+            choices=[entity.name for entity in ENTITIES],
+            help='Загрузить только указанные сущности.'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл контрольной точки (по умолчанию в каталоге данных).'
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Игнорировать контрольную точку и начать заново.'
+        )
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Не использовать COPY на PostgreSQL.'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным.')
+        importer = Importer(
+            options['path'],
+            batch_size=options['batch_size'],
+            checkpoint=options['checkpoint'],
+            use_copy=not options['no_copy'],
+            log=self.stdout.write,
+        )
+        if options['restart']:
+            importer.reset_checkpoint()
+        imported = importer.run(options['only'])
+        if not imported:
+            self.stdout.write('Нет данных для загрузки.')
+            return
+        # Пачечная вставка не вызывает сигналы моделей.
+        rebuild_title_stats()
+        models_changed(*imported)
+        self.stdout.write(self.style.SUCCESS('Загрузка завершена.'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from reviews.stats import rebuild_title_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает сохранённые сумму оценок, количество отзывов '
+        'и гистограммы оценок произведений по таблице отзывов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'title_ids', nargs='*', type=int,
+            help='ID произведений; по умолчанию пересчитываются все.'
+        )
+
+    def handle(self, *args, **options):
+        updated = rebuild_title_stats(options['title_ids'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено произведений: {updated}')
+        )
@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:58
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def delete_duplicate_genre_links(apps, schema_editor):
+    GenresTitles = apps.get_model('reviews', 'GenresTitles')
+    keep = GenresTitles.objects.values('title', 'genre').annotate(
+        keep_id=Min('id')
+    ).values('keep_id')
+    GenresTitles.objects.exclude(id__in=list(keep)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_title_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comments',
+            index=models.Index(fields=['review', '-pub_date', '-id'], name='comment_review_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', '-pub_date', '-id'], name='review_title_pub_date_idx'),
+        ),
+        migrations.RunPython(
+            delete_duplicate_genre_links, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='genrestitles',
+            constraint=models.UniqueConstraint(fields=('title', 'genre'), name='unique_title_genre'),
+        ),
+    ]
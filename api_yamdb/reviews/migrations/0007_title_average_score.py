@@ -0,0 +1,44 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:15
+
+from django.db import migrations, models
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+
+def fill_average_score(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Title.objects.filter(review_count__gt=0).update(
+        average_score=Coalesce(
+            Cast(F('score_sum'), FloatField())
+            / NullIf(F('review_count'), Value(0)),
+            Value(0.0), output_field=FloatField(),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_score_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='average_score',
+            field=models.FloatField(default=0, editable=False, verbose_name='Средняя оценка'),
+        ),
+        migrations.RunPython(fill_average_score, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-average_score', '-id'], name='title_average_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-average_score', '-id'], name='title_category_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-review_count', '-id'], name='title_review_count_idx'),
+        ),
+    ]
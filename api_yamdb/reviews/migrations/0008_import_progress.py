@@ -0,0 +1,29 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_average_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportProgress',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('checkpoint', models.CharField(max_length=1024, verbose_name='Файл контрольной точки')),
+                ('entity', models.CharField(max_length=32, verbose_name='Сущность')),
+                ('offset', models.BigIntegerField(verbose_name='Смещение в файле выгрузки')),
+                ('rows', models.PositiveIntegerField(default=0, verbose_name='Загружено строк')),
+                ('skipped', models.PositiveIntegerField(default=0, verbose_name='Пропущено строк')),
+                ('done', models.BooleanField(default=False, verbose_name='Загрузка завершена')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='importprogress',
+            constraint=models.UniqueConstraint(fields=('checkpoint', 'entity'), name='unique_import_progress'),
+        ),
+    ]
@@ -1,5 +1,5 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
 
 from core.models import CreatedModel
 from core.validators import validate_range
@@ -105,13 +105,50 @@ class Title(models.Model):
         blank=True,
         verbose_name='Описание произведения',
     )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок',
+    )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество отзывов',
+    )
+    average_score = models.FloatField(
+        default=0,
+        editable=False,
+        verbose_name='Средняя оценка',
+    )
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        """Средняя оценка по сохранённым сумме оценок и числу отзывов."""
+        if self.review_count:
+            return round(self.score_sum / self.review_count, 1)
+
     class Meta:
         ordering = ('-year',)
         verbose_name_plural = 'Произведения'
+        # Сортировки ?ordering=rating и review_count; индекс по убыванию
+        # читается и в обратную сторону.
+        indexes = [
+            models.Index(
+                fields=['-average_score', '-id'],
+                name='title_average_score_idx',
+            ),
+            models.Index(
+                fields=['category', '-average_score', '-id'],
+                name='title_category_score_idx',
+            ),
+            models.Index(
+                fields=['-review_count', '-id'],
+                name='title_review_count_idx',
+            ),
+        ]
 
 
 class GenresTitles(models.Model):
@@ -127,6 +164,42 @@ class GenresTitles(models.Model):
         verbose_name='ID жанра',
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'genre'],
+                name='unique_title_genre'
+            )
+        ]
+
+
+class TitleScoreCount(models.Model):
+    """Число отзывов произведения с данной оценкой (гистограмма
+    оценок). Поддерживается вместе с суммой оценок при изменении
+    отзывов и пересчитывается командой rebuild_title_stats.
+    """
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='score_counts',
+        verbose_name='ID произведения',
+    )
+    score = models.PositiveSmallIntegerField(
+        verbose_name='Оценка',
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество отзывов',
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'score'],
+                name='unique_title_score'
+            )
+        ]
+
 
 class Review(CreatedModel):
     """Модель для обзоров на произведения."""
@@ -147,9 +220,37 @@ class Review(CreatedModel):
         validators=[validate_range(1, 10)]
     )
 
+    _loaded_score = None
+    _loaded_title_id = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_loaded_score()
+        return instance
+
+    def remember_loaded_score(self):
+        """Запоминаем сохранённые в базе оценку и произведение,
+        чтобы при изменении отзыва пересчитать счётчики на разницу.
+        """
+        self._loaded_score = self.__dict__.get('score')
+        self._loaded_title_id = self.__dict__.get('title_id')
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     class Meta:
         ordering = ('-pub_date',)
         verbose_name_plural = 'Отзывы'
+        # Отзывы всегда выбираются по произведению в порядке
+        # (-pub_date, -id), в том числе курсорной пагинацией.
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=models.Q(score__range=(1, 10)),
@@ -176,3 +277,47 @@ class Comments(CreatedModel):
     class Meta:
         ordering = ('-pub_date',)
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', '-id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
+
+
+class ImportProgress(models.Model):
+    """Состояние загрузки import_yamdb после последней закоммиченной
+    пачки. Пишется в той же транзакции, что и пачка, поэтому после
+    сбоя загрузка продолжается ровно с незакоммиченных строк.
+    """
+    checkpoint = models.CharField(
+        max_length=1024,
+        verbose_name='Файл контрольной точки',
+    )
+    entity = models.CharField(
+        max_length=32,
+        verbose_name='Сущность',
+    )
+    offset = models.BigIntegerField(
+        verbose_name='Смещение в файле выгрузки',
+    )
+    rows = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Загружено строк',
+    )
+    skipped = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Пропущено строк',
+    )
+    done = models.BooleanField(
+        default=False,
+        verbose_name='Загрузка завершена',
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['checkpoint', 'entity'],
+                name='unique_import_progress'
+            )
+        ]
@@ -0,0 +1,122 @@
+"""Синтетический каталог для замеров производительности.
+
+Данные вставляются пачками и помечаются префиксом `bench`, так что
+повторный запуск дополняет набор, а не конфликтует с ним. Запускать
+только на отдельной базе.
+"""
+import random
+from itertools import islice
+from datetime import timedelta
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.db import transaction
+from django.utils import timezone
+
+from .importer import keep_auto_now_add
+from .models import (Categories, Comments, Genres, GenresTitles, Review,
+                     Title, User)
+from .signals import models_changed
+from .stats import rebuild_title_stats
+
+PREFIX = 'bench'
+
+
+def seed_catalog(titles=1000, reviews_per_title=20, comments_per_review=2,
+                 genres=20, categories=10, batch_size=1000, seed=0):
+    """Создаём пользователей, категории, жанры, произведения со связями,
+    отзывы и комментарии. Возвращает словарь с количеством записей.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    with transaction.atomic():
+        start = Title.objects.count()
+        users = _ensure_users(reviews_per_title, batch_size)
+        categories = _ensure_named(Categories, categories, batch_size)
+        genres = _ensure_named(Genres, genres, batch_size)
+
+        _bulk_create(Title, (
+            Title(
+                name=f'{PREFIX} title {start + number}',
+                year=rng.randint(1900, now.year),
+                category_id=rng.choice(categories),
+                description=f'{PREFIX} description {start + number}',
+            ) for number in range(titles)
+        ), batch_size)
+        title_ids = list(Title.objects.filter(
+            name__startswith=f'{PREFIX} title '
+        ).order_by('-id').values_list('id', flat=True)[:titles])
+
+        _bulk_create(GenresTitles, (
+            GenresTitles(title_id=title_id, genre_id=genre_id)
+            for title_id in title_ids
+            for genre_id in rng.sample(genres, min(2, len(genres)))
+        ), batch_size, ignore_conflicts=True)
+
+        with keep_auto_now_add(Review), keep_auto_now_add(Comments):
+            _create_feedback(rng, now, title_ids, users, reviews_per_title,
+                             comments_per_review, batch_size)
+        rebuild_title_stats()
+    models_changed(Categories, Genres, Title, GenresTitles, Review,
+                   Comments, User)
+    return {
+        'titles': Title.objects.count(),
+        'reviews': Review.objects.count(),
+        'comments': Comments.objects.count(),
+    }
+
+
+def _bulk_create(model, objects, batch_size, **kwargs):
+    """Вставка генератора пачками: bulk_create сам разбивает пачку по
+    ограничениям базы, но сначала превращает весь генератор в список.
+    """
+    objects = iter(objects)
+    while True:
+        batch = list(islice(objects, batch_size))
+        if not batch:
+            return
+        model.objects.bulk_create(batch, **kwargs)
+
+
+def _create_feedback(rng, now, title_ids, users, reviews_per_title,
+                     comments_per_review, batch_size):
+    def past():
+        return now - timedelta(minutes=rng.randint(0, 10 ** 6))
+
+    _bulk_create(Review, (
+        Review(title_id=title_id, author_id=author_id, text=PREFIX,
+               score=rng.randint(1, 10), pub_date=past())
+        for title_id in title_ids
+        for author_id in users[:reviews_per_title]
+    ), batch_size, ignore_conflicts=True)
+    # Новые произведения идут подряд по id: диапазон вместо длинного IN.
+    review_ids = Review.objects.filter(
+        title_id__gte=min(title_ids)
+    ).values_list('id', flat=True)
+    _bulk_create(Comments, (
+        Comments(review_id=review_id, author_id=rng.choice(users),
+                 text=PREFIX, pub_date=past())
+        for review_id in review_ids.iterator()
+        for _ in range(comments_per_review)
+    ), batch_size)
+
+
+def _ensure_users(count, batch_size):
+    _bulk_create(User, (
+        User(username=f'{PREFIX}{number}',
+             email=f'{PREFIX}{number}@yamdb.fake',
+             password=UNUSABLE_PASSWORD_PREFIX)
+        for number in range(count)
+    ), batch_size, ignore_conflicts=True)
+    return list(User.objects.filter(
+        username__startswith=PREFIX
+    ).order_by('id').values_list('id', flat=True))
+
+
+def _ensure_named(model, count, batch_size):
+    _bulk_create(model, (
+        model(name=f'{PREFIX} {number}', slug=f'{PREFIX}-{number}')
+        for number in range(count)
+    ), batch_size, ignore_conflicts=True)
+    return list(model.objects.filter(
+        slug__startswith=f'{PREFIX}-'
+    ).values_list('id', flat=True))
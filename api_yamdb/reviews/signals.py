@@ -0,0 +1,67 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core import cache as response_cache
+from core.authentication import forget_user
+
+from .models import (Categories, Comments, Genres, GenresTitles, Review,
+                     Title, User)
+from .stats import review_deleted, review_saved
+
+# Какие пространства имён кэша ответов и ETag зависят от модели.
+CACHE_NAMESPACES = {
+    Categories: ('categories', 'titles'),
+    Genres: ('genres', 'titles'),
+    Title: ('titles',),
+    GenresTitles: ('titles',),
+    Review: ('titles', 'reviews'),
+    Comments: ('comments',),
+    User: ('users',),
+}
+
+
+@receiver(post_save, sender=Review)
+def update_title_stats_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    review_saved(instance, created)
+
+
+@receiver(post_delete, sender=Review)
+def update_title_stats_on_delete(sender, instance, **kwargs):
+    review_deleted(instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    forget_user(instance)
+
+
+def models_changed(*models):
+    """Сбрасываем кэш ответов, зависящих от моделей. Вызывается
+    и из сигналов, и после пачечных операций, которые сигналы обходят.
+    """
+    namespaces = {
+        namespace for model in models for namespace in CACHE_NAMESPACES[model]
+    }
+    response_cache.bump(*namespaces)
+    # Повторно после коммита: иначе параллельный запрос мог прочитать
+    # ещё старые данные и положить их в кэш под новой версией.
+    transaction.on_commit(lambda: response_cache.bump(*namespaces))
+
+
+def bump_cache_namespaces(sender, **kwargs):
+    models_changed(sender)
+
+
+for model in CACHE_NAMESPACES:
+    post_save.connect(
+        bump_cache_namespaces, sender=model,
+        dispatch_uid=f'bump_cache_on_save_{model.__name__}'
+    )
+    post_delete.connect(
+        bump_cache_namespaces, sender=model,
+        dispatch_uid=f'bump_cache_on_delete_{model.__name__}'
+    )
@@ -0,0 +1,152 @@
+import itertools
+
+from django.db import IntegrityError, transaction
+from django.db.models import (Count, F, FloatField, OuterRef, Subquery, Sum,
+                              Value)
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from .models import Review, Title, TitleScoreCount
+
+SCORES = range(1, 11)
+
+
+def average(score_sum, review_count):
+    """Выражение средней оценки; 0 для произведения без отзывов."""
+    return Coalesce(
+        Cast(score_sum, FloatField()) / NullIf(review_count, Value(0)),
+        Value(0.0), output_field=FloatField(),
+    )
+
+
+def change_title_score(title_id, score_delta, count_delta=0):
+    """Атомарно сдвигаем сумму оценок, число отзывов и среднюю
+    оценку произведения.
+
+    Обновление выполняется одним UPDATE с F-выражениями, поэтому
+    параллельные запросы не теряют изменения друг друга.
+    """
+    if not score_delta and not count_delta:
+        return
+    score_sum = F('score_sum') + score_delta
+    review_count = F('review_count') + count_delta
+    Title.objects.filter(pk=title_id).update(
+        score_sum=score_sum,
+        review_count=review_count,
+        average_score=average(score_sum, review_count),
+    )
+
+
+def change_score_count(title_id, score, delta):
+    """Сдвигаем число отзывов произведения с оценкой `score`.
+
+    Строка гистограммы создаётся при первом отзыве с такой оценкой;
+    если её одновременно создал параллельный запрос, повторяем UPDATE.
+    """
+    counts = TitleScoreCount.objects.filter(title_id=title_id, score=score)
+    if counts.update(count=F('count') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            TitleScoreCount.objects.create(
+                title_id=title_id, score=score, count=delta
+            )
+    except IntegrityError:
+        counts.update(count=F('count') + delta)
+
+
+def _count_review(title_id, score, sign):
+    change_title_score(title_id, sign * score, sign)
+    change_score_count(title_id, score, sign)
+
+
+def review_saved(review, created):
+    """Учитываем новый отзыв или изменение оценки существующего."""
+    if created:
+        _count_review(review.title_id, review.score, 1)
+    elif review._loaded_score is None:
+        rebuild_title_stats([review.title_id])
+    elif review._loaded_title_id != review.title_id:
+        _count_review(review._loaded_title_id, review._loaded_score, -1)
+        _count_review(review.title_id, review.score, 1)
+    elif review._loaded_score != review.score:
+        change_title_score(review.title_id,
+                           review.score - review._loaded_score)
+        change_score_count(review.title_id, review._loaded_score, -1)
+        change_score_count(review.title_id, review.score, 1)
+    review.remember_loaded_score()
+
+
+def review_deleted(review):
+    """Убираем оценку удалённого отзыва из счётчиков произведения."""
+    _count_review(review.title_id, review.score, -1)
+
+
+def score_distributions(title_ids):
+    """Гистограммы оценок произведений: {id: {оценка: число}}.
+    Читается не больше десяти строк на произведение.
+    """
+    distributions = {
+        title_id: dict.fromkeys(SCORES, 0) for title_id in title_ids
+    }
+    rows = TitleScoreCount.objects.filter(
+        title_id__in=distributions, count__gt=0
+    ).values_list('title_id', 'score', 'count')
+    for title_id, score, count in rows:
+        distributions[title_id][score] = count
+    return distributions
+
+
+def _rebuild_score_counts(title_ids, batch_size=1000):
+    counts = TitleScoreCount.objects.all()
+    reviews = Review.objects.order_by()
+    if title_ids:
+        counts = counts.filter(title_id__in=title_ids)
+        reviews = reviews.filter(title_id__in=title_ids)
+    counts.delete()
+    rows = (
+        TitleScoreCount(title_id=row['title'], score=row['score'],
+                        count=row['total'])
+        for row in reviews.values('title', 'score').annotate(
+            total=Count('pk')
+        ).iterator()
+    )
+    while True:
+        chunk = list(itertools.islice(rows, batch_size))
+        if not chunk:
+            break
+        TitleScoreCount.objects.bulk_create(chunk)
+
+
+def rebuild_title_stats(title_ids=None):
+    """Пересчитываем сохранённые счётчики, средние и гистограммы
+    оценок по таблице отзывов.
+
+    Пересчёт идёт пачечными update в обход сигналов, поэтому кэш
+    ответов произведений и отзывов сбрасывается здесь же. Возвращает
+    количество обновлённых произведений.
+    """
+    # Сигналы импортируют этот модуль.
+    from .signals import models_changed
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    titles = Title.objects.all()
+    if title_ids:
+        titles = titles.filter(pk__in=title_ids)
+    with transaction.atomic():
+        _rebuild_score_counts(title_ids)
+        updated = titles.update(
+            score_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0
+            ),
+            review_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('pk')).values('total')),
+                0
+            ),
+        )
+        titles.update(
+            average_score=average(F('score_sum'), F('review_count'))
+        )
+    models_changed(Title, Review)
+    return updated
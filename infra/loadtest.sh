@@ -0,0 +1,30 @@
+#!/bin/sh
+# Нагрузочный тест каталога через docker-compose: анонимные GET
+# напрямую в gunicorn (web:8000) и через nginx с микрокэшем и
+# keepalive. Запускается из папки infra при поднятых контейнерах:
+#   ./loadtest.sh [секунды] [параллельных запросов]
+# Генератор нагрузки работает в отдельном контейнере, чтобы не отнимать
+# процессор у воркеров gunicorn в web; результаты пишутся в текущую
+# папку (loadtest-<name>.json).
+set -e
+
+DURATION=${1:-30}
+CONCURRENCY=${2:-32}
+PATHS="/api/v1/titles/ /api/v1/titles/?ordering=-rating /api/v1/genres/ /api/v1/categories/"
+
+run() {
+    name=$1
+    base=$2
+    urls=""
+    for path in $PATHS; do
+        urls="$urls $base$path"
+    done
+    echo "== $name ($base)"
+    docker-compose run --rm --no-deps -T -v "$PWD:/loadtest" web \
+        python manage.py load_test $urls \
+        --concurrency "$CONCURRENCY" --duration "$DURATION" \
+        --output "/loadtest/loadtest-$name.json"
+}
+
+run direct http://web:8000
+run nginx http://nginx
@@ -0,0 +1,48 @@
+import pytest
+
+from reviews.models import Categories, Genres, GenresTitles, Review, Title
+
+
+@pytest.fixture
+def category():
+    return Categories.objects.create(name='Фильм', slug='films')
+
+
+@pytest.fixture
+def genres():
+    return [
+        Genres.objects.create(name='Драма', slug='drama'),
+        Genres.objects.create(name='Комедия', slug='comedy'),
+    ]
+
+
+@pytest.fixture
+def title(category, genres):
+    title = Title.objects.create(
+        name='Побег из Шоушенка', year=1994, category=category,
+        description='Тюремная драма'
+    )
+    for genre in genres:
+        GenresTitles.objects.create(title=title, genre=genre)
+    return title
+
+
+@pytest.fixture
+def titles(category, genres):
+    created = []
+    for number in range(12):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=1990 + number,
+            category=category
+        )
+        for genre in genres:
+            GenresTitles.objects.create(title=title, genre=genre)
+        created.append(title)
+    return created
+
+
+@pytest.fixture
+def review(title, user):
+    return Review.objects.create(
+        title=title, author=user, text='Отличный фильм', score=9
+    )
@@ -0,0 +1,160 @@
+import hashlib
+
+import pytest
+from rest_framework.test import APIClient
+
+from core import throttling
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # 45 секунд от начала минутного окна.
+    now = [6000045.0]
+    monkeypatch.setattr(throttling.CacheCounterThrottle, 'timer',
+                        staticmethod(lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def rates(settings, clock):
+    settings.REST_FRAMEWORK = dict(
+        settings.REST_FRAMEWORK,
+        DEFAULT_THROTTLE_RATES={
+            'signup_ip': '3/min',
+            'signup_username': '2/min',
+            'token_ip': '3/min',
+            'token_username': '2/min',
+        },
+    )
+
+
+def client_from(ip):
+    return APIClient(REMOTE_ADDR=ip)
+
+
+def token_data(username='TestUser'):
+    return {'username': username, 'confirmation_code': 'wrong'}
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('rates')
+class TestAuthThrottling:
+
+    def test_token_limited_per_username(self, user):
+        for number in range(2):
+            response = client_from(f'10.0.0.{number}').post(
+                TOKEN_URL, token_data()
+            )
+            assert response.status_code == 400
+        response = client_from('10.0.0.9').post(TOKEN_URL, token_data())
+        assert response.status_code == 429, (
+            'Проверьте, что подбор кода для одного пользователя с разных '
+            'IP ограничивается'
+        )
+        # Два запроса в текущем окне: следующий пройдёт, когда их вес
+        # опустится до одного, — через 30 секунд следующего окна.
+        assert response['Retry-After'] == '45', (
+            'Проверьте, что ответ 429 содержит Retry-After'
+        )
+
+    def test_token_limited_per_ip(self, user):
+        client = client_from('10.0.0.1')
+        statuses = [
+            client.post(TOKEN_URL, token_data(f'user{number}')).status_code
+            for number in range(4)
+        ]
+        assert statuses == [404, 404, 404, 429], (
+            'Проверьте, что запросы с одного IP ограничиваются для любых '
+            'имён пользователей'
+        )
+
+    def test_real_ip_header(self, user):
+        client = APIClient(REMOTE_ADDR='127.0.0.1')
+        for number in range(3):
+            client.post(TOKEN_URL, token_data(f'user{number}'),
+                        HTTP_X_REAL_IP='10.0.0.1')
+        response = client.post(TOKEN_URL, token_data('user9'),
+                               HTTP_X_REAL_IP='10.0.0.2')
+        assert response.status_code == 404, (
+            'Проверьте, что за nginx клиент определяется по X-Real-IP'
+        )
+
+    def test_throttled_before_database(
+            self, user, django_assert_num_queries):
+        client = client_from('10.0.0.1')
+        for _ in range(2):
+            client.post(TOKEN_URL, token_data())
+        with django_assert_num_queries(0):
+            response = client.post(TOKEN_URL, token_data())
+        assert response.status_code == 429
+
+    def test_signup_limited(self):
+        client = client_from('10.0.0.1')
+        statuses = [
+            client.post(SIGNUP_URL, {
+                'username': f'newbie{number}',
+                'email': f'newbie{number}@yamdb.fake',
+            }).status_code
+            for number in range(4)
+        ]
+        assert statuses == [200, 200, 200, 429]
+
+    def test_no_burst_at_window_boundary(self, user, clock):
+        clock[0] = 6000059.0
+        for number in range(2):
+            assert client_from(f'10.0.0.{number}').post(
+                TOKEN_URL, token_data()
+            ).status_code == 400
+        clock[0] = 6000061.0
+        response = client_from('10.0.0.9').post(TOKEN_URL, token_data())
+        assert response.status_code == 429, (
+            'Проверьте, что в начале нового окна учитываются запросы '
+            'из конца предыдущего'
+        )
+        # Вес предыдущего окна уменьшается: через полминуты остаётся
+        # один запрос из двух, и ещё одна попытка проходит.
+        clock[0] = 6000091.0
+        assert client_from('10.0.0.9').post(
+            TOKEN_URL, token_data()
+        ).status_code == 400
+
+    def test_without_rates(self, settings, user):
+        settings.REST_FRAMEWORK = dict(
+            settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES={}
+        )
+        client = client_from('10.0.0.1')
+        for _ in range(5):
+            assert client.post(
+                TOKEN_URL, token_data()
+            ).status_code == 400
+
+    def test_zero_rate(self, settings, user):
+        settings.REST_FRAMEWORK = dict(
+            settings.REST_FRAMEWORK,
+            DEFAULT_THROTTLE_RATES={'token_ip': '0/min'},
+        )
+        response = client_from('10.0.0.1').post(TOKEN_URL, token_data())
+        assert response.status_code == 429, (
+            'Проверьте, что лимит 0/min закрывает маршрут без ошибки 500'
+        )
+        assert response['Retry-After'] == '15'
+
+    def test_rejected_request_is_not_counted(self, user):
+        client = client_from('10.0.0.1')
+        for _ in range(2):
+            client.post(TOKEN_URL, token_data())
+        for _ in range(3):
+            assert client.post(
+                TOKEN_URL, token_data()
+            ).status_code == 429
+        key = throttling.KEY.format(
+            scope='token_username',
+            ident=hashlib.md5(b'testuser').hexdigest(),
+            window=100000,
+        )
+        assert throttling.response_cache.get_cache().get(key) == 2, (
+            'Проверьте, что отклонённые запросы не увеличивают счётчик'
+        )
@@ -0,0 +1,143 @@
+import json
+import os
+
+import pytest
+from django.urls import resolve
+
+from api.urls import router, urlpatterns
+from core import cache as response_cache
+from core.benchmark import ROUTES, compare, run_benchmark
+from core.models import OutgoingEmail
+from reviews.models import Title, User
+
+VOLUMES = {
+    'titles': int(os.getenv('BENCHMARK_TITLES', 5)),
+    'genres': 3,
+    'reviews_per_title': int(os.getenv('BENCHMARK_REVIEWS', 3)),
+    'comments_per_review': 2,
+}
+
+
+class _Ids(dict):
+
+    def __missing__(self, key):
+        return '1'
+
+
+def _resolve(route):
+    return resolve(route.path.split('?')[0].format_map(_Ids()))
+
+
+def implements(viewset, action):
+    """Действие реализует сам набор, а не только миксины кэша."""
+    return any(
+        action in vars(klass)
+        for klass in viewset.__mro__
+        if klass.__module__ != 'api.mixins'
+    )
+
+
+def router_routes():
+    """Пары (имя маршрута, метод), которые обслуживает api/urls.py.
+
+    HEAD отдаётся тем же обработчиком, что и GET, поэтому не считается.
+    """
+    routes = set()
+    for pattern in router.urls:
+        actions = getattr(pattern.callback, 'actions', None)
+        if not actions or 'format' in pattern.pattern.regex.groupindex:
+            continue
+        viewset = pattern.callback.cls
+        for method, action in actions.items():
+            if (method != 'head'
+                    and method in viewset.http_method_names
+                    and implements(viewset, action)):
+                routes.add((pattern.name, method))
+    return routes
+
+
+class TestBenchmark:
+
+    def test_every_route_is_measured(self):
+        measured = {(route.url_name, route.method) for route in ROUTES}
+        missing = router_routes() - measured
+        assert not missing, (
+            f'Проверьте, что замеряются все маршруты из api/urls.py: '
+            f'нет {sorted(missing)}'
+        )
+        views = {
+            getattr(_resolve(route).func, 'view_class', None)
+            for route in ROUTES
+        }
+        assert {pattern.callback.view_class
+                for pattern in urlpatterns[1:]} <= views
+
+    def test_routes_match_url_names(self):
+        for route in ROUTES:
+            if route.url_name.startswith('auth-'):
+                continue
+            assert _resolve(route).url_name == route.url_name, route.name
+
+    def test_compare_reports_regressions(self):
+        baseline = {'routes': {'titles-list': {'p95_ms': 10, 'queries': 3}}}
+        current = {'routes': {'titles-list': {'p95_ms': 10.5, 'queries': 3}}}
+        assert compare(current, baseline, threshold=0.1) == []
+        current['routes']['titles-list'].update(p95_ms=12, queries=4)
+        assert len(compare(current, baseline, threshold=0.1)) == 2
+
+    @pytest.mark.django_db
+    def test_run_benchmark(self):
+        results = run_benchmark(
+            VOLUMES, iterations=int(os.getenv('BENCHMARK_ITERATIONS', 3))
+        )
+        assert set(results['routes']) == {route.name for route in ROUTES}
+        for name, row in results['routes'].items():
+            assert row['status'] in (200, 201, 204), (
+                f'{name}: код {row["status"]}'
+            )
+            assert row['p50_ms'] <= row['p95_ms'] <= row['p99_ms']
+        json.dumps(results)
+
+        output = os.getenv('BENCHMARK_OUTPUT')
+        if output:
+            with open(output, 'w') as stream:
+                json.dump(results, stream, indent=2, ensure_ascii=False)
+        baseline = os.getenv('BENCHMARK_BASELINE')
+        if baseline:
+            with open(baseline) as stream:
+                regressions = compare(
+                    results, json.load(stream),
+                    float(os.getenv('BENCHMARK_THRESHOLD', 0.1)),
+                )
+            assert not regressions, '\n'.join(regressions)
+
+    @pytest.mark.django_db
+    def test_run_leaves_no_changes(self):
+        cache = response_cache.get_cache()
+        cache.set('throttle-counter', 3)
+        routes = [route for route in ROUTES
+                  if route.name in ('auth-signup', 'auth-token',
+                                    'titles-list')]
+        results = run_benchmark(VOLUMES, iterations=2, routes=routes)
+        assert results['routes']['auth-token']['status'] == 200
+        assert not User.objects.exists(), (
+            'Проверьте, что пользователи замеров не остаются в базе'
+        )
+        assert not Title.objects.exists()
+        assert not OutgoingEmail.objects.exists(), (
+            'Проверьте, что письма регистраций замеров не попадают '
+            'в очередь'
+        )
+        assert cache.get('throttle-counter') == 3, (
+            'Проверьте, что замеры не очищают общий кэш'
+        )
+
+    @pytest.mark.django_db
+    def test_cold_cache_keeps_app_cache(self):
+        versions, _ = response_cache.get_state(['titles'])
+        routes = [route for route in ROUTES if route.name == 'titles-list']
+        run_benchmark(VOLUMES, iterations=2, routes=routes)
+        assert response_cache.get_state(['titles'])[0] == versions, (
+            'Проверьте, что сброс кэша перед замерами не сдвигает версии '
+            'кэша ответов приложения'
+        )
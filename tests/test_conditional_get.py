@@ -0,0 +1,74 @@
+import time
+
+import pytest
+from django.utils.http import http_date
+
+from reviews.models import Comments, Review
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def test_etag_not_modified(
+            self, api_client, titles, django_assert_num_queries):
+        response = api_client.get('/api/v1/titles/')
+        etag = response['ETag']
+        assert etag
+        with django_assert_num_queries(0):
+            response = api_client.get(
+                '/api/v1/titles/', HTTP_IF_NONE_MATCH=etag
+            )
+        assert response.status_code == 304, (
+            'Проверьте, что при совпадении ETag возвращается 304 '
+            'без запросов к базе'
+        )
+        assert response['ETag'] == etag
+
+    def test_if_modified_since_ignored(self, api_client, review,
+                                       another_user):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        response = api_client.get(url)
+        assert not response.has_header('Last-Modified')
+        since = http_date(time.time())
+        Review.objects.create(
+            title_id=review.title_id, author=another_user, text='.', score=1
+        )
+        response = api_client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        assert response.status_code == 200, (
+            'Проверьте, что изменение в ту же секунду не даёт 304 '
+            'по If-Modified-Since'
+        )
+        assert len(response.json()['results']) == 2
+
+    def test_etag_changes_on_write(self, api_client, review, another_user):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        etag = api_client.get(url)['ETag']
+        Review.objects.create(
+            title_id=review.title_id, author=another_user, text='.', score=1
+        )
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что изменение отзывов меняет ETag'
+        )
+        assert len(response.json()['results']) == 2
+
+        url = f'{url}{review.id}/comments/'
+        etag = api_client.get(url)['ETag']
+        Comments.objects.create(review=review, author=another_user, text='.')
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_etag_differs_between_roles(
+            self, api_client, admin_client, titles):
+        assert (
+            api_client.get('/api/v1/titles/')['ETag']
+            != admin_client.get('/api/v1/titles/')['ETag']
+        )
+
+    @pytest.mark.parametrize('url', ['/api/v1/categories/films/',
+                                     '/api/v1/genres/drama/'])
+    def test_retrieve_not_allowed(self, api_client, category, genres, url):
+        response = api_client.get(url, HTTP_IF_NONE_MATCH='"x"')
+        assert response.status_code == 405, (
+            'Проверьте, что у категорий и жанров нет отдельного объекта, '
+            'а кэширующие миксины не подменяют это ошибкой 500'
+        )
@@ -0,0 +1,230 @@
+import os
+import threading
+import time
+
+import pytest
+from django.core.management import call_command
+
+from core import cache as response_cache
+from core.db import pool as db_pool
+from core.db.pool import ConnectionPool, PoolTimeout
+
+
+class FakeCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, sql):
+        if self.connection.broken:
+            raise OSError('server closed the connection unexpectedly')
+
+
+class FakeConnection:
+    """Минимальный интерфейс соединения psycopg2, нужный пулу."""
+
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.status = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = 0
+
+    def close(self):
+        self.closed = 1
+
+
+def make_pool(**options):
+    return ConnectionPool(**dict(
+        {'size': 2, 'max_idle': 2, 'timeout': 0.2, 'check_interval': 30},
+        **options
+    ))
+
+
+class TestConnectionPool:
+
+    def test_released_connection_is_reused(self):
+        pool = make_pool()
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+        assert pool.acquire(FakeConnection) is connection, (
+            'Проверьте, что возвращённое в пул соединение выдаётся снова.'
+        )
+        stats = pool.stats()
+        assert (stats['checkouts'], stats['created'], stats['reused']) == (
+            2, 1, 1
+        )
+
+    def test_waits_for_free_connection(self):
+        pool = make_pool(size=1, timeout=2)
+        connection = pool.acquire(FakeConnection)
+        threading.Timer(0.05, pool.release, (connection,)).start()
+        assert pool.acquire(FakeConnection) is connection, (
+            'Проверьте, что при исчерпании пула запрос ждёт освободившееся '
+            'соединение, а не открывает новое.'
+        )
+        stats = pool.stats()
+        assert stats['waits'] == 1 and stats['wait_seconds'] > 0
+        assert stats['open'] == 1
+
+    def test_timeout_when_exhausted(self):
+        pool = make_pool(size=1, timeout=0.05)
+        pool.acquire(FakeConnection)
+        with pytest.raises(PoolTimeout):
+            pool.acquire(FakeConnection)
+        assert pool.stats()['timeouts'] == 1
+
+    def test_idle_connections_are_capped(self):
+        pool = make_pool(size=3, max_idle=1)
+        connections = [pool.acquire(FakeConnection) for _ in range(3)]
+        for connection in connections:
+            pool.release(connection)
+        stats = pool.stats()
+        assert stats['idle'] == 1 and stats['open'] == 1, (
+            'Проверьте, что свободных соединений остаётся не больше '
+            'max_idle, а лишние закрываются.'
+        )
+        assert [connection.closed for connection in connections] == [0, 1, 1]
+
+    def test_stale_connection_is_checked(self):
+        pool = make_pool(check_interval=0)
+        broken = pool.acquire(FakeConnection)
+        pool.release(broken)
+        broken.broken = True
+        connection = pool.acquire(FakeConnection)
+        assert connection is not broken and broken.closed, (
+            'Проверьте, что соединение, не прошедшее проверку, закрывается '
+            'и заменяется новым.'
+        )
+        assert pool.stats()['failed_checks'] == 1
+
+    def test_discarded_after_errors(self):
+        pool = make_pool()
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection, discard=True)
+        assert connection.closed
+        assert pool.stats()['open'] == 0
+        assert pool.acquire(FakeConnection) is not connection
+
+    def test_open_transaction_is_rolled_back(self):
+        pool = make_pool()
+        connection = pool.acquire(FakeConnection)
+        connection.status = 2
+        pool.release(connection)
+        assert connection.rollbacks == 1 and not connection.closed
+
+    def test_old_connection_is_recycled(self):
+        pool = make_pool(max_lifetime=0.01)
+        connection = pool.acquire(FakeConnection)
+        time.sleep(0.02)
+        pool.release(connection)
+        assert connection.closed and pool.stats()['recycled'] == 1
+
+    def test_failed_connect_frees_slot(self):
+        pool = make_pool(size=1)
+
+        def refuse():
+            raise OSError('connection refused')
+
+        with pytest.raises(OSError):
+            pool.acquire(refuse)
+        assert pool.stats()['open'] == 0
+        assert pool.acquire(FakeConnection) is not None
+
+    def test_check_runs_without_lock(self):
+        pool = make_pool(check_interval=0)
+        stale = pool.acquire(FakeConnection)
+        pool.release(stale)
+        checking, proceed = threading.Event(), threading.Event()
+
+        def slow_execute(sql):
+            checking.set()
+            proceed.wait(2)
+
+        stale.cursor = lambda: type('Cursor', (FakeCursor,), {
+            'execute': staticmethod(slow_execute)
+        })(stale)
+        checker = threading.Thread(target=pool.acquire,
+                                   args=(FakeConnection,))
+        checker.start()
+        assert checking.wait(2)
+        try:
+            started = time.monotonic()
+            stats = pool.stats()
+            other = pool.acquire(FakeConnection)
+            assert time.monotonic() - started < 0.1, (
+                'Проверьте, что SELECT 1 выполняется без блокировки пула: '
+                'другие потоки не должны ждать проверки.'
+            )
+            assert (stats['idle'], stats['in_use']) == (0, 1)
+            assert other is not stale
+        finally:
+            proceed.set()
+            checker.join()
+        assert pool.stats()['in_use'] == 2
+
+
+class TestPoolRegistry:
+
+    def test_new_pool_after_fork(self, monkeypatch):
+        monkeypatch.setattr(db_pool, '_pools', {})
+        options = {'size': 2, 'max_idle': 2}
+        pool = db_pool.get_pool('default', options)
+        assert db_pool.get_pool('default', options) is pool
+        pool.pid = os.getpid() + 1
+        assert db_pool.get_pool('default', options) is not pool, (
+            'Проверьте, что после fork воркер создаёт свой пул, а не '
+            'использует соединения родительского процесса.'
+        )
+
+    def test_stats_command(self, monkeypatch, capsys):
+        monkeypatch.setattr(db_pool, '_pools', {})
+        pool = db_pool.get_pool('default', {'size': 2, 'max_idle': 2})
+        pool.release(pool.acquire(FakeConnection))
+        pool.acquire(FakeConnection)
+        db_pool.publish_stats(response_cache.get_cache(), force=True)
+        call_command('db_pool_stats')
+        output = capsys.readouterr().out
+        assert f'{db_pool.worker_id()} default' in output
+        assert 'checkouts=2 created=1' in output
+        assert 'reuse_ratio=50.00%' in output
+
+    def test_stats_from_all_workers(self, monkeypatch):
+        monkeypatch.setattr(db_pool, '_pools', {})
+        monkeypatch.setattr(db_pool, '_slots', {})
+        cache = response_cache.get_cache()
+        pool = db_pool.get_pool('default', {'size': 2, 'max_idle': 2})
+        pool.release(pool.acquire(FakeConnection))
+        workers = [f'web-{number}:1' for number in range(5)]
+        for number, worker in enumerate(workers):
+            monkeypatch.setattr(db_pool, 'worker_id', lambda: worker)
+            monkeypatch.setattr(db_pool.os, 'getpid', lambda: number + 1)
+            db_pool.publish_stats(cache, force=True)
+        assert set(db_pool.collect_stats(cache)) == set(workers), (
+            'Проверьте, что метрики каждого воркера публикуются под '
+            'своим ключом и не теряются'
+        )
+        # Слот первого воркера истёк и достался другому.
+        slot = db_pool._slots[1]
+        cache.set(db_pool.SLOT_KEY.format(slot), 'web-9:1')
+        cache.set(db_pool.STATS_KEY.format('web-9:1'), {})
+        monkeypatch.setattr(db_pool, 'worker_id', lambda: workers[0])
+        monkeypatch.setattr(db_pool.os, 'getpid', lambda: 1)
+        db_pool.publish_stats(cache, force=True)
+        assert db_pool._slots[1] != slot
+        assert set(db_pool.collect_stats(cache)) == set(workers) | {'web-9:1'}
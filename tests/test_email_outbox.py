@@ -0,0 +1,65 @@
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+from core.models import OutgoingEmail
+
+
+class FailingBackend:
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def send_messages(self, messages):
+        raise ConnectionRefusedError('smtp down')
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+    url = '/api/v1/auth/signup/'
+    payload = {'username': 'newbie', 'email': 'newbie@yamdb.fake'}
+
+    def test_signup_enqueues_email(self, api_client, settings):
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        response = api_client.post(self.url, data=self.payload)
+        assert response.status_code == 200
+        assert mail.outbox == [], (
+            'Проверьте, что регистрация не отправляет письмо синхронно'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipient_list() == ['newbie@yamdb.fake']
+
+        call_command('send_outbox')
+        assert len(mail.outbox) == 1
+        assert 'confirmation_code' in mail.outbox[0].body
+        email.refresh_from_db()
+        assert email.sent_at is not None and email.attempts == 1
+
+        call_command('send_outbox')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что отправленное письмо не отправляется повторно'
+        )
+
+    def test_failed_send_is_retried_later(self, api_client, settings):
+        settings.EMAIL_BACKEND = 'tests.test_email_outbox.FailingBackend'
+        api_client.post(self.url, data=self.payload)
+        call_command('send_outbox')
+        email = OutgoingEmail.objects.get()
+        assert email.sent_at is None
+        assert email.attempts == 1
+        assert 'smtp down' in email.last_error
+        assert email.next_attempt_at > email.created, (
+            'Проверьте, что повторная попытка откладывается'
+        )
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        call_command('send_outbox')
+        assert mail.outbox == [], (
+            'Проверьте, что письмо не отправляется раньше назначенного времени'
+        )
@@ -0,0 +1,135 @@
+import json
+import logging
+import os
+import runpy
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+
+from core import warmup as core_warmup
+from core.db import pool as db_pool
+
+from .test_db_pool import FakeConnection
+
+CONFIG = os.path.join(settings.BASE_DIR, 'gunicorn.conf.py')
+
+
+def load_config(monkeypatch, **env):
+    for name, value in env.items():
+        monkeypatch.setenv(name, str(value))
+    return runpy.run_path(CONFIG)
+
+
+@pytest.fixture
+def not_ready(monkeypatch):
+    monkeypatch.setitem(core_warmup._state, 'ready', False)
+    monkeypatch.setitem(core_warmup._state, 'failed_at', None)
+
+
+class TestGunicornConfig:
+
+    def test_defaults(self, monkeypatch):
+        config = load_config(monkeypatch)
+        cpu_count = len(os.sched_getaffinity(0))
+        assert config['worker_class'] == 'gthread'
+        assert config['workers'] == cpu_count + 1
+        assert config['preload_app'] is True
+        assert config['max_requests'] > 0 and config['max_requests_jitter'] > 0
+        assert config['keepalive'] > 60, (
+            'Проверьте, что keepalive gunicorn дольше keepalive_timeout '
+            'соединений nginx с upstream'
+        )
+
+    def test_env_overrides(self, monkeypatch):
+        config = load_config(
+            monkeypatch, GUNICORN_WORKER_CLASS='sync', GUNICORN_WORKERS=3,
+            GUNICORN_PRELOAD=0, GUNICORN_MAX_REQUESTS=0,
+        )
+        assert (config['worker_class'], config['workers']) == ('sync', 3)
+        assert config['preload_app'] is False
+        assert config['max_requests'] == 0
+
+    def test_dockerfile_uses_config(self):
+        with open(os.path.join(settings.BASE_DIR, 'Dockerfile')) as stream:
+            assert 'gunicorn.conf.py' in stream.read()
+
+    @pytest.mark.django_db
+    def test_master_closes_connections(self, monkeypatch):
+        config = load_config(monkeypatch)
+        connection.ensure_connection()
+        server = mock.Mock(log=logging.getLogger('gunicorn.test'))
+        with mock.patch.object(connection, 'close') as close:
+            config['when_ready'](server)
+        assert close.called, (
+            'Проверьте, что при preload мастер закрывает соединения '
+            'с базой до запуска воркеров'
+        )
+
+    @pytest.mark.usefixtures('not_ready')
+    def test_master_closes_pooled_connections(self, monkeypatch):
+        monkeypatch.setattr(db_pool, '_pools', {})
+        config = load_config(monkeypatch, GUNICORN_WARMUP=0)
+        pool = db_pool.get_pool('default', {'size': 2, 'max_idle': 2})
+        # Django при close() возвращает соединение в пул мастера.
+        pool.release(pool.acquire(FakeConnection))
+        assert pool.stats()['idle'] == 1
+        server = mock.Mock(log=logging.getLogger('gunicorn.test'))
+        config['when_ready'](server)
+        stats = pool.stats()
+        assert (stats['idle'], stats['open']) == (0, 0), (
+            'Проверьте, что мастер закрывает соединения пула до запуска '
+            'воркеров, иначе их сокеты унаследуют все воркеры'
+        )
+
+    @pytest.mark.usefixtures('not_ready')
+    def test_warmup_runs_once_with_preload(self, monkeypatch):
+        config = load_config(monkeypatch)
+        server = mock.Mock(log=logging.getLogger('gunicorn.test'))
+        with mock.patch('core.warmup.warmup') as warmup:
+            config['when_ready'](server)
+            config['post_worker_init'](server)
+        assert warmup.call_count == 1, (
+            'Проверьте, что при preload прогрев выполняется в мастере, '
+            'а не в каждом воркере'
+        )
+
+    @pytest.mark.usefixtures('not_ready')
+    def test_warmup_in_workers_without_preload(self, monkeypatch):
+        config = load_config(monkeypatch, GUNICORN_PRELOAD=0)
+        worker = mock.Mock(log=logging.getLogger('gunicorn.test'))
+        with mock.patch('core.warmup.warmup') as warmup:
+            config['when_ready'](worker)
+            config['post_worker_init'](worker)
+        assert warmup.call_count == 1
+
+    @pytest.mark.usefixtures('not_ready')
+    def test_disabled_warmup_marks_ready(self, monkeypatch):
+        config = load_config(monkeypatch, GUNICORN_WARMUP=0)
+        server = mock.Mock(log=logging.getLogger('gunicorn.test'))
+        with mock.patch('core.warmup.warmup') as warmup:
+            config['when_ready'](server)
+        assert not warmup.called
+        assert core_warmup.is_ready(), (
+            'Проверьте, что с GUNICORN_WARMUP=0 процесс сразу готов'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestLoadTest:
+
+    def test_load_test_command(self, live_server, category, tmp_path,
+                               capsys):
+        output = tmp_path / 'load.json'
+        call_command(
+            'load_test', f'{live_server.url}/api/v1/categories/',
+            f'{live_server.url}/api/v1/genres/',
+            '--concurrency', '2', '--duration', '0.5',
+            '--output', str(output),
+        )
+        assert 'rps=' in capsys.readouterr().out
+        result = json.loads(output.read_text())
+        assert result['requests'] > 0 and result['errors'] == 0
+        assert result['statuses'] == {'200': result['requests']}
@@ -0,0 +1,155 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from reviews.importer import Importer
+from reviews.models import Comments, GenresTitles, Review, Title, User
+
+
+def _write(path, name, text):
+    (path / name).write_text(text, encoding='utf-8')
+
+
+@pytest.fixture
+def dump(tmp_path):
+    _write(tmp_path, 'users.csv',
+           'id,username,email,role,bio,first_name,last_name\n'
+           '100,bingobongo,bingo@yamdb.fake,user,,,\n'
+           '101,capt_obvious,capt@yamdb.fake,admin,,,\n')
+    _write(tmp_path, 'category.csv', 'id,name,slug\n1,Фильм,movie\n')
+    _write(tmp_path, 'genre.csv',
+           'id,name,slug\n1,Драма,drama\n2,Комедия,comedy\n')
+    _write(tmp_path, 'titles.ndjson', '\n'.join(json.dumps(row) for row in (
+        {'id': 1, 'name': 'Побег из Шоушенка', 'year': 1994,
+         'category': 'movie'},
+        {'id': 2, 'name': 'Крёстный отец', 'year': 1972, 'category': 'movie'},
+        {'id': 3, 'name': 'Без категории', 'year': 2000, 'category': None},
+    )) + '\n')
+    _write(tmp_path, 'genre_title.csv',
+           'id,title_id,genre_id\n1,1,drama\n2,2,1\n3,2,comedy\n')
+    _write(tmp_path, 'review.csv',
+           'id,title_id,text,author,score,pub_date\n'
+           '1,1,"Многострочный\nотзыв, с запятой",bingobongo,10,'
+           '2019-09-24T21:08:21.567Z\n'
+           '2,1,Неплохо,101,6,2019-09-25T21:08:21.567Z\n'
+           '3,2,Нет автора,nobody,5,2019-09-25T21:08:21.567Z\n')
+    _write(tmp_path, 'comments.csv',
+           'id,review_id,text,author,pub_date\n'
+           '1,1,Согласен,capt_obvious,2019-09-26T21:08:21.567Z\n')
+    return tmp_path
+
+
+@pytest.mark.django_db
+class TestImportYamdb:
+
+    def test_import(self, dump):
+        call_command('import_yamdb', str(dump), '--batch-size', '2')
+        assert User.objects.filter(username='bingobongo').exists()
+        assert Title.objects.count() == 3
+        assert Title.objects.get(pk=3).category is None
+        assert GenresTitles.objects.count() == 3
+        assert Review.objects.count() == 2, (
+            'Проверьте, что строки с неизвестным автором пропускаются'
+        )
+        review = Review.objects.get(pk=1)
+        assert review.text == 'Многострочный\nотзыв, с запятой'
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что дата публикации берётся из выгрузки'
+        )
+        assert Comments.objects.get(pk=1).author.username == 'capt_obvious'
+        title = Title.objects.get(pk=1)
+        assert (title.score_sum, title.review_count) == (16, 2), (
+            'Проверьте, что после загрузки пересчитываются рейтинги'
+        )
+
+    def test_resume_from_checkpoint(self, dump):
+        call_command('import_yamdb', str(dump), '--only', 'users',
+                     'categories', 'genres', 'titles')
+        checkpoint = json.loads(
+            (dump / '.import_checkpoint.json').read_text()
+        )
+        assert checkpoint['titles']['done'] is True
+
+        # Обрыв посреди отзывов: закоммичена только первая пачка.
+        checkpoint['reviews'] = {
+            'offset': len(
+                (dump / 'review.csv').read_bytes().split(b'\n2,1,')[0]
+            ) + 1,
+            'rows': 1, 'skipped': 0, 'done': False,
+        }
+        (dump / '.import_checkpoint.json').write_text(json.dumps(checkpoint))
+        call_command('import_yamdb', str(dump))
+        assert Title.objects.count() == 3
+        assert list(Review.objects.values_list('pk', flat=True)) == [2], (
+            'Проверьте, что загрузка продолжается с сохранённого смещения'
+        )
+
+        call_command('import_yamdb', str(dump), '--restart')
+        assert Review.objects.count() == 2
+        assert Title.objects.count() == 3, (
+            'Проверьте, что повторная загрузка не создаёт дублей'
+        )
+
+    def test_resume_after_crash_before_checkpoint(self, dump, monkeypatch):
+        _write(dump, 'titles.ndjson', '\n'.join(json.dumps(row) for row in (
+            {'name': f'Без id {number}', 'year': 2000, 'category': 'movie'}
+            for number in range(3)
+        )) + '\n')
+        call_command('import_yamdb', str(dump), '--only', 'users',
+                     'categories', 'genres')
+        save = Importer._save_checkpoint
+
+        def crash(importer):
+            monkeypatch.setattr(Importer, '_save_checkpoint', save)
+            raise OSError('No space left on device')
+
+        # Первая пачка закоммичена, а файл контрольной точки не записан.
+        monkeypatch.setattr(Importer, '_save_checkpoint', crash)
+        with pytest.raises(OSError):
+            call_command('import_yamdb', str(dump), '--only', 'titles',
+                         '--batch-size', '2')
+        assert Title.objects.count() == 2
+        call_command('import_yamdb', str(dump), '--only', 'titles',
+                     '--batch-size', '2')
+        assert sorted(Title.objects.values_list('name', flat=True)) == [
+            'Без id 0', 'Без id 1', 'Без id 2'
+        ], (
+            'Проверьте, что повтор после сбоя не вставляет второй раз '
+            'закоммиченные строки без id'
+        )
+
+    def test_copy_columns_cover_whole_batch(self):
+        batch = [Title(name='Без id', year=2000),
+                 Title(id=7, name='С id', year=2001)]
+        groups = Importer.copy_groups(Title, batch)
+        assert [
+            ([field.attname for field in fields][:2], instances)
+            for fields, instances in groups
+        ] == [
+            (['id', 'name'], [batch[1]]),
+            (['name', 'year'], [batch[0]]),
+        ], (
+            'Проверьте, что строки с id и без него копируются со своим '
+            'набором колонок, а не по первой строке пачки'
+        )
+
+    def test_numeric_slug_and_username(self, dump):
+        _write(dump, 'users.csv',
+               'id,username,email,role,bio,first_name,last_name\n'
+               '1,2001,odyssey@yamdb.fake,user,,,\n'
+               '2001,someone,someone@yamdb.fake,user,,,\n')
+        _write(dump, 'genre.csv',
+               'id,name,slug\n1,Драма,drama\n2,Антиутопия,1984\n'
+               '1984,Комедия,comedy\n')
+        _write(dump, 'genre_title.csv', 'id,title_id,genre\n1,1,1984\n')
+        _write(dump, 'review.csv',
+               'id,title_id,text,author,score,pub_date\n'
+               '1,1,Отзыв,2001,10,2019-09-24T21:08:21.567Z\n')
+        _write(dump, 'comments.csv', 'id,review_id,text,author,pub_date\n')
+        call_command('import_yamdb', str(dump))
+        assert Review.objects.get(pk=1).author.username == '2001', (
+            'Проверьте, что числовое имя пользователя в колонке author '
+            'ищется по username, а не считается id'
+        )
+        assert GenresTitles.objects.get().genre.slug == '1984'
@@ -0,0 +1,101 @@
+import datetime
+import io
+import json
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api import parsers, renderers
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+
+DATA = {
+    'id': 1,
+    'name': 'Строка\u2028с разделителем\u2029',
+    'rating': Decimal('7.5'),
+    'pub_date': datetime.datetime(
+        2020, 1, 2, 3, 4, 5, 678000, tzinfo=datetime.timezone.utc
+    ),
+    'date': datetime.date(2020, 1, 2),
+    'label': gettext_lazy('Отзыв'),
+    'genre': [{'name': 'Строка\u2028с разделителем\u2029', 'slug': 'drama'}],
+    'category': None,
+}
+
+
+class TestFastJSONRenderer:
+
+    def test_output_matches_drf(self):
+        assert FastJSONRenderer().render(DATA) == JSONRenderer().render(
+            DATA
+        ), (
+            'Проверьте, что рендерер отдаёт те же байты, что и рендерер DRF'
+        )
+
+    def test_indent_falls_back_to_drf(self):
+        rendered = FastJSONRenderer().render(
+            DATA, 'application/json; indent=4'
+        )
+        assert rendered == JSONRenderer().render(
+            DATA, 'application/json; indent=4'
+        )
+        assert b'\n    ' in rendered
+
+    def test_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(renderers, 'orjson', None)
+        monkeypatch.setattr(parsers, 'orjson', None)
+        assert FastJSONRenderer().render(DATA) == JSONRenderer().render(DATA)
+        body = JSONRenderer().render(DATA)
+        assert FastJSONParser().parse(io.BytesIO(body)) == json.loads(body)
+
+
+class TestFastJSONParser:
+
+    def test_parse_matches_drf(self):
+        body = JSONRenderer().render(DATA)
+        assert FastJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(
+            io.BytesIO(body)
+        )
+
+    @pytest.mark.parametrize('body', [b'{"a": ', b'{"a": NaN}', b'\xff'])
+    def test_invalid_json(self, body):
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(io.BytesIO(body))
+
+    @pytest.mark.django_db
+    def test_invalid_json_is_bad_request(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/titles/', data='{"name": ',
+            content_type='application/json'
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что некорректный JSON в теле запроса даёт ответ 400'
+        )
+        assert 'JSON parse error' in response.json()['detail']
+
+
+@pytest.mark.django_db
+def test_api_uses_fast_renderer(client, title):
+    response = client.get('/api/v1/titles/')
+    assert response.status_code == 200
+    assert isinstance(response.accepted_renderer, FastJSONRenderer)
+    assert response.json()['results'][0]['name'] == title.name
+
+
+@pytest.mark.django_db
+def test_benchmark_json_command(tmp_path):
+    output = tmp_path / 'json.json'
+    call_command(
+        'benchmark_json', seed=True, titles=5, limit=5, iterations=3,
+        output=str(output), stdout=io.StringIO()
+    )
+    results = json.loads(output.read_text())
+    titles = results['payloads']['titles']
+    assert set(titles) == {'JSONRenderer', 'FastJSONRenderer'}
+    assert (titles['JSONRenderer']['bytes']
+            == titles['FastJSONRenderer']['bytes'])
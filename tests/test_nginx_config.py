@@ -0,0 +1,106 @@
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from core.loadtest import run_load
+
+from .conftest import infra_dir_path
+
+
+@pytest.fixture(scope='module')
+def nginx_config():
+    with open(os.path.join(infra_dir_path, 'nginx', 'default.conf')) as f:
+        return f.read()
+
+
+def catalog_location(config):
+    match = re.search(
+        r'location ~ \^/api/v1/\(titles\|categories\|genres\)[^{]*\{'
+        r'(?P<body>[^}]*)\}', config
+    )
+    assert match, 'Проверьте, что для каталога есть отдельный location'
+    return match.group('body')
+
+
+class TestNginxConfig:
+
+    def test_upstream_keepalive(self, nginx_config):
+        assert re.search(r'upstream web \{[^}]*keepalive \d+;', nginx_config)
+        assert nginx_config.count('proxy_http_version 1.1;') == 2, (
+            'Проверьте, что keep-alive к upstream включён во всех location'
+        )
+        assert nginx_config.count('proxy_set_header Connection "";') == 2
+
+    def test_trace_header_dropped(self, nginx_config):
+        assert nginx_config.count(
+            'proxy_set_header X-Performance-Trace "";'
+        ) == 2, (
+            'Проверьте, что nginx не передаёт X-Performance-Trace в Django'
+        )
+        assert '$http_x_performance_trace' not in nginx_config
+
+    def test_gzip_json(self, nginx_config):
+        assert 'gzip on;' in nginx_config
+        assert re.search(r'gzip_types[^;]*application/json', nginx_config)
+
+    def test_micro_cache(self, nginx_config):
+        body = catalog_location(nginx_config)
+        assert 'proxy_cache api;' in body
+        assert re.search(r'proxy_cache_valid 200 \d+s;', body)
+        assert 'proxy_cache_bypass $api_cache_skip;' in body
+        assert 'proxy_no_cache $api_cache_skip;' in body
+        assert 'X-Cache-Status $upstream_cache_status' in body
+        assert '$http_accept' in body, (
+            'Проверьте, что формат ответа (Accept) входит в ключ кэша'
+        )
+        skip = re.search(r'map "?([^"\s]*)"? \$api_cache_skip', nginx_config)
+        assert skip and '$http_authorization' in skip.group(1), (
+            'Проверьте, что запросы с Authorization идут мимо кэша'
+        )
+
+
+class CacheStatusHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    statuses = iter(['MISS'] + ['HIT'] * 10 ** 6)
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            status = next(self.statuses)
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.send_header('X-Cache-Status', status)
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, *args):
+        pass
+
+
+def test_load_test_counts_cache_status():
+    server = HTTPServer(('127.0.0.1', 0), CacheStatusHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        result = run_load(
+            [f'http://127.0.0.1:{server.server_port}/api/v1/titles/'],
+            concurrency=1, duration=0.3,
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert result['cache']['MISS'] == 1
+    assert result['cache']['HIT'] == result['requests'] - 1
+
+
+def test_load_generator_in_separate_container():
+    with open(os.path.join(infra_dir_path, 'loadtest.sh')) as stream:
+        script = stream.read()
+    assert 'docker-compose run --rm' in script, (
+        'Проверьте, что нагрузочный тест запускается в отдельном '
+        'контейнере, а не рядом с воркерами gunicorn'
+    )
+    assert 'exec' not in script
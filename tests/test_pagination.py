@@ -0,0 +1,62 @@
+import pytest
+
+from reviews.models import Review
+
+
+def _walk(client, url, key='next'):
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        pages.append(data)
+        url = data[key]
+    return pages
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def test_limit_offset_is_default(self, api_client, titles):
+        response = api_client.get('/api/v1/titles/?limit=5&offset=5')
+        data = response.json()
+        assert data['count'] == 12, (
+            'Проверьте, что без cursor ответ остаётся в формате limit/offset'
+        )
+        assert len(data['results']) == 5
+
+    def test_titles_cursor_walk(self, api_client, titles):
+        pages = _walk(api_client, '/api/v1/titles/?cursor=&limit=5')
+        assert [len(page['results']) for page in pages] == [5, 5, 2]
+        assert 'count' not in pages[0]
+        years = [item['year'] for page in pages for item in page['results']]
+        assert years == sorted((title.year for title in titles), reverse=True)
+        assert pages[0]['previous'] is None
+
+        back = _walk(api_client, pages[-1]['previous'], key='previous')
+        assert [page['results'] for page in back] == [
+            page['results'] for page in reversed(pages[:-1])
+        ], 'Проверьте, что previous возвращает предыдущие страницы'
+
+    def test_reviews_cursor_with_equal_pub_date(
+            self, api_client, title, django_user_model):
+        for number in range(7):
+            author = django_user_model.objects.create_user(
+                username=f'author{number}', email=f'a{number}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text=str(number), score=5
+            )
+        Review.objects.update(pub_date=Review.objects.first().pub_date)
+        pages = _walk(
+            api_client, f'/api/v1/titles/{title.id}/reviews/?cursor=&limit=3'
+        )
+        ids = [item['id'] for page in pages for item in page['results']]
+        assert ids == sorted(ids, reverse=True) and len(ids) == 7, (
+            'Проверьте, что при одинаковой дате записи не теряются '
+            'и не повторяются'
+        )
+
+    def test_invalid_cursor(self, api_client, titles):
+        response = api_client.get('/api/v1/titles/?cursor=garbage')
+        assert response.status_code == 404
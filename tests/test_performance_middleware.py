@@ -0,0 +1,88 @@
+import json
+import logging
+
+import pytest
+
+from core.performance import Trace, fingerprint
+
+
+@pytest.mark.django_db
+class TestPerformanceMiddleware:
+    url = '/api/v1/titles/'
+
+    def test_not_sampled(self, api_client, settings, titles):
+        settings.PERFORMANCE_SAMPLE_RATE = 0
+        response = api_client.get(self.url)
+        assert 'Server-Timing' not in response
+
+    def test_server_timing_and_log(self, api_client, settings, titles,
+                                   caplog):
+        settings.PERFORMANCE_SAMPLE_RATE = 0
+        settings.PERFORMANCE_TRACE_SECRET = 'trace-secret'
+        with caplog.at_level(logging.INFO, logger='yamdb.performance'):
+            response = api_client.get(
+                self.url, HTTP_X_PERFORMANCE_TRACE='trace-secret'
+            )
+        header = response['Server-Timing']
+        for metric in ('total;dur=', 'view;dur=', 'db;dur=',
+                       'serializer;dur='):
+            assert metric in header, (
+                f'Проверьте, что Server-Timing содержит {metric}'
+            )
+        assert 'desc="3 queries"' in header
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['path'] == self.url
+        assert record['status'] == 200
+        assert record['queries'] == 3
+        assert record['serializer_ms'] > 0
+
+    @pytest.mark.parametrize('secret, header', [
+        ('', '1'), ('', ''), ('trace-secret', '1'), ('trace-secret', ''),
+    ])
+    def test_trace_requires_secret(self, api_client, settings, titles,
+                                   caplog, secret, header):
+        settings.PERFORMANCE_SAMPLE_RATE = 0
+        settings.PERFORMANCE_TRACE_SECRET = secret
+        with caplog.at_level(logging.INFO, logger='yamdb.performance'):
+            response = api_client.get(
+                self.url, HTTP_X_PERFORMANCE_TRACE=header
+            )
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что X-Performance-Trace действует только '
+            'с PERFORMANCE_TRACE_SECRET'
+        )
+        assert not caplog.records
+
+    def test_sample_rate_one(self, api_client, settings, titles, caplog):
+        settings.PERFORMANCE_SAMPLE_RATE = 1
+        with caplog.at_level(logging.INFO, logger='yamdb.performance'):
+            response = api_client.get(self.url)
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что замеры выборки не отдаются клиенту'
+        )
+        assert json.loads(caplog.records[-1].getMessage())['queries'] == 3
+
+
+class TestQueryFingerprint:
+
+    def test_parameters_ignored(self):
+        assert fingerprint(
+            'SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = \'x\''
+        ) == fingerprint('SELECT * FROM t WHERE id IN (%s) AND name = \'y\'')
+
+    def test_duplicates(self):
+        trace = Trace()
+
+        def execute(sql, params, many, context):
+            return None
+
+        for number in range(4):
+            trace.execute_wrapper(
+                execute, 'SELECT * FROM author WHERE id = %s', (number,),
+                False, {}
+            )
+        trace.execute_wrapper(execute, 'SELECT 1', (), False, {})
+        assert trace.query_count == 5
+        assert trace.duplicates(3) == [
+            {'sql': 'SELECT * FROM author WHERE id = %s', 'count': 4}
+        ], 'Проверьте, что повторяющиеся запросы определяются как N+1'
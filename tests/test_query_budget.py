@@ -0,0 +1,117 @@
+import pytest
+
+from reviews.models import Review
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+    """Количество запросов к базе не должно зависеть от размера страницы."""
+
+    @pytest.mark.parametrize('limit', (1, 5, 12))
+    def test_titles_list(
+            self, api_client, titles, another_user, limit,
+            django_assert_num_queries):
+        for title in titles:
+            Review.objects.create(
+                title=title, author=another_user, text='.', score=7
+            )
+        # count + страница произведений с категориями + жанры
+        with django_assert_num_queries(3):
+            response = api_client.get(f'/api/v1/titles/?limit={limit}')
+        assert response.status_code == 200
+        assert len(response.json()['results']) == limit
+        assert response.json()['results'][0]['rating'] == 7
+
+    def test_titles_filtered_list(
+            self, api_client, titles, django_assert_num_queries):
+        # + по одному запросу на проверку slug категории и жанра в фильтре
+        with django_assert_num_queries(5):
+            response = api_client.get(
+                '/api/v1/titles/?genre=drama&category=films&limit=10'
+            )
+        assert len(response.json()['results']) == 10
+
+    def test_title_detail(
+            self, api_client, title, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            response = api_client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200
+        assert len(response.json()['genre']) == 2
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/categories/?limit=50', '/api/v1/genres/?limit=50',
+    ))
+    def test_catalog_lists(
+            self, api_client, titles, url, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            response = api_client.get(url)
+        assert response.status_code == 200
+
+
+@pytest.mark.django_db
+class TestNestedQueryBudget:
+    """Отзывы и комментарии: проверка родителя, count и страница
+    с авторами — постоянное число запросов.
+    """
+
+    @pytest.fixture
+    def feedback(self, title, user, another_user):
+        from reviews.models import Comments
+        reviews = [
+            Review.objects.create(title=title, author=author, text='.',
+                                  score=5)
+            for author in (user, another_user)
+        ]
+        for number in range(6):
+            Comments.objects.create(
+                review=reviews[0], text=f'{number}',
+                author=(user, another_user)[number % 2]
+            )
+        return reviews[0]
+
+    @pytest.mark.parametrize('limit', (1, 10))
+    def test_reviews_list(
+            self, api_client, title, feedback, limit,
+            django_assert_num_queries):
+        with django_assert_num_queries(3):
+            response = api_client.get(
+                f'/api/v1/titles/{title.id}/reviews/?limit={limit}'
+            )
+        assert response.status_code == 200
+        assert response.json()['results'][0]['author']
+
+    @pytest.mark.parametrize('limit', (1, 10))
+    def test_comments_list(
+            self, api_client, title, feedback, limit,
+            django_assert_num_queries):
+        url = (f'/api/v1/titles/{title.id}/reviews/{feedback.id}/'
+               f'comments/?limit={limit}')
+        with django_assert_num_queries(3):
+            response = api_client.get(url)
+        assert response.status_code == 200
+        assert {item['author'] for item in response.json()['results']}
+
+    def test_comment_create_loads_review_once(
+            self, user_client, title, feedback, django_assert_num_queries):
+        url = f'/api/v1/titles/{title.id}/reviews/{feedback.id}/comments/'
+        user_client.get(url)
+        # отзыв с проверкой произведения + INSERT
+        with django_assert_num_queries(2):
+            response = user_client.post(url, data={'text': 'Согласен'})
+        assert response.status_code == 201
+        assert response.json()['author'] == 'TestUser'
+
+    def test_comment_of_other_title(
+            self, user_client, titles, feedback):
+        url = f'/api/v1/titles/{titles[0].id}/reviews/{feedback.id}/comments/'
+        assert user_client.post(url, data={'text': '.'}).status_code == 404
+        assert user_client.get(url).status_code == 404
+
+    def test_author_edit_without_loading_author(
+            self, user_client, title, feedback, django_assert_num_queries):
+        url = f'/api/v1/titles/{title.id}/reviews/{feedback.id}/'
+        user_client.get(url)
+        # произведение + отзыв с автором + UPDATE в точке сохранения
+        with django_assert_num_queries(5):
+            response = user_client.patch(url, data={'text': 'Изменено'})
+        assert response.status_code == 200
@@ -0,0 +1,38 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comments, GenresTitles, Review
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+
+    def test_explain_queries_compare(self, capsys):
+        call_command(
+            'explain_queries', '--seed', '--titles', '5',
+            '--reviews-per-title', '4', '--comments-per-review', '2',
+            '--repeat', '1', '--compare',
+        )
+        output = capsys.readouterr().out
+        assert Review.objects.count() == 20
+        assert Comments.objects.count() == 40
+        for name in ('reviews', 'reviews_cursor', 'comments',
+                     'title_genres', 'titles_by_genre'):
+            assert name in output
+        assert 'без индексов' in output
+        assert 'review_title_pub_date_idx' in output, (
+            'Проверьте, что отзывы произведения выбираются по составному '
+            'индексу'
+        )
+        assert 'comment_review_pub_date_idx' in output
+
+    def test_duplicate_genres_linked_once(self, admin_client, category,
+                                          genres):
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Дубль', 'year': 2000, 'category': 'films',
+            'genre': ['drama', 'drama'],
+        }, format='json')
+        assert response.status_code == 201
+        assert GenresTitles.objects.count() == 1, (
+            'Проверьте, что повтор жанра не создаёт вторую связь'
+        )
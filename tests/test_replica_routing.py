@@ -0,0 +1,107 @@
+import time
+
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from core import cache as response_cache
+from core.db_router import reset_health
+
+REPLICA = 'replica_test'
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    """Второе подключение к той же тестовой базе под видом реплики."""
+    created = []
+
+    def add(alias=REPLICA, **overrides):
+        connections.databases[alias] = dict(
+            connections.databases['default'], **overrides
+        )
+        created.append(alias)
+        settings.DATABASE_REPLICAS = created[:]
+        return alias
+
+    reset_health()
+    yield add
+    reset_health()
+    for alias in created:
+        connections[alias].close()
+        delattr(connections._connections, alias)
+        del connections.databases[alias]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReplicaRouting:
+    url = '/api/v1/categories/'
+
+    def _queries(self, client, method, alias, **kwargs):
+        with CaptureQueriesContext(connections[alias]) as captured:
+            response = getattr(client, method)(self.url, **kwargs)
+        return response, len(captured)
+
+    def test_reads_go_to_replica(self, admin_client, replica):
+        replica()
+        response, replica_queries = self._queries(
+            admin_client, 'get', REPLICA
+        )
+        assert response.status_code == 200
+        assert replica_queries > 0, (
+            'Проверьте, что GET-запросы читают из реплики'
+        )
+
+    def test_write_then_read_sticks_to_primary(self, admin_client, replica,
+                                               settings):
+        replica()
+        response, replica_queries = self._queries(
+            admin_client, 'post', REPLICA,
+            data={'name': 'Фильм', 'slug': 'film'}
+        )
+        assert response.status_code == 201
+        assert replica_queries == 0, (
+            'Проверьте, что запись идёт в основную базу'
+        )
+
+        response, replica_queries = self._queries(
+            admin_client, 'get', 'default'
+        )
+        assert replica_queries > 0
+        assert response.json()['count'] == 1, (
+            'Проверьте, что после записи клиент читает из основной базы'
+        )
+
+    def test_unhealthy_replica_falls_back(self, admin_client, replica,
+                                          tmp_path):
+        replica(NAME=str(tmp_path / 'missing' / 'replica.sqlite3'),
+                ENGINE='django.db.backends.sqlite3')
+        response, primary_queries = self._queries(
+            admin_client, 'get', 'default'
+        )
+        assert response.status_code == 200
+        assert primary_queries > 0, (
+            'Проверьте, что при недоступной реплике чтение идёт в '
+            'основную базу'
+        )
+
+    def test_recently_changed_data_is_read_from_primary(self, client,
+                                                        replica, settings):
+        replica()
+        # Проверка реплики не должна попасть в замер.
+        client.get('/api/v1/genres/')
+        response_cache.bump('categories')
+        with CaptureQueriesContext(connections[REPLICA]) as captured:
+            response = client.get(self.url + '?limit=5')
+        assert response.status_code == 200
+        assert len(captured) == 0, (
+            'Проверьте, что ответ, который ляжет в кэш, после недавнего '
+            'изменения читается из основной базы, а не из отстающей реплики'
+        )
+        response_cache.get_cache().set(
+            response_cache.MODIFIED_KEY.format('categories'),
+            time.time() - settings.DATABASE_REPLICA_MAX_LAG - 1, None
+        )
+        with CaptureQueriesContext(connections[REPLICA]) as captured:
+            response = client.get(self.url + '?limit=6')
+        assert response.status_code == 200
+        assert len(captured) > 0
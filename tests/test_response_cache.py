@@ -0,0 +1,52 @@
+import pytest
+
+from core import cache as response_cache
+from reviews.models import Categories, Review
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def test_hit_after_miss(
+            self, api_client, titles, django_assert_num_queries):
+        response = api_client.get('/api/v1/titles/')
+        assert response['X-Cache'] == 'MISS'
+        with django_assert_num_queries(0):
+            cached = api_client.get('/api/v1/titles/')
+        assert cached['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный GET отдаётся из кэша без запросов к БД'
+        )
+        assert cached.json() == response.json()
+        assert response_cache.stats() == {'hits': 1, 'misses': 1}
+
+    def test_key_depends_on_query_and_role(
+            self, api_client, admin_client, titles):
+        api_client.get('/api/v1/titles/?limit=2')
+        assert api_client.get('/api/v1/titles/?limit=3')['X-Cache'] == 'MISS'
+        assert admin_client.get('/api/v1/titles/?limit=2')['X-Cache'] == (
+            'MISS'
+        ), 'Проверьте, что роль пользователя входит в ключ кэша'
+
+    def test_write_invalidates(self, api_client, admin_client, title, user):
+        api_client.get(f'/api/v1/titles/{title.id}/')
+        api_client.get('/api/v1/categories/')
+
+        Review.objects.create(title=title, author=user, text='.', score=4)
+        response = api_client.get(f'/api/v1/titles/{title.id}/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 4, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведений'
+        )
+
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Книга', 'slug': 'books'}
+        )
+        response = api_client.get('/api/v1/categories/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 2
+
+        Categories.objects.filter(slug='films').first().delete()
+        response = api_client.get(f'/api/v1/titles/{title.id}/')
+        assert response.json()['category'] is None, (
+            'Проверьте, что удаление категории сбрасывает кэш произведений'
+        )
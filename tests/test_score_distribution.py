@@ -0,0 +1,121 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title, TitleScoreCount
+from reviews.stats import score_distributions
+
+
+def histogram(title):
+    return {score: count for score, count
+            in score_distributions([title.id])[title.id].items() if count}
+
+
+@pytest.mark.django_db
+class TestScoreCounts:
+
+    def test_counts_follow_review_changes(self, title, user, another_user):
+        Review.objects.create(title=title, author=user, text='a', score=9)
+        review = Review.objects.create(
+            title=title, author=another_user, text='b', score=9
+        )
+        assert histogram(title) == {9: 2}, (
+            'Проверьте, что при создании отзыва растёт счётчик его оценки'
+        )
+
+        review = Review.objects.get(pk=review.pk)
+        review.score = 3
+        review.save()
+        assert histogram(title) == {9: 1, 3: 1}, (
+            'Проверьте, что при изменении оценки отзыв переносится '
+            'в счётчик новой оценки'
+        )
+
+        review.delete()
+        assert histogram(title) == {9: 1}, (
+            'Проверьте, что при удалении отзыва его оценка вычитается '
+            'из гистограммы'
+        )
+
+    def test_rebuild_command(self, title, user, another_user):
+        Review.objects.create(title=title, author=user, text='a', score=7)
+        Review.objects.create(
+            title=title, author=another_user, text='b', score=2
+        )
+        TitleScoreCount.objects.all().delete()
+        TitleScoreCount.objects.create(title=title, score=5, count=10)
+
+        call_command('rebuild_title_stats')
+
+        assert histogram(title) == {7: 1, 2: 1}, (
+            'Проверьте, что rebuild_title_stats пересчитывает гистограммы '
+            'оценок по таблице отзывов'
+        )
+
+
+@pytest.mark.django_db
+class TestScoreDistributionAPI:
+
+    def test_distribution(self, api_client, title, user, another_user):
+        Review.objects.create(title=title, author=user, text='a', score=8)
+        Review.objects.create(
+            title=title, author=another_user, text='b', score=10
+        )
+        url = f'/api/v1/titles/{title.id}/score-distribution/'
+        response = api_client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        assert data['id'] == title.id and data['review_count'] == 2
+        assert list(data['distribution']) == [str(n) for n in range(1, 11)]
+        assert data['distribution']['8'] == 1
+        assert data['distribution']['10'] == 1
+        assert sum(data['distribution'].values()) == 2
+
+    def test_distribution_is_invalidated(self, user_client, title):
+        url = f'/api/v1/titles/{title.id}/score-distribution/'
+        assert user_client.get(url).json()['distribution']['6'] == 0
+        user_client.post(f'/api/v1/titles/{title.id}/reviews/',
+                         data={'text': 'Да', 'score': 6})
+        assert user_client.get(url).json()['distribution']['6'] == 1, (
+            'Проверьте, что новый отзыв сразу виден в гистограмме, '
+            'несмотря на кэш ответов'
+        )
+
+    @pytest.mark.parametrize('pk', ['999', 'abc'])
+    def test_missing_title(self, api_client, pk):
+        response = api_client.get(f'/api/v1/titles/{pk}/score-distribution/')
+        assert response.status_code == 404, (
+            'Проверьте, что для несуществующего или нечислового id '
+            'возвращается 404'
+        )
+
+    def test_batch(self, api_client, titles, user):
+        for title in titles[:3]:
+            Review.objects.create(title=title, author=user, text='a',
+                                  score=title.id % 10 + 1)
+        ids = [title.id for title in titles] + [10 ** 6]
+        url = '/api/v1/titles/score-distribution/?ids=' + ','.join(
+            map(str, ids)
+        )
+        api_client.get(url)
+        with CaptureQueriesContext(connection) as captured:
+            response = api_client.get(url.replace('ids=', 'ids=' + '1,'))
+        assert response.status_code == 200
+        assert len(captured) <= 2, (
+            'Проверьте, что гистограммы нескольких произведений читаются '
+            'постоянным числом запросов'
+        )
+        results = response.json()['results']
+        assert [item['id'] for item in results] == sorted(
+            title.id for title in titles
+        )
+        first = results[0]
+        assert first['distribution'][str(first['id'] % 10 + 1)] == 1
+
+    @pytest.mark.parametrize('ids', ['', 'a,b', ','.join(['1'] * 101)])
+    def test_batch_validation(self, api_client, ids):
+        response = api_client.get(
+            f'/api/v1/titles/score-distribution/?ids={ids}'
+        )
+        assert response.status_code == 400
@@ -0,0 +1,63 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comments
+
+
+def _sql(captured):
+    return ' '.join(query['sql'] for query in captured.captured_queries)
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+
+    def test_titles_fields(self, api_client, titles):
+        with CaptureQueriesContext(connection) as captured:
+            response = api_client.get('/api/v1/titles/?fields=id,name')
+        assert response.status_code == 200
+        assert set(response.json()['results'][0]) == {'id', 'name'}
+        assert len(captured) == 2, (
+            'Проверьте, что без поля genre не выполняется prefetch жанров'
+        )
+        sql = _sql(captured)
+        assert 'reviews_categories' not in sql
+        assert 'description' not in sql
+        assert 'score_sum' not in sql
+
+    def test_titles_omit(self, api_client, titles, title):
+        response = api_client.get(f'/api/v1/titles/{title.id}/?omit=genre')
+        assert set(response.json()) == {
+            'id', 'name', 'year', 'rating', 'description', 'category'
+        }
+        assert response.json()['category']['slug'] == 'films'
+
+    def test_reviews_without_author(self, api_client, title, review):
+        url = f'/api/v1/titles/{title.id}/reviews/?omit=author,text'
+        with CaptureQueriesContext(connection) as captured:
+            response = api_client.get(url)
+        assert set(response.json()['results'][0]) == {'id', 'score',
+                                                      'pub_date'}
+        assert 'reviews_user' not in _sql(captured)
+
+    def test_comments_fields(self, api_client, title, review, user):
+        Comments.objects.create(review=review, author=user, text='.')
+        url = (f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+               '?fields=author')
+        response = api_client.get(url)
+        assert response.json()['results'] == [{'author': user.username}]
+
+    def test_users_omit(self, admin_client):
+        response = admin_client.get('/api/v1/users/?omit=bio,role')
+        assert 'bio' not in response.json()['results'][0]
+        assert 'role' not in response.json()['results'][0]
+
+    def test_write_returns_all_fields(self, admin_client, category, genres):
+        response = admin_client.post('/api/v1/titles/?fields=id', data={
+            'name': 'Новое', 'year': 2000, 'category': 'films',
+            'genre': ['drama'],
+        }, format='json')
+        assert response.status_code == 201
+        assert 'genre' in response.json(), (
+            'Проверьте, что ?fields= не влияет на запись'
+        )
@@ -0,0 +1,85 @@
+import pytest
+
+from reviews.models import GenresTitles, Title
+
+
+@pytest.mark.django_db
+class TestTitleBatch:
+    url = '/api/v1/titles/'
+
+    def test_batch_create(self, admin_client, category, genres):
+        payload = [
+            {'name': f'Пакет {number}', 'year': 2000 + number,
+             'category': 'films', 'genre': ['drama', 'comedy']}
+            for number in range(5)
+        ]
+        response = admin_client.post(self.url, data=payload, format='json')
+        assert response.status_code == 201
+        data = response.json()
+        assert data['errors'] == []
+        assert len(data['results']) == 5
+        assert Title.objects.count() == 5
+        assert GenresTitles.objects.count() == 10, (
+            'Проверьте, что связи с жанрами создаются для каждого элемента'
+        )
+
+    def test_partial_errors(self, admin_client, category, genres, title):
+        payload = [
+            {'name': 'Хорошее', 'year': 2001, 'genre': ['drama']},
+            {'name': 'Из будущего', 'year': 3000},
+            {'name': 'Чужой жанр', 'year': 2001, 'genre': ['horror']},
+            {'id': title.id, 'name': 'Переименовано', 'genre': ['comedy']},
+        ]
+        response = admin_client.post(self.url, data=payload, format='json')
+        assert response.status_code == 201
+        errors = response.json()['errors']
+        assert [error['index'] for error in errors] == [1, 2], (
+            'Проверьте, что ошибки возвращаются с индексом элемента'
+        )
+        assert 'genre' in errors[1]['errors']
+        title.refresh_from_db()
+        assert title.name == 'Переименовано' and title.year == 1994
+        assert list(title.genre.values_list('slug', flat=True)) == ['comedy']
+        assert Title.objects.filter(name='Хорошее').exists()
+
+    def test_repeated_id(self, admin_client, genres, title):
+        payload = [
+            {'id': title.id, 'genre': ['drama']},
+            {'id': title.id, 'genre': ['drama']},
+        ]
+        response = admin_client.post(self.url, data=payload, format='json')
+        assert response.status_code == 201
+        errors = response.json()['errors']
+        assert [error['index'] for error in errors] == [1], (
+            'Проверьте, что повторный id в пакете возвращается как ошибка '
+            'элемента'
+        )
+        assert 'id' in errors[0]['errors']
+        assert GenresTitles.objects.filter(title=title).count() == 1
+
+    def test_strict_mode(self, admin_client, category, genres):
+        payload = [
+            {'name': 'Хорошее', 'year': 2001},
+            {'name': 'Плохая категория', 'year': 2001, 'category': 'none'},
+        ]
+        response = admin_client.post(
+            f'{self.url}?strict=true', data=payload, format='json'
+        )
+        assert response.status_code == 400
+        assert not Title.objects.exists(), (
+            'Проверьте, что в строгом режиме пакет не сохраняется при ошибке'
+        )
+
+    def test_batch_requires_admin(self, user_client):
+        response = user_client.post(
+            self.url, data=[{'name': 'x', 'year': 2000}], format='json'
+        )
+        assert response.status_code == 403
+
+    def test_single_create_still_works(self, admin_client, category, genres):
+        response = admin_client.post(self.url, data={
+            'name': 'Одно', 'year': 2000, 'category': 'films',
+            'genre': ['drama', 'comedy'],
+        }, format='json')
+        assert response.status_code == 201
+        assert sorted(response.json()['genre']) == ['comedy', 'drama']
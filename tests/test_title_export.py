@@ -0,0 +1,90 @@
+import gzip
+import json
+
+import pytest
+
+from api.export import accepts_gzip
+from reviews.models import Comments, Review
+
+
+def _lines(response):
+    content = b''.join(response.streaming_content)
+    if response.get('Content-Encoding') == 'gzip':
+        content = gzip.decompress(content)
+    return [json.loads(line) for line in content.decode().splitlines()]
+
+
+@pytest.mark.django_db
+class TestTitleExport:
+    url = '/api/v1/titles/export/'
+
+    def test_admin_only(self, api_client, user_client, titles):
+        assert api_client.get(self.url).status_code == 401
+        assert user_client.get(self.url).status_code == 403
+
+    def test_titles_stream(self, admin_client, titles, title,
+                           django_assert_num_queries):
+        _lines(admin_client.get(self.url))
+        # произведения + связи с жанрами, без запросов на каждую строку
+        with django_assert_num_queries(2):
+            response = admin_client.get(self.url)
+            rows = _lines(response)
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        assert len(rows) == len(titles) + 1
+        exported = next(row for row in rows if row['id'] == title.id)
+        assert {genre['slug'] for genre in exported['genre']} == {
+            'drama', 'comedy'
+        }
+        assert exported['category']['slug'] == 'films'
+        assert 'reviews' not in exported
+
+    def test_reviews_and_comments(self, admin_client, title, review, user,
+                                  another_user):
+        Review.objects.create(
+            title=title, author=another_user, text='Второй', score=3
+        )
+        Comments.objects.create(review=review, author=another_user, text='!')
+        response = admin_client.get(f'{self.url}?comments=true')
+        (exported,) = _lines(response)
+        assert exported['rating'] == 6
+        assert len(exported['reviews']) == 2
+        first = next(item for item in exported['reviews']
+                     if item['id'] == review.id)
+        assert first['author'] == user.username
+        assert [comment['text'] for comment in first['comments']] == ['!'], (
+            'Проверьте, что комментарии выгружаются внутри своих отзывов'
+        )
+
+    def test_gzip(self, admin_client, titles):
+        response = admin_client.get(
+            f'{self.url}?reviews=true', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        assert response['Content-Encoding'] == 'gzip'
+        rows = _lines(response)
+        assert len(rows) == len(titles)
+        assert all(row['reviews'] == [] for row in rows)
+
+    def test_gzip_refused(self, admin_client, titles):
+        response = admin_client.get(
+            self.url, HTTP_ACCEPT_ENCODING='gzip;q=0, identity'
+        )
+        assert not response.has_header('Content-Encoding'), (
+            'Проверьте, что при gzip;q=0 выгрузка не сжимается'
+        )
+        assert len(_lines(response)) == len(titles)
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip', True),
+    ('deflate, gzip;q=0.5', True),
+    ('*', True),
+    ('gzip;q=0', False),
+    ('gzip; q=0.0, deflate', False),
+    ('*;q=1, gzip;q=0', False),
+    ('deflate, br', False),
+    ('', False),
+])
+def test_accepts_gzip(header, expected):
+    assert accepts_gzip(header) is expected, (
+        'Проверьте, что выгрузка учитывает вес gzip в Accept-Encoding'
+    )
@@ -0,0 +1,97 @@
+import pytest
+from django.db import connection
+
+from reviews.models import Review, Title
+from reviews.stats import rebuild_title_stats
+
+URL = '/api/v1/titles/'
+
+
+@pytest.fixture
+def rated(titles, user, another_user):
+    """Первые шесть произведений с оценками; остальные без отзывов."""
+    scores = [(3, 4), (9,), (7, 10), (5,), (10, 6), (1, 2)]
+    for title, title_scores in zip(titles, scores):
+        for author, score in zip((user, another_user), title_scores):
+            Review.objects.create(title=title, author=author, text='.',
+                                  score=score)
+    return titles
+
+
+def ids(response):
+    assert response.status_code == 200, response.content
+    return [item['id'] for item in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestTitleOrdering:
+
+    def test_average_score_is_stored(self, rated):
+        title = Title.objects.get(pk=rated[0].pk)
+        assert title.average_score == 3.5, (
+            'Проверьте, что средняя оценка сохраняется при изменении отзывов'
+        )
+        Review.objects.filter(title=title).first().delete()
+        title.refresh_from_db()
+        assert title.average_score in (3, 4)
+        Title.objects.update(average_score=0)
+        rebuild_title_stats()
+        title.refresh_from_db()
+        assert title.average_score in (3, 4), (
+            'Проверьте, что rebuild_title_stats пересчитывает среднюю оценку'
+        )
+
+    def test_ordering_by_rating(self, api_client, rated):
+        top = ids(api_client.get(URL, {'ordering': '-rating', 'limit': 6}))
+        expected = [rated[index].id for index in (1, 2, 4, 3, 0, 5)]
+        assert top == expected, (
+            'Проверьте, что ?ordering=-rating сортирует произведения '
+            'по убыванию рейтинга'
+        )
+        bottom = ids(api_client.get(URL, {'ordering': 'rating', 'limit': 12}))
+        assert bottom[-6:] == expected[::-1]
+
+    def test_ordering_by_review_count(self, api_client, rated):
+        result = ids(api_client.get(
+            URL, {'ordering': '-review_count', 'limit': 4}
+        ))
+        assert result[:4] == sorted(
+            (rated[index].id for index in (0, 2, 4, 5)), reverse=True
+        )
+
+    def test_ordering_with_filters(self, api_client, rated):
+        Title.objects.filter(pk=rated[1].pk).update(year=1900)
+        result = ids(api_client.get(
+            URL, {'ordering': '-rating', 'genre': 'drama', 'year': 1900}
+        ))
+        assert result == [rated[1].id]
+        result = ids(api_client.get(
+            URL, {'ordering': '-rating', 'category': 'films', 'limit': 2}
+        ))
+        assert result == [rated[1].id, rated[2].id]
+
+    def test_cursor_follows_ordering(self, api_client, rated):
+        response = api_client.get(
+            URL, {'ordering': '-rating', 'cursor': '', 'limit': 4}
+        )
+        first = ids(response)
+        second = ids(api_client.get(response.json()['next']))
+        expected = [rated[index].id for index in (1, 2, 4, 3, 0, 5)]
+        assert (first + second)[:6] == expected, (
+            'Проверьте, что курсорная пагинация сохраняет порядок ?ordering'
+        )
+        assert len(first + second) == 8
+
+    def test_unknown_ordering(self, api_client, rated):
+        response = api_client.get(URL, {'ordering': 'name'})
+        assert response.status_code == 400
+
+    def test_rating_index_is_used(self):
+        if connection.vendor != 'sqlite':
+            pytest.skip('План проверяется на SQLite.')
+        plan = Title.objects.order_by(
+            '-average_score', '-id'
+        )[:10].explain()
+        assert 'title_average_score_idx' in plan, (
+            'Проверьте, что сортировка по рейтингу читает индекс'
+        )
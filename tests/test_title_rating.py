@@ -0,0 +1,84 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_rating_follows_review_changes(self, title, user, another_user):
+        Review.objects.create(title=title, author=user, text='a', score=9)
+        review = Review.objects.create(
+            title=title, author=another_user, text='b', score=4
+        )
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count) == (13, 2), (
+            'Проверьте, что при создании отзыва обновляются счётчики '
+            'произведения'
+        )
+        assert title.rating == 6.5
+
+        review = Review.objects.get(pk=review.pk)
+        review.score = 10
+        review.save()
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count) == (19, 2), (
+            'Проверьте, что при изменении оценки сумма сдвигается на разницу'
+        )
+
+        review.delete()
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count) == (9, 1), (
+            'Проверьте, что при удалении отзыва его оценка вычитается'
+        )
+
+    def test_rating_through_api(self, user_client, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        response = user_client.post(url, data={'text': 'Да', 'score': 8})
+        assert response.status_code == 201
+        review_id = response.json()['id']
+        user_client.patch(f'{url}{review_id}/', data={'score': 3})
+
+        response = user_client.get(f'/api/v1/titles/{title.id}/')
+        assert response.json()['rating'] == 3, (
+            'Проверьте, что рейтинг в ответе берётся из счётчиков произведения'
+        )
+
+        user_client.delete(f'{url}{review_id}/')
+        response = user_client.get(f'/api/v1/titles/{title.id}/')
+        assert response.json()['rating'] is None
+
+    def test_rating_read_costs_no_queries(
+            self, title, review, django_assert_num_queries):
+        title = Title.objects.get(pk=title.pk)
+        with django_assert_num_queries(0):
+            assert title.rating == 9
+
+    def test_rebuild_title_stats(self, title, review):
+        Title.objects.filter(pk=title.pk).update(score_sum=0, review_count=7)
+        call_command('rebuild_title_stats')
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count) == (9, 1), (
+            'Проверьте, что команда rebuild_title_stats восстанавливает '
+            'счётчики по таблице отзывов'
+        )
+
+    def test_rebuild_resets_cached_responses(self, api_client, title,
+                                             review):
+        Title.objects.filter(pk=title.pk).update(score_sum=0, review_count=7)
+        url = f'/api/v1/titles/{title.pk}/'
+        response = api_client.get(url)
+        assert response.json()['rating'] == 0
+        etag = response['ETag']
+        assert api_client.get(url)['X-Cache'] == 'HIT'
+        call_command('rebuild_title_stats')
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что после rebuild_title_stats старый ETag '
+            'не даёт 304'
+        )
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 9, (
+            'Проверьте, что rebuild_title_stats сбрасывает кэш ответов'
+        )
@@ -0,0 +1,56 @@
+import pytest
+
+from reviews.models import Title
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    @pytest.fixture
+    def catalog(self, category):
+        return [
+            Title.objects.create(
+                name='Побег из Шоушенка', year=1994, category=category,
+                description='Драма о надежде'
+            ),
+            Title.objects.create(
+                name='Зелёная миля', year=1999, category=category,
+                description='Драма по роману Стивена Кинга'
+            ),
+            Title.objects.create(
+                name='Сияние', year=1980, category=category,
+                description='Экранизация романа Кинга'
+            ),
+        ]
+
+    def _names(self, client, query):
+        response = client.get('/api/v1/titles/', {'search': query})
+        assert response.status_code == 200
+        return [item['name'] for item in response.json()['results']]
+
+    def test_search_by_name_and_description(self, api_client, catalog):
+        assert self._names(api_client, 'шоушен') == ['Побег из Шоушенка'], (
+            'Проверьте, что слова запроса ищутся как префиксы'
+        )
+        assert set(self._names(api_client, 'кинга')) == {
+            'Зелёная миля', 'Сияние'
+        }, 'Проверьте, что поиск идёт и по описанию'
+        assert self._names(api_client, 'драма кинга') == ['Зелёная миля']
+        assert self._names(api_client, '???') == []
+
+    def test_search_is_combined_with_filters(self, api_client, catalog):
+        response = api_client.get(
+            '/api/v1/titles/', {'search': 'кинга', 'year': 1980}
+        )
+        assert [item['name'] for item in response.json()['results']] == [
+            'Сияние'
+        ]
+
+    def test_index_follows_title_writes(self, api_client, catalog):
+        title = catalog[0]
+        title.name = 'Крёстный отец'
+        title.save()
+        assert self._names(api_client, 'шоушенка') == []
+        assert self._names(api_client, 'крёстный') == ['Крёстный отец']
+        title.delete()
+        assert self._names(api_client, 'крёстный') == []
@@ -0,0 +1,47 @@
+import pytest
+
+from core import cache as response_cache
+from core.authentication import user_cache_key
+
+
+@pytest.mark.django_db
+class TestCachedUserAuthentication:
+    url = '/api/v1/users/'
+
+    def test_user_loaded_once(self, admin, admin_client,
+                              django_assert_num_queries):
+        admin_client.get(self.url)
+        assert response_cache.get_cache().get(user_cache_key(admin.id))
+        # count + страница пользователей, без загрузки самого admin
+        with django_assert_num_queries(2):
+            response = admin_client.get(f'{self.url}?search=Test')
+        assert response.status_code == 200
+
+    def test_role_change_invalidates(self, admin_client, user, user_client):
+        assert user_client.get(self.url).status_code == 403
+        response = admin_client.patch(
+            f'{self.url}{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == 200
+        assert user_client.get(self.url).status_code == 200, (
+            'Проверьте, что смена роли сразу сбрасывает кэш пользователя'
+        )
+
+    def test_inactive_user_rejected(self, user, user_client):
+        assert user_client.get('/api/v1/users/me/').status_code == 200
+        user.is_active = False
+        user.save()
+        assert user_client.get('/api/v1/users/me/').status_code == 401
+
+    def test_me_patch_keeps_other_fields(self, user, user_client):
+        password = user.password
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'bio': 'Новое'}
+        )
+        assert response.status_code == 200
+        user.refresh_from_db()
+        assert user.bio == 'Новое'
+        assert user.password == password, (
+            'Проверьте, что пароль не перезаписывается'
+        )
+        assert user_client.get('/api/v1/users/me/').json()['bio'] == 'Новое'
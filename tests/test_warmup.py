@@ -0,0 +1,129 @@
+import threading
+
+import pytest
+from django.core.management import call_command
+
+from core import warmup
+
+
+@pytest.fixture
+def not_ready(monkeypatch):
+    monkeypatch.setitem(warmup._state, 'ready', False)
+    monkeypatch.setitem(warmup._state, 'phases', {})
+    monkeypatch.setitem(warmup._state, 'failed_at', None)
+    monkeypatch.setitem(warmup._state, 'thread', None)
+
+
+@pytest.fixture
+def broken_database(monkeypatch):
+    """Фаза обращения к базе падает, пока тест не «поднимет» базу."""
+    state = {'down': True}
+
+    def warm_database():
+        if state['down']:
+            raise RuntimeError('could not connect to server')
+        return 0
+
+    monkeypatch.setattr(warmup, 'PHASES', tuple(
+        (name, warm_database if name == 'database' else phase)
+        for name, phase in warmup.PHASES
+    ))
+    return state
+
+
+def readyz(client):
+    """Ответ /readyz после того, как запущенный им прогрев закончился."""
+    response = client.get('/readyz')
+    thread = warmup._state['thread']
+    if thread is not None:
+        thread.join(5)
+    return response
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('not_ready')
+class TestWarmup:
+
+    def test_ready_only_after_warmup(self, client):
+        assert client.get('/healthz').status_code == 200
+        # Прогрев идёт в другом потоке.
+        with warmup._lock:
+            response = client.get('/readyz')
+        assert response.status_code == 503, (
+            'Проверьте, что /readyz отвечает 503 до окончания прогрева'
+        )
+        warmup.warmup()
+        response = client.get('/readyz')
+        assert response.status_code == 200
+        assert set(response.json()['startup_ms']) >= {
+            'imports', 'urls', 'serializers', 'database', 'warmup'
+        }
+
+    def test_readyz_does_not_wait_for_warmup(self, client, monkeypatch):
+        started, finish = [], threading.Event()
+
+        def slow_warmup():
+            started.append(True)
+            finish.wait(5)
+            warmup.mark_ready()
+
+        monkeypatch.setattr(warmup, 'warmup', slow_warmup)
+        assert client.get('/readyz').status_code == 503, (
+            'Проверьте, что /readyz не выполняет прогрев синхронно: '
+            'иначе проверка не укладывается в таймаут healthcheck'
+        )
+        assert client.get('/readyz').status_code == 503
+        finish.set()
+        warmup._state['thread'].join(5)
+        assert started == [True], (
+            'Проверьте, что повторные проверки не запускают второй прогрев'
+        )
+        assert client.get('/readyz').status_code == 200
+
+    def test_phases_are_logged(self, caplog):
+        with caplog.at_level('INFO', logger='yamdb.startup'):
+            results = warmup.warmup()
+        assert results['urls'][1] > 10, (
+            'Проверьте, что прогрев разбирает все маршруты API'
+        )
+        assert results['serializers'][1] > 5
+        assert results['database'][1] == 3
+        logged = caplog.text
+        for phase in ('imports', 'urls', 'serializers', 'database'):
+            assert f'"phase": "{phase}"' in logged
+
+    def test_response_cache_is_not_filled(self, api_client, category):
+        warmup.warmup()
+        response = api_client.get('/api/v1/categories/')
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что прогрев не кладёт в кэш ответы с ключами, '
+            'которые не совпадут с запросами клиентов'
+        )
+
+    def test_failed_warmup_stays_unready(self, client, broken_database):
+        with pytest.raises(RuntimeError):
+            warmup.warmup()
+        assert readyz(client).status_code == 503
+
+    def test_readyz_retries_failed_warmup(self, settings, client,
+                                          monkeypatch, broken_database):
+        settings.WARMUP_RETRY_INTERVAL = 5
+        clock = [100.0]
+        monkeypatch.setattr(warmup.time, 'monotonic', lambda: clock[0])
+        assert readyz(client).status_code == 503
+        assert warmup._state['failed_at'] == 100.0
+        # Базу подготовили (миграции, данные), но интервал не прошёл.
+        broken_database['down'] = False
+        clock[0] += 1
+        assert readyz(client).status_code == 503
+        clock[0] += 5
+        assert readyz(client).status_code == 503
+        assert readyz(client).status_code == 200, (
+            'Проверьте, что /readyz повторяет неудавшийся прогрев '
+            'через WARMUP_RETRY_INTERVAL секунд'
+        )
+
+    def test_command(self, capsys):
+        call_command('warmup')
+        output = capsys.readouterr().out
+        assert 'database' in output and 'warmup' in output